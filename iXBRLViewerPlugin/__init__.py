@@ -4,17 +4,18 @@ from __future__ import annotations
 
 import argparse
 import atexit
-import io
 import logging
 import os
 import shutil
 import sys
 import tempfile
+import threading
 import traceback
 import webbrowser
+from collections.abc import Callable
 from optparse import OptionGroup, OptionParser
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, cast
+from typing import IO, TYPE_CHECKING, Any, cast
 
 from arelle.Cntlr import Cntlr
 from arelle.LocalViewer import LocalViewer
@@ -30,12 +31,17 @@ if TYPE_CHECKING:
     from arelle.CntlrWinMain import CntlrWinMain
     from bottle import HttpResponse
 
+    from .cache import ViewerCache
+
 from .constants import (
     CONFIG_COPY_SCRIPT,
     CONFIG_FEATURE_PREFIX,
+    CONFIG_LABEL_LANGUAGES,
     CONFIG_LAUNCH_ON_LOAD,
     CONFIG_SCRIPT_URL,
+    DEFAULT_CACHE_SIZE,
     DEFAULT_COPY_SCRIPT,
+    DEFAULT_DATA_FILENAME,
     DEFAULT_JS_FILENAME,
     DEFAULT_LAUNCH_ON_LOAD,
     DEFAULT_OUTPUT_NAME,
@@ -43,14 +49,22 @@ from .constants import (
     ERROR_MESSAGE_CODE,
     EXCEPTION_MESSAGE_CODE,
     FEATURE_CONFIGS,
+    INFO_MESSAGE_CODE,
 )
-from .iXBRLViewer import IXBRLViewerBuilder, IXBRLViewerBuilderError, isInlineDoc
-from .plugin import IXBRLViewerPluginData
+from .iXBRLViewer import IXBRLViewerBuilder, IXBRLViewerBuilderError, iXBRLViewer, isInlineDoc, parseLabelLanguages
+from .plugin import IXBRLViewerFilingData, IXBRLViewerPluginData
+from .profiling import PROFILE_REPORT_FILENAME, StageProfiler
+from .progress import GenerationProgress, ViewerGenerationCancelled
+from .searchindex import isLunrAvailable
+from .taxonomypack import loadTaxonomyPacks
 
 _: TypeGetText
 
 PLUGIN_NAME = 'ixbrl-viewer'
 
+# Guards creation of the plugin data on a controller shared by several threads
+_pluginDataLock = threading.Lock()
+
 #
 # GUI operation:
 #
@@ -73,6 +87,9 @@ PLUGIN_NAME = 'ixbrl-viewer'
 #
 #     In the zip, the iXBRLViewer files are in a subdirectory VIEWER_BASENAME_SUFFIX to separate them from possible EdgarRenderer and other output files
 #
+#     Requests may be processed concurrently by the same controller, so the builder and other state for a filing is
+#     held per thread (see IXBRLViewerPluginData).
+#
 
 
 def iXBRLViewerCommandLineOptionExtender(parser: OptionParser, *args: Any, **kwargs: Any) -> None:
@@ -121,6 +138,103 @@ def iXBRLViewerCommandLineOptionExtender(parser: OptionParser, *args: Any, **kwa
                       default=False,
                       dest="zipViewerOutput",
                       help="Converts the viewer output into a self contained zip")
+    parser.add_option("--viewer-compact-json",
+                      action="store_true",
+                      default=False,
+                      dest="viewerCompactJSON",
+                      help="Write the viewer data without indentation to reduce the size of the output")
+    parser.add_option("--viewer-compact-facts",
+                      action="store_true",
+                      default=False,
+                      dest="viewerCompactFacts",
+                      help="Encode facts in the viewer data using shared string tables to reduce the size of the output. "
+                           "Facts are encoded when the viewer is created, so this does not reduce the memory used while processing reports")
+    parser.add_option("--viewer-data-file",
+                      action="store",
+                      dest="viewerDataFile",
+                      help=f"Save the viewer data as a separate file with the given name (e.g. {DEFAULT_DATA_FILENAME}), "
+                           "which is fetched by the viewer rather than being included in the report (requires web server)")
+    parser.add_option("--viewer-data-gzip",
+                      action="store_true",
+                      default=False,
+                      dest="viewerDataGzip",
+                      help="Also save a gzip-compressed copy of the viewer data file, for web servers that serve pre-compressed files")
+    parser.add_option("--viewer-search-index",
+                      action="store_true",
+                      default=False,
+                      dest="viewerSearchIndex",
+                      help="Build the viewer's search index when the viewer is generated, rather than when it is opened. "
+                           "The index is only included if the lunr package is installed; otherwise the documents it is built from are included.")
+    parser.add_option("--viewer-preprocess-ixbrl",
+                      action="store_true",
+                      default=False,
+                      dest="viewerPreprocessIXBRL",
+                      help="Find the inline XBRL elements in each document when the viewer is generated, "
+                           "rather than traversing each document when the viewer is opened")
+    parser.add_option("--viewer-prune-relationships",
+                      action="store_true",
+                      default=False,
+                      dest="viewerPruneRelationships",
+                      help="Omit relationships, and the concepts at either end of them, that are not reachable from the concepts "
+                           "and dimensions of reported facts, to reduce the size of the viewer data")
+    parser.add_option("--viewer-omit-text-values",
+                      action="store",
+                      type="int",
+                      dest="viewerOmitTextValueSize",
+                      help="Omit the values of nonNumeric facts of at least this many characters from the viewer data. "
+                           "The viewer rebuilds them from the document, in which they are already included")
+    parser.add_option("--viewer-label-languages",
+                      action="store",
+                      dest="viewerLabelLanguages",
+                      help="Comma-separated list of the languages of labels to include in the viewer, such as \"en,fr\". "
+                           "A language includes its variants, so \"en\" includes \"en-GB\". Where a concept has no label of a role "
+                           "in these languages, the label that the viewer would fall back on is included. The default is all languages")
+    parser.add_option("--viewer-taxonomy-pack",
+                      action="append",
+                      default=[],
+                      dest="viewerTaxonomyPacks",
+                      help="Taxonomy pack file, created with iXBRLViewerPlugin.taxonomypack, providing the data for the concepts "
+                           "in its namespace, so that it is fetched by the viewer rather than included in the viewer data. May be repeated")
+    parser.add_option("--viewer-taxonomy-pack-url",
+                      action="store",
+                      dest="viewerTaxonomyPackURL",
+                      help="URL at which taxonomy packs are published. If not given, the viewer fetches them from alongside the viewer data, "
+                           "and they must be copied there")
+    parser.add_option("--viewer-save-workers",
+                      action="store",
+                      type="int",
+                      default=1,
+                      dest="viewerSaveWorkers",
+                      help="Number of threads to use when writing the files of a document set. The default is 1.")
+    parser.add_option("--viewer-profile",
+                      action="store_true",
+                      default=False,
+                      dest="viewerProfile",
+                      help="Write a JSON report of the time taken by each stage of viewer generation alongside the viewer")
+    parser.add_option("--viewer-profile-memory",
+                      action="store_true",
+                      default=False,
+                      dest="viewerProfileMemory",
+                      help="Write a profile report including peak memory use for each stage. This slows viewer generation considerably. "
+                           "Memory use is measured for the whole process, so is only accurate if a single filing is processed at a time")
+    parser.add_option("--viewer-cache-dir",
+                      action="store",
+                      dest="viewerCacheDir",
+                      help="Directory in which to cache generated viewers. If a viewer has previously been generated from the same documents "
+                           "with the same options, the cached output is copied to the destination instead of generating it again. "
+                           "Only used when saving to the file system.")
+    parser.add_option("--viewer-cache-size",
+                      action="store",
+                      type="float",
+                      default=DEFAULT_CACHE_SIZE / (1024 * 1024),
+                      dest="viewerCacheSize",
+                      help="Maximum size of the viewer cache in MB. The least recently used viewers are removed when it is exceeded. "
+                           f"The default is {DEFAULT_CACHE_SIZE // (1024 * 1024)}.")
+    parser.add_option("--viewer-cache-hardlink",
+                      action="store_true",
+                      default=False,
+                      dest="viewerCacheHardlink",
+                      help="Hard link cached viewer files to the destination rather than copying them. The output files must not then be modified.")
 
     featureGroup = OptionGroup(parser, "Viewer Features",
                             "See viewer README for information on enabling/disabling features.")
@@ -135,22 +249,37 @@ def iXBRLViewerCommandLineOptionExtender(parser: OptionParser, *args: Any, **kwa
         )
     parser.add_option_group(featureGroup)
 
-def pluginData(cntlr: Cntlr) -> IXBRLViewerPluginData:
-    pd = cast(IXBRLViewerPluginData | None, cntlr.getPluginData(PLUGIN_NAME))
-    if pd is None:
-        pd = IXBRLViewerPluginData(PLUGIN_NAME)
-        cntlr.setPluginData(pd)
+def controllerPluginData(cntlr: Cntlr) -> IXBRLViewerPluginData:
+    with _pluginDataLock:
+        pd = cast(IXBRLViewerPluginData | None, cntlr.getPluginData(PLUGIN_NAME))
+        if pd is None:
+            pd = IXBRLViewerPluginData(PLUGIN_NAME)
+            cntlr.setPluginData(pd)
     return pd
 
+def pluginData(cntlr: Cntlr) -> IXBRLViewerFilingData:
+    """
+    Return the plugin state for the filing being processed in the current
+    thread (or context).
+    """
+    return controllerPluginData(cntlr).filingData()
+
 def resetPluginData(cntlr: Cntlr) -> None:
-    pluginData(cntlr).builder = None
+    controllerPluginData(cntlr).resetFilingData()
 
-def processModel(cntlr: Cntlr, modelXbrl: ModelXbrl) -> None:
+def processModel(cntlr: Cntlr, modelXbrl: ModelXbrl, builder: IXBRLViewerBuilder | None = None) -> None:
+    """
+    Process a model using the given builder, or that of the filing being
+    processed.
+    """
     try:
         if isInlineDoc(modelXbrl.modelDocument):
-            builder = pluginData(cntlr).builder
+            if builder is None:
+                builder = pluginData(cntlr).builder
             assert builder is not None, "iXBRL Viewer builder must be initialized before processing model"
             builder.processModel(modelXbrl)
+    except ViewerGenerationCancelled:
+        raise
     except IXBRLViewerBuilderError as ex:
         print(ex)
     except Exception as ex:
@@ -167,13 +296,23 @@ def processModel(cntlr: Cntlr, modelXbrl: ModelXbrl) -> None:
 
 def generateViewer(
         cntlr: Cntlr,
-        saveViewerDest: io.BytesIO | str | None,
+        saveViewerDest: IO[bytes] | str | None,
         viewerURL: str | None = None,
         showValidationMessages: bool = False,
         zipViewerOutput: bool = False,
         packageDownloadURL: str | None = None,
         copyScript: bool = True,
-) -> None:
+        compactJSON: bool = False,
+        compactFacts: bool = False,
+        dataFilename: str | None = None,
+        compressData: bool = False,
+        preprocessIXBRL: bool = False,
+        pruneRelationships: bool = False,
+        omitTextValueSize: int | None = None,
+        saveWorkers: int = 1,
+        profile: bool = False,
+        builder: IXBRLViewerBuilder | None = None,
+) -> iXBRLViewer | None:
     """
     Generate and save an iXBRL viewer at the given destination (file, directory, or in-memory file) with the given viewer script URL.
     If copyScript is True the viewer script will be copied into the output destination.
@@ -185,21 +324,33 @@ def generateViewer(
     :param zipViewerOutput: True if the destination is a zip archive.
     :param packageDownloadURL: Optional URL to use as the report package download URL.
     :param copyScript: Controls if the script referenced by viewerURL is copied into the output directory, or directly set as the 'src' value of the script tag in the HTML iXBRL Viewer.
+    :param compactJSON: True if the viewer data should be written without indentation.
+    :param compactFacts: True if facts should be encoded using shared string tables.
+    :param dataFilename: If provided, the viewer data is saved as a separate file with this name.
+    :param compressData: True if a gzip-compressed copy of the separate viewer data file should also be saved.
+    :param preprocessIXBRL: True if the inline XBRL elements of each document should be found when the viewer is generated.
+    :param pruneRelationships: True if relationships and concepts not reachable from reported facts should be omitted.
+    :param omitTextValueSize: If provided, the values of nonNumeric facts of at least this many characters are omitted.
+    :param saveWorkers: Number of threads to use when writing the files of a document set.
+    :param profile: True to write a JSON report of the time taken by each stage of generation alongside the viewer.
+        Only the createViewer and save stages are included unless the builder was created with a profiler.
+    :param builder: The builder to generate the viewer from, if not that of the filing being processed.
+    :return: The viewer, if it was generated and saved without error.
     """
     # extend XBRL-loaded run processing for this option
     abortGenerationMsg = "Skipping iXBRL Viewer generation."
     if not saveViewerDest:
         cntlr.addToLog(f"iXBRL Viewer destination not provided. {abortGenerationMsg}", messageCode=EXCEPTION_MESSAGE_CODE)
-        return
+        return None
 
     viewerURL = viewerURL or DEFAULT_VIEWER_PATH
 
-    bldr = pluginData(cntlr).builder
+    bldr = builder or pluginData(cntlr).builder
     assert bldr is not None, "iXBRL Viewer builder must be initialized before generating viewer"
 
     if bldr.reportCount == 0:
         cntlr.addToLog(f"No inline XBRL documents loaded. {abortGenerationMsg}", messageCode=ERROR_MESSAGE_CODE)
-        return
+        return None
 
     copyScriptPath = None
     if copyScript:
@@ -214,7 +365,7 @@ def generateViewer(
                 if cntlr.webCache.workOffline:
                     downloadFailedErrorMessage += " Disable offline mode and try again."
                 cntlr.addToLog(f"{downloadFailedErrorMessage} {abortGenerationMsg}", messageCode=EXCEPTION_MESSAGE_CODE)
-                return
+                return None
 
         if not viewerPath:
             viewerPath = Path(viewerURL)
@@ -222,18 +373,59 @@ def generateViewer(
         viewerURL = viewerPath.name
         if not viewerPath.is_file():
             cntlr.addToLog(f"iXBRL Viewer script not found at '{viewerPath}'. {abortGenerationMsg}", messageCode=EXCEPTION_MESSAGE_CODE)
-            return
+            return None
 
+    if profile and not bldr.profiler.enabled:
+        bldr.profiler = bldr.iv.profiler = StageProfiler()
+
+    iv = None
     try:
-        iv = bldr.createViewer(scriptUrl=viewerURL, showValidations=showValidationMessages, packageDownloadURL=packageDownloadURL)
+        iv = bldr.createViewer(
+            scriptUrl=viewerURL,
+            showValidations=showValidationMessages,
+            packageDownloadURL=packageDownloadURL,
+            compactJSON=compactJSON,
+            compactFacts=compactFacts,
+            dataFilename=dataFilename,
+            compressData=compressData,
+            preprocessIXBRL=preprocessIXBRL,
+            pruneRelationships=pruneRelationships,
+            omitTextValueSize=omitTextValueSize,
+        )
         if iv is not None:
-            iv.save(saveViewerDest, zipOutput=zipViewerOutput, copyScriptPath=copyScriptPath)
+            iv.save(saveViewerDest, zipOutput=zipViewerOutput, copyScriptPath=copyScriptPath, workers=saveWorkers)
+        if bldr.profiler.enabled:
+            writeProfileReport(cntlr, bldr.profiler, saveViewerDest)
+    except ViewerGenerationCancelled as ex:
+        cntlr.addToLog(str(ex), messageCode=INFO_MESSAGE_CODE)
+        iv = None
     except IXBRLViewerBuilderError as ex:
         print(ex)
+        iv = None
     except Exception as ex:
         tb = traceback.format_tb(sys.exc_info()[2])
         cntlr.addToLog(f"Exception {ex} \nTraceback {tb}", messageCode=EXCEPTION_MESSAGE_CODE)
+        iv = None
     resetPluginData(cntlr)
+    return iv
+
+
+def profileReportPath(saveViewerDest: IO[bytes] | str) -> str | None:
+    if not isinstance(saveViewerDest, str):
+        return None
+    if os.path.isdir(saveViewerDest):
+        return os.path.join(saveViewerDest, PROFILE_REPORT_FILENAME)
+    return f"{os.path.splitext(saveViewerDest)[0]}-profile.json"
+
+
+def writeProfileReport(cntlr: Cntlr, profiler: StageProfiler, saveViewerDest: IO[bytes] | str) -> None:
+    profiler.close()
+    path = profileReportPath(saveViewerDest)
+    if path is None:
+        cntlr.addToLog("Viewer is not being saved to the file system. Skipping profile report.", messageCode=INFO_MESSAGE_CODE)
+        return
+    cntlr.addToLog(f"Writing profile report {path}", messageCode=INFO_MESSAGE_CODE)
+    profiler.writeReport(path)
 
 
 def getFeaturesFromOptions(options: argparse.Namespace | OptionParser) -> dict[str, Any]:
@@ -247,6 +439,97 @@ def getFeaturesFromOptions(options: argparse.Namespace | OptionParser) -> dict[s
     return features
 
 
+def viewerCacheEnabled(options: argparse.Namespace) -> bool:
+    # Profiling is of generation, so is not useful for cached viewers.
+    return bool(
+        getattr(options, "viewerCacheDir", None)
+        and isinstance(options.saveViewerDest, str)
+        and not options.viewerProfile
+        and not options.viewerProfileMemory
+    )
+
+
+def viewerCache(options: argparse.Namespace) -> ViewerCache:
+    # Imported here so that the cache module can be run as a script
+    from .cache import ViewerCache
+    return ViewerCache(options.viewerCacheDir, maxSize=int(options.viewerCacheSize * 1024 * 1024))
+
+
+def viewerCacheOptions(options: argparse.Namespace) -> dict[str, Any]:
+    """
+    Return the options that affect the viewer generated, for use in the cache key.
+    """
+    from .cache import fileKey
+    copyScript = not options.viewerNoCopyScript
+    viewerURL = options.viewerURL or DEFAULT_VIEWER_PATH
+    return {
+        "destinationIsDirectory": os.path.isdir(options.saveViewerDest),
+        "viewerURL": viewerURL,
+        "copyScript": copyScript,
+        # A copied script may change without its path changing
+        "script": fileKey(viewerURL) if copyScript and not isHttpUrl(viewerURL) and os.path.isfile(viewerURL) else None,
+        "features": getFeaturesFromOptions(options),
+        "useStubViewer": bool(options.useStubViewer),
+        "packageDownloadURL": options.packageDownloadURL,
+        "zipViewerOutput": options.zipViewerOutput,
+        "compactJSON": options.viewerCompactJSON,
+        "compactFacts": options.viewerCompactFacts,
+        "dataFile": options.viewerDataFile,
+        "compressData": options.viewerDataGzip,
+        "searchIndex": options.viewerSearchIndex and isLunrAvailable(),
+        "searchDocuments": options.viewerSearchIndex,
+        "preprocessIXBRL": options.viewerPreprocessIXBRL,
+        "labelLanguages": parseLabelLanguages(options.viewerLabelLanguages),
+        "taxonomyPacks": [fileKey(p) if os.path.isfile(p) else p for p in options.viewerTaxonomyPacks],
+        "taxonomyPackURL": options.viewerTaxonomyPackURL,
+        "pruneRelationships": options.viewerPruneRelationships,
+        "omitTextValueSize": options.viewerOmitTextValueSize,
+        # Validation messages depend on the validation performed.
+        "validationMessages": bool(options.validationMessages),
+        "validate": bool(getattr(options, "validate", False)),
+        "disclosureSystem": getattr(options, "disclosureSystemName", None),
+        "plugins": getattr(options, "plugins", None),
+    }
+
+
+def lookupCachedViewer(cntlr: Cntlr, options: argparse.Namespace) -> bool:
+    """
+    Look up the cache entry for the models loaded for the filing, returning
+    True if a viewer for the filing is cached.
+    """
+    from .cache import cacheKey
+    pd = pluginData(cntlr)
+    pd.cacheKey = cacheKey(viewerCacheOptions(options), pd.cacheModelKeys)
+    pd.cacheEntry = viewerCache(options).lookup(pd.cacheKey)
+    return pd.cacheEntry is not None
+
+
+def restoreCachedViewer(cntlr: Cntlr, options: argparse.Namespace) -> bool:
+    """
+    Copy the cached viewer for the filing to the destination, returning True
+    if successful.
+    """
+    pd = pluginData(cntlr)
+    entry = pd.cacheEntry
+    assert entry is not None
+    cntlr.addToLog(f"Using cached iXBRL Viewer {entry.key}", messageCode=INFO_MESSAGE_CODE)
+    try:
+        for path in viewerCache(options).restore(entry, options.saveViewerDest, hardlink=options.viewerCacheHardlink):
+            cntlr.addToLog(f"Writing {path}", messageCode=INFO_MESSAGE_CODE)
+    except OSError as ex:
+        cntlr.addToLog(f"Unable to restore cached iXBRL Viewer {entry.key}: {ex}", messageCode=ERROR_MESSAGE_CODE)
+        return False
+    return True
+
+
+def storeCachedViewer(cntlr: Cntlr, options: argparse.Namespace, key: str, modelKeys: tuple[str, ...], iv: iXBRLViewer) -> None:
+    try:
+        entry = viewerCache(options).store(key, list(modelKeys), options.saveViewerDest, iv.savedFiles)
+        cntlr.addToLog(f"Cached iXBRL Viewer {entry.key} ({entry.size} bytes)", messageCode=INFO_MESSAGE_CODE)
+    except OSError as ex:
+        cntlr.addToLog(f"Unable to cache iXBRL Viewer: {ex}", messageCode=ERROR_MESSAGE_CODE)
+
+
 def iXBRLViewerCommandLineXbrlRun(
         cntlr: Cntlr,
         options: argparse.Namespace,
@@ -255,12 +538,59 @@ def iXBRLViewerCommandLineXbrlRun(
         **kwargs: Any,
 ) -> None:
     pd = pluginData(cntlr)
+    if viewerCacheEnabled(options):
+        from .cache import modelKey
+        pd.cacheModelKeys += (modelKey(modelXbrl),)
+        # If the filing loads more than one model, whether a viewer is cached
+        # is only known once all of them have been loaded, at Filing.End, and
+        # each must be processed in case it isn't.
+        if pd.cacheSingleModel and lookupCachedViewer(cntlr, options):
+            return
     if pd.builder is None:
-        pd.builder = IXBRLViewerBuilder(cntlr, useStubViewer = options.useStubViewer, features=getFeaturesFromOptions(options))
+        try:
+            taxonomyPacks = loadTaxonomyPacks(options.viewerTaxonomyPacks, options.viewerTaxonomyPackURL)
+        except (OSError, ValueError, KeyError) as ex:
+            cntlr.addToLog(f"Unable to load taxonomy pack: {ex}", messageCode=ERROR_MESSAGE_CODE)
+            taxonomyPacks = []
+        # Unless models are kept open, they are closed before the viewer is
+        # generated, so the source documents must be copied.
+        pd.builder = IXBRLViewerBuilder(
+            cntlr,
+            useStubViewer=options.useStubViewer,
+            features=getFeaturesFromOptions(options),
+            copyDocuments=not getattr(options, "keepOpen", False),
+            profiler=StageProfiler(traceMemory=options.viewerProfileMemory) if options.viewerProfile or options.viewerProfileMemory else None,
+            searchIndex=options.viewerSearchIndex,
+            taxonomyPacks=taxonomyPacks,
+            labelLanguages=parseLabelLanguages(options.viewerLabelLanguages),
+        )
     processModel(cntlr, modelXbrl)
 
+def iXBRLViewerCommandLineFilingStart(
+        cntlr: Cntlr,
+        options: argparse.Namespace,
+        filesource: Any,
+        entrypointFiles: list[Any],
+        *args: Any,
+        **kwargs: Any,
+) -> None:
+    pluginData(cntlr).cacheSingleModel = len(entrypointFiles) == 1
+
+
 def iXBRLViewerCommandLineFilingEnd(cntlr: Cntlr, options: argparse.Namespace, *args: Any, **kwargs: Any) -> None:
-    generateViewer(
+    pd = pluginData(cntlr)
+    if viewerCacheEnabled(options) and pd.cacheModelKeys:
+        if pd.cacheKey is None:
+            lookupCachedViewer(cntlr, options)
+        if pd.cacheEntry is not None:
+            # If the models were processed, a viewer that can't be restored
+            # is generated instead.
+            if restoreCachedViewer(cntlr, options) or pd.builder is None:
+                resetPluginData(cntlr)
+                return
+    # generateViewer resets the plugin data
+    key, modelKeys = pd.cacheKey, pd.cacheModelKeys
+    iv = generateViewer(
         cntlr=cntlr,
         saveViewerDest=options.saveViewerDest or kwargs.get("responseZipStream"),
         viewerURL=options.viewerURL,
@@ -268,7 +598,18 @@ def iXBRLViewerCommandLineFilingEnd(cntlr: Cntlr, options: argparse.Namespace, *
         showValidationMessages=options.validationMessages,
         zipViewerOutput=options.zipViewerOutput,
         packageDownloadURL=options.packageDownloadURL,
+        compactJSON=options.viewerCompactJSON,
+        compactFacts=options.viewerCompactFacts,
+        dataFilename=options.viewerDataFile,
+        compressData=options.viewerDataGzip,
+        preprocessIXBRL=options.viewerPreprocessIXBRL,
+        pruneRelationships=options.viewerPruneRelationships,
+        omitTextValueSize=options.viewerOmitTextValueSize,
+        saveWorkers=options.viewerSaveWorkers,
+        profile=options.viewerProfile or options.viewerProfileMemory,
     )
+    if key is not None and iv is not None and iv.savedFiles:
+        storeCachedViewer(cntlr, options, key, modelKeys, iv)
 
 
 def iXBRLViewerSaveCommand(cntlr: CntlrWinMain) -> None:
@@ -286,18 +627,108 @@ def iXBRLViewerSaveCommand(cntlr: CntlrWinMain) -> None:
         feature: True
         for feature in dialog.features()
     }
-    pluginData(cntlr).builder = IXBRLViewerBuilder(cntlr, features=features)
-    processModel(cntlr, modelXbrl)
     if dialog.accepted and dialog.filename():
-        generateViewer(
-            cntlr=cntlr,
-            saveViewerDest=dialog.filename(),
-            viewerURL=dialog.scriptUrl(),
-            copyScript=dialog.copyScript(),
-            zipViewerOutput=dialog.zipViewerOutput(),
+        generateViewerInBackground(
+            cntlr,
+            modelXbrl,
+            builderArgs=dict(features=features, labelLanguages=parseLabelLanguages(dialog.labelLanguages())),
+            generateArgs=dict(
+                saveViewerDest=dialog.filename(),
+                viewerURL=dialog.scriptUrl(),
+                copyScript=dialog.copyScript(),
+                zipViewerOutput=dialog.zipViewerOutput(),
+            ),
         )
 
 
+class ModelCloseGuard:
+    """
+    Defers closing or reloading a model, for example from the File menu,
+    while a worker thread reads it.  Deferred actions are carried out when
+    the guard is released.  Methods must be called on the GUI thread.
+    """
+
+    GUARDED_METHODS = ("close", "reload")
+
+    def __init__(self, cntlr: Cntlr, modelXbrl: ModelXbrl) -> None:
+        self.cntlr = cntlr
+        self.modelXbrl = modelXbrl
+        self._deferred: list[Callable[[], None]] = []
+        for name in self.GUARDED_METHODS:
+            setattr(modelXbrl, name, self._defer(getattr(modelXbrl, name), name))
+
+    def _defer(self, method: Callable[..., Any], name: str) -> Callable[..., None]:
+        def deferred(*args: Any, **kwargs: Any) -> None:
+            self.cntlr.addToLog(
+                f"The {name} of the model will be completed once the iXBRL Viewer has finished reading it",
+                messageCode=INFO_MESSAGE_CODE,
+            )
+            self._deferred.append(lambda: method(*args, **kwargs))
+        return deferred
+
+    def release(self) -> None:
+        # The methods were set on the instance, so removing them restores
+        # those of the class.
+        for name in self.GUARDED_METHODS:
+            self.modelXbrl.__dict__.pop(name, None)
+        deferred, self._deferred = self._deferred, []
+        for action in deferred:
+            action()
+
+
+def generateViewerInBackground(
+        cntlr: CntlrWinMain,
+        modelXbrl: ModelXbrl,
+        builderArgs: dict[str, Any],
+        generateArgs: dict[str, Any],
+        onComplete: Callable[[iXBRLViewer], None] | None = None,
+) -> None:
+    """
+    Process a model and generate a viewer in a worker thread, so that the GUI
+    remains responsive, showing progress in a dialog from which generation
+    can be cancelled.
+
+    The model is only read while it is processed, during which closing or
+    reloading it is deferred by a ModelCloseGuard, so the rest of the GUI can
+    be used throughout.  The source documents are copied, so that the viewer
+    is unaffected by the model being closed once it has been processed.
+    :param builderArgs: Arguments for IXBRLViewerBuilder, other than the controller and copyDocuments.
+    :param generateArgs: Arguments for generateViewer, other than the controller.
+    :param onComplete: Called on the GUI thread with the viewer, if it was generated.
+    """
+    from .ui import ProgressDialog
+    progress = GenerationProgress()
+    dialog = ProgressDialog(cntlr, progress)
+    guard = ModelCloseGuard(cntlr, modelXbrl)
+    progress.callback = lambda update: cntlr.uiThreadQueue.put((dialog.showProgress, [update]))
+
+    def finished(iv: iXBRLViewer | None) -> None:
+        dialog.close()
+        if iv is not None and onComplete is not None:
+            onComplete(iv)
+
+    def generate() -> None:
+        # The builder is passed explicitly rather than held in plugin data,
+        # which the GUI clears when the last model is closed.
+        iv = None
+        try:
+            builder = IXBRLViewerBuilder(cntlr, progress=progress, copyDocuments=True, **builderArgs)
+            try:
+                processModel(cntlr, modelXbrl, builder)
+            finally:
+                cntlr.uiThreadQueue.put((guard.release, []))
+            iv = generateViewer(cntlr=cntlr, builder=builder, **generateArgs)
+        except ViewerGenerationCancelled as ex:
+            cntlr.addToLog(str(ex), messageCode=INFO_MESSAGE_CODE)
+        except Exception as ex:
+            tb = traceback.format_tb(sys.exc_info()[2])
+            cntlr.addToLog(f"Exception {ex} \nTraceback {tb}", messageCode=EXCEPTION_MESSAGE_CODE)
+        finally:
+            cntlr.uiThreadQueue.put((finished, [iv]))
+
+    threading.Thread(target=generate, name="iXBRLViewer.generate", daemon=True).start()
+
+
 def iXBRLViewerSettingsCommand(cntlr: CntlrWinMain) -> None:
     from .ui import SettingsDialog
     SettingsDialog(cntlr).render()
@@ -331,6 +762,9 @@ def commandLineOptionExtender(*args: Any, **kwargs: Any) -> None:
 def commandLineRun(cntlr: Cntlr, options: argparse.Namespace, modelXbrl: ModelXbrl, *args: Any, **kwargs: Any) -> None:
     iXBRLViewerCommandLineXbrlRun(cntlr, options, modelXbrl, *args, **kwargs)
 
+def commandLineFilingStart(*args: Any, **kwargs: Any) -> None:
+    iXBRLViewerCommandLineFilingStart(*args, **kwargs)
+
 def commandLineFilingEnd(*args: Any, **kwargs: Any) -> None:
     iXBRLViewerCommandLineFilingEnd(*args, **kwargs)
 
@@ -377,18 +811,28 @@ def guiRun(cntlr: CntlrWinMain, modelXbrl: ModelXbrl, attach: Any, *args: Any, *
         for featureConfig in FEATURE_CONFIGS:
             if cntlr.config.setdefault(f'{CONFIG_FEATURE_PREFIX}{featureConfig.key}', False):
                 features[featureConfig.key] = True
-        pluginData(cntlr).builder = IXBRLViewerBuilder(cntlr, useStubViewer=True, features=features)
-        processModel(cntlr, modelXbrl)
-        generateViewer(
-            cntlr=cntlr,
-            saveViewerDest=tempViewerDir,
-            viewerURL=cntlr.config.get(CONFIG_SCRIPT_URL),
-            copyScript=cntlr.config.get(CONFIG_COPY_SCRIPT, DEFAULT_COPY_SCRIPT),
+
+        def openViewer(iv: iXBRLViewer) -> None:
+            if Path(tempViewerDir, viewer_file_name).exists():
+                localViewer = iXBRLViewerLocalViewer("iXBRL Viewer", os.path.dirname(__file__))
+                localhost = localViewer.init(cntlr, tempViewerDir)
+                webbrowser.open(f'{localhost}/{viewer_file_name}')
+
+        generateViewerInBackground(
+            cntlr,
+            modelXbrl,
+            builderArgs=dict(
+                useStubViewer=True,
+                features=features,
+                labelLanguages=parseLabelLanguages(cntlr.config.get(CONFIG_LABEL_LANGUAGES)),
+            ),
+            generateArgs=dict(
+                saveViewerDest=tempViewerDir,
+                viewerURL=cntlr.config.get(CONFIG_SCRIPT_URL),
+                copyScript=cntlr.config.get(CONFIG_COPY_SCRIPT, DEFAULT_COPY_SCRIPT),
+            ),
+            onComplete=openViewer,
         )
-        if Path(tempViewerDir, viewer_file_name).exists():
-            localViewer = iXBRLViewerLocalViewer("iXBRL Viewer", os.path.dirname(__file__))
-            localhost = localViewer.init(cntlr, tempViewerDir)
-            webbrowser.open(f'{localhost}/{viewer_file_name}')
     except Exception as ex:
         modelXbrl.error(
             EXCEPTION_MESSAGE_CODE,
@@ -413,6 +857,7 @@ __pluginInfo__ = {
     'copyright': 'Copyright :: Workiva Inc. :: 2019',
     'CntlrCmdLine.Options': commandLineOptionExtender,
     'CntlrCmdLine.Xbrl.Run': commandLineRun,
+    'CntlrCmdLine.Filing.Start': commandLineFilingStart,
     'CntlrCmdLine.Filing.End': commandLineFilingEnd,
     'CntlrWinMain.Menu.Tools': toolsMenuExtender,
     'CntlrWinMain.Xbrl.Loaded': guiRun,
@@ -0,0 +1,323 @@
+# See COPYRIGHT.md for copyright information
+
+"""
+Generate viewers for many filings in a single process.
+
+A single Arelle controller is used for all filings, so plugins, taxonomy
+packages and the web cache are only set up once, rather than on every
+invocation of Arelle.  Filings are loaded and processed one at a time, as an
+Arelle model manager can only work on one model at a time, but saving each
+viewer is handed off to a bounded pool of worker threads so that it overlaps
+with loading the next filing.
+
+The manifest is a JSON list of filings:
+
+    [
+        {"file": "report.xhtml", "out": "viewers/report.html"},
+        {"file": ["doc1.html", "doc2.html"], "out": "viewers/docset/"},
+        {"file": "package.zip", "out": "viewers/package.zip", "zip": true}
+    ]
+
+Usage:
+
+    python -m iXBRLViewerPlugin.batch manifest.json --viewer-url ixbrlviewer.js --report timings.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from arelle import FileSource, PackageManager, PluginManager
+from arelle.Cntlr import Cntlr
+from arelle.ModelFormulaObject import FormulaOptions
+from arelle.UrlUtil import IXDS_DOC_SEPARATOR, IXDS_SURROGATE
+
+from . import getFeaturesFromOptions
+from .constants import DEFAULT_JS_FILENAME, ERROR_MESSAGE_CODE, FEATURE_CONFIGS, INFO_MESSAGE_CODE
+from .iXBRLViewer import IXBRLViewerBuilder, iXBRLViewer, isInlineDoc, parseLabelLanguages
+from .taxonomypack import TaxonomyPack, loadTaxonomyPacks
+
+
+@dataclass
+class BatchFiling:
+    files: list[str]
+    destination: str
+    zipOutput: bool = False
+    packageDownloadURL: str | None = None
+
+    @property
+    def entryPoint(self) -> str:
+        if len(self.files) == 1:
+            return self.files[0]
+        # Multiple documents are loaded as an inline XBRL document set
+        return os.path.join(os.path.dirname(self.files[0]), IXDS_SURROGATE) + IXDS_DOC_SEPARATOR.join(self.files)
+
+
+@dataclass
+class BatchResult:
+    destination: str
+    success: bool = False
+    error: str | None = None
+    # Wall times, in seconds, for each stage of generation.
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def asDict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def readManifest(path: str) -> list[BatchFiling]:
+    """
+    Read a JSON manifest of filings.  Relative paths are resolved relative to
+    the directory containing the manifest.
+    """
+    with open(path, encoding="utf-8") as fin:
+        entries = json.load(fin)
+    if not isinstance(entries, list):
+        raise ValueError(f"Manifest {path} must contain a list of filings")
+    baseDir = os.path.dirname(os.path.abspath(path))
+    filings = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict) or "file" not in entry or "out" not in entry:
+            raise ValueError(f"Manifest entry {i} must be an object with 'file' and 'out' properties")
+        files = entry["file"] if isinstance(entry["file"], list) else [entry["file"]]
+        filings.append(BatchFiling(
+            files=[os.path.join(baseDir, f) for f in files],
+            destination=os.path.join(baseDir, entry["out"]),
+            zipOutput=entry.get("zip", False),
+            packageDownloadURL=entry.get("packageDownloadURL"),
+        ))
+    return filings
+
+
+class BatchViewerGenerator:
+
+    def __init__(
+        self,
+        cntlr: Cntlr,
+        viewerURL: str = DEFAULT_JS_FILENAME,
+        copyScriptPath: Path | None = None,
+        workers: int = 1,
+        features: dict[str, Any] | None = None,
+        useStubViewer: bool = False,
+        showValidationMessages: bool = False,
+        compactJSON: bool = False,
+        compactFacts: bool = False,
+        dataFilename: str | None = None,
+        compressData: bool = False,
+        searchIndex: bool = False,
+        preprocessIXBRL: bool = False,
+        pruneRelationships: bool = False,
+        omitTextValueSize: int | None = None,
+        taxonomyPacks: list[TaxonomyPack] | None = None,
+        labelLanguages: list[str] | None = None,
+    ) -> None:
+        """
+        :param cntlr: The Arelle controller used to load every filing.
+        :param viewerURL: The `src` value of the script tag that loads the viewer script.
+        :param copyScriptPath: If provided, the viewer script to copy alongside each viewer.
+        :param workers: Maximum number of viewers to save concurrently.
+        """
+        self.cntlr = cntlr
+        self.viewerURL = viewerURL
+        self.copyScriptPath = copyScriptPath
+        self.workers = max(1, workers)
+        self.features = features or {}
+        self.useStubViewer = useStubViewer
+        self.showValidationMessages = showValidationMessages
+        self.compactJSON = compactJSON
+        self.compactFacts = compactFacts
+        self.dataFilename = dataFilename
+        self.compressData = compressData
+        self.searchIndex = searchIndex
+        self.preprocessIXBRL = preprocessIXBRL
+        self.pruneRelationships = pruneRelationships
+        self.omitTextValueSize = omitTextValueSize
+        self.taxonomyPacks = taxonomyPacks or []
+        self.labelLanguages = labelLanguages
+
+    def run(self, filings: list[BatchFiling]) -> list[BatchResult]:
+        results = [BatchResult(destination=filing.destination) for filing in filings]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending: deque[Future[None]] = deque()
+            for filing, result in zip(filings, results):
+                # Bound the number of viewers held in memory waiting to be saved
+                while len(pending) >= self.workers:
+                    pending.popleft().result()
+                viewer = self.createViewer(filing, result)
+                if viewer is not None:
+                    pending.append(pool.submit(self.saveViewer, viewer, filing, result))
+            while pending:
+                pending.popleft().result()
+        return results
+
+    def createViewer(self, filing: BatchFiling, result: BatchResult) -> iXBRLViewer | None:
+        """
+        Load a filing and build its viewer.  The model is closed before
+        returning, so the viewer holds copies of the source documents.
+        """
+        self.clearLogBuffer()
+        start = time.perf_counter()
+        modelManager = self.cntlr.modelManager
+        modelXbrl = None
+        try:
+            modelXbrl = modelManager.load(FileSource.openFileSource(filing.entryPoint, self.cntlr))
+            if self.showValidationMessages:
+                modelManager.validate()
+            loaded = time.perf_counter()
+            result.timings["load"] = loaded - start
+
+            if modelXbrl is None or not isInlineDoc(modelXbrl.modelDocument):
+                result.error = "No inline XBRL document loaded"
+                return None
+            builder = IXBRLViewerBuilder(self.cntlr, useStubViewer=self.useStubViewer, features=self.features, searchIndex=self.searchIndex,
+                                         taxonomyPacks=self.taxonomyPacks, labelLanguages=self.labelLanguages)
+            builder.processModel(modelXbrl)
+            viewer = builder.createViewer(
+                scriptUrl=self.viewerURL,
+                showValidations=self.showValidationMessages,
+                packageDownloadURL=filing.packageDownloadURL,
+                compactJSON=self.compactJSON,
+                compactFacts=self.compactFacts,
+                dataFilename=self.dataFilename,
+                compressData=self.compressData,
+                preprocessIXBRL=self.preprocessIXBRL,
+                pruneRelationships=self.pruneRelationships,
+                omitTextValueSize=self.omitTextValueSize,
+            )
+            result.timings["process"] = time.perf_counter() - loaded
+            if viewer is None:
+                result.error = "Unable to create viewer"
+            return viewer
+        except Exception as ex:
+            result.error = str(ex)
+            self.cntlr.addToLog(f"Unable to create viewer for {filing.entryPoint}: {ex}", messageCode=ERROR_MESSAGE_CODE)
+            return None
+        finally:
+            if modelXbrl is not None:
+                modelManager.close(modelXbrl)
+
+    def saveViewer(self, viewer: iXBRLViewer, filing: BatchFiling, result: BatchResult) -> None:
+        start = time.perf_counter()
+        try:
+            if filing.destination.endswith(os.sep):
+                os.makedirs(filing.destination, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(filing.destination)), exist_ok=True)
+            viewer.save(filing.destination, zipOutput=filing.zipOutput, copyScriptPath=self.copyScriptPath)
+            result.success = True
+        except Exception as ex:
+            result.error = str(ex)
+            self.cntlr.addToLog(f"Unable to save viewer to {filing.destination}: {ex}", messageCode=ERROR_MESSAGE_CODE)
+        result.timings["save"] = time.perf_counter() - start
+
+    def clearLogBuffer(self) -> None:
+        # Validation messages are taken from the log buffer, so discard
+        # messages from previous filings.
+        logRecordBuffer = getattr(self.cntlr.logHandler, "logRecordBuffer", None)
+        if logRecordBuffer is not None:
+            logRecordBuffer.clear()
+
+
+def createController(packages: list[str]) -> Cntlr:
+    cntlr = Cntlr(hasGui=False)
+    cntlr.startLogging(
+        logFileName='logToPrint',
+        logFormat="[%(messageCode)s] %(message)s - %(file)s",
+        logLevel="INFO",
+        logToBuffer=True,
+    )
+    cntlr.modelManager.formulaOptions = FormulaOptions()
+    PluginManager.addPluginModule("inlineXbrlDocumentSet")
+    for p in packages:
+        if PackageManager.addPackage(cntlr, p):
+            cntlr.addToLog("Package added", messageCode=INFO_MESSAGE_CODE, file=p)
+        else:
+            cntlr.addToLog("Failed to load package", messageCode=ERROR_MESSAGE_CODE, file=p)
+    if packages:
+        PackageManager.rebuildRemappings(cntlr)
+    return cntlr
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Create iXBRL Viewers for a manifest of filings")
+    parser.add_argument("manifest", help="JSON file listing the filings to process and their destinations")
+    parser.add_argument("--package", action="append", default=[], help="Taxonomy package to load. May be repeated")
+    parser.add_argument("--package-dir", help="Directory containing taxonomy packages to load")
+    parser.add_argument("--viewer-url", default=DEFAULT_JS_FILENAME, help="URL to ixbrlviewer.js")
+    parser.add_argument("--copy-script", help="Path to a viewer script to copy alongside each viewer")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Maximum number of viewers to save concurrently")
+    parser.add_argument("--use-stub-viewer", action="store_true", help="Use stub viewer for faster loading of inspector (requires web server)")
+    parser.add_argument("--validation-messages", action="store_true", help="Validate filings and include validation messages in the viewers")
+    parser.add_argument("--compact-json", action="store_true", help="Write the viewer data without indentation")
+    parser.add_argument("--compact-facts", action="store_true", help="Encode facts using shared string tables to reduce the size of the viewer data")
+    parser.add_argument("--data-file", help="Save the viewer data as a separate file with the given name, alongside each viewer")
+    parser.add_argument("--data-gzip", action="store_true", help="Also save a gzip-compressed copy of the viewer data file")
+    parser.add_argument("--search-index", action="store_true", help="Build the viewer search index at generation time (requires the lunr package)")
+    parser.add_argument("--preprocess-ixbrl", action="store_true", help="Find the inline XBRL elements in each document when the viewer is generated")
+    parser.add_argument("--prune-relationships", action="store_true", help="Omit relationships and concepts that are not reachable from reported facts")
+    parser.add_argument("--omit-text-values", type=int, metavar="SIZE", help="Omit nonNumeric fact values of at least SIZE characters, which the viewer rebuilds from the document")
+    parser.add_argument("--label-languages", help="Comma-separated list of the languages of labels to include in the viewers. The default is all languages")
+    parser.add_argument("--taxonomy-pack", action="append", default=[], help="Taxonomy pack providing the data for the concepts in its namespace. May be repeated")
+    parser.add_argument("--taxonomy-pack-url", help="URL at which taxonomy packs are published, if not alongside each viewer's data")
+    parser.add_argument("--report", help="File to write per-filing timings to, as JSON")
+    featureGroup = parser.add_argument_group("Viewer Features", "See viewer README for information on enabling/disabling features.")
+    for featureConfig in FEATURE_CONFIGS:
+        arg = f'--viewer-feature-{featureConfig.key}'.replace('_', '-')
+        featureGroup.add_argument(
+            arg,
+            arg.lower(),
+            action=featureConfig.cliAction,
+            default=featureConfig.cliDefault,
+            help=featureConfig.description
+        )
+    args = parser.parse_args(argv)
+
+    filings = readManifest(args.manifest)
+    packages = list(args.package)
+    if args.package_dir:
+        packages.extend(sorted(glob.glob(os.path.join(args.package_dir, "*.zip"))))
+
+    cntlr = createController(packages)
+    generator = BatchViewerGenerator(
+        cntlr,
+        viewerURL=args.viewer_url,
+        copyScriptPath=Path(args.copy_script).resolve() if args.copy_script else None,
+        workers=args.workers,
+        features=getFeaturesFromOptions(args),
+        useStubViewer=args.use_stub_viewer,
+        showValidationMessages=args.validation_messages,
+        compactJSON=args.compact_json,
+        compactFacts=args.compact_facts,
+        dataFilename=args.data_file,
+        compressData=args.data_gzip,
+        searchIndex=args.search_index,
+        preprocessIXBRL=args.preprocess_ixbrl,
+        pruneRelationships=args.prune_relationships,
+        omitTextValueSize=args.omit_text_values,
+        taxonomyPacks=loadTaxonomyPacks(args.taxonomy_pack, args.taxonomy_pack_url),
+        labelLanguages=parseLabelLanguages(args.label_languages),
+    )
+    start = time.perf_counter()
+    results = generator.run(filings)
+    elapsed = time.perf_counter() - start
+
+    failures = sum(1 for r in results if not r.success)
+    cntlr.addToLog(f"Created {len(results) - failures} of {len(results)} viewers in {elapsed:.1f}s", messageCode=INFO_MESSAGE_CODE)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fout:
+            json.dump({"elapsed": elapsed, "filings": [r.asDict() for r in results]}, fout, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,314 @@
+# See COPYRIGHT.md for copyright information
+
+"""
+A persistent cache of generated viewers.
+
+Generating a viewer for unchanged inputs, with unchanged options, produces the
+same output, so the output can be saved and reused.  Entries are keyed by a
+hash of:
+
+ * the content of the local documents in each loaded model's DTS (including
+   the inline XBRL documents), and the URLs of remote documents,
+ * the options that affect the output, and
+ * the source of this plugin.
+
+Remote documents are identified by URL alone, as taxonomies published on the
+web are not changed once published.
+
+The cache directory contains a directory for each entry, holding the saved
+output files and an entry.json describing them.  The modification time of
+entry.json records when the entry was last used, and the least recently used
+entries are removed when the cache exceeds its maximum size.
+
+The cache can be inspected and purged from the command line:
+
+    python -m iXBRLViewerPlugin.cache /path/to/cache list
+    python -m iXBRLViewerPlugin.cache /path/to/cache purge
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from arelle.ModelXbrl import ModelXbrl
+from arelle.UrlUtil import isHttpUrl
+
+from .constants import DEFAULT_CACHE_SIZE
+
+ENTRY_FILENAME = 'entry.json'
+FILES_DIRNAME = 'files'
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hashFile(h: Any, path: str) -> None:
+    with open(path, 'rb') as fin:
+        while block := fin.read(HASH_BLOCK_SIZE):
+            h.update(block)
+
+
+def fileKey(path: str) -> str:
+    h = hashlib.sha256()
+    hashFile(h, path)
+    return h.hexdigest()
+
+
+def modelKey(modelXbrl: ModelXbrl) -> str:
+    """
+    Return a hash identifying the documents in a model's DTS.
+    """
+    h = hashlib.sha256()
+    fileSource = modelXbrl.fileSource
+    if fileSource is not None and fileSource.isArchive:
+        basefile = fileSource.basefile
+        if isinstance(basefile, str) and os.path.isfile(basefile):
+            # Documents in an archive can't be read directly, so hash the archive.
+            hashFile(h, basefile)
+    for url in sorted(modelXbrl.urlDocs):
+        h.update(url.encode('utf-8') + b'\0')
+        if not isHttpUrl(url) and os.path.isfile(url):
+            hashFile(h, url)
+    return h.hexdigest()
+
+
+def pluginFingerprint() -> str:
+    """
+    Return a hash of the source of this plugin, so that cached output is not
+    reused after the plugin is changed or upgraded.
+    """
+    h = hashlib.sha256()
+    pluginDir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(pluginDir)):
+        if name.endswith(('.py', '.html')):
+            h.update(name.encode('utf-8') + b'\0')
+            hashFile(h, os.path.join(pluginDir, name))
+    return h.hexdigest()
+
+
+def cacheKey(options: dict[str, Any], modelKeys: Iterable[str]) -> str:
+    """
+    Return the cache key for the given output options and model keys.
+    :param options: JSON-serializable options affecting the output.
+    """
+    h = hashlib.sha256()
+    h.update(pluginFingerprint().encode('utf-8'))
+    h.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    for key in modelKeys:
+        h.update(key.encode('utf-8'))
+    return h.hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    # Keys of the models from which the viewer was generated
+    modelKeys: list[str]
+    # Paths of the output files, relative to the output directory
+    files: list[str]
+    # For output saved to a file rather than a directory, the name of that
+    # file.  Other files are saved alongside it.
+    mainFile: str | None = None
+    size: int = 0
+    created: float = field(default_factory=time.time)
+    # Not stored in entry.json: the modification time of entry.json
+    lastUsed: float = 0.0
+
+    def asDict(self) -> dict[str, Any]:
+        d = asdict(self)
+        del d['lastUsed']
+        return d
+
+
+class ViewerCache:
+
+    def __init__(self, directory: str, maxSize: int | None = DEFAULT_CACHE_SIZE) -> None:
+        """
+        :param maxSize: Maximum total size of cached output, in bytes.  None for no limit.
+        """
+        self.directory = directory
+        self.maxSize = maxSize
+
+    def entryDirectory(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def readEntry(self, key: str) -> CacheEntry | None:
+        path = os.path.join(self.entryDirectory(key), ENTRY_FILENAME)
+        try:
+            with open(path, encoding='utf-8') as fin:
+                entry = CacheEntry(**json.load(fin))
+            entry.lastUsed = os.path.getmtime(path)
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry
+
+    def lookup(self, key: str) -> CacheEntry | None:
+        """
+        Return the entry for the given key, if there is one, and mark it as
+        recently used.
+        """
+        entry = self.readEntry(key)
+        if entry is not None:
+            try:
+                os.utime(os.path.join(self.entryDirectory(key), ENTRY_FILENAME))
+            except FileNotFoundError:
+                # Evicted by another process or thread since it was read
+                return None
+        return entry
+
+    def entries(self) -> list[CacheEntry]:
+        """
+        Return all entries, least recently used first.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        entries = (self.readEntry(key) for key in os.listdir(self.directory))
+        return sorted((e for e in entries if e is not None), key=lambda e: e.lastUsed)
+
+    def size(self) -> int:
+        return sum(e.size for e in self.entries())
+
+    def store(self, key: str, modelKeys: list[str], destination: str, savedFiles: list[str]) -> CacheEntry:
+        """
+        Store the output of a viewer saved to the given destination.
+        :param savedFiles: Paths of the files written when the viewer was saved.
+        """
+        if os.path.isdir(destination):
+            outputDir = os.path.abspath(destination)
+            mainFile = None
+        else:
+            outputDir = os.path.dirname(os.path.abspath(destination))
+            mainFile = os.path.basename(destination)
+        files = list(dict.fromkeys(os.path.relpath(os.path.abspath(p), outputDir) for p in savedFiles))
+        os.makedirs(self.directory, exist_ok=True)
+        # Build the entry in a temporary directory and move it into place, so
+        # that a partially written entry is never used.
+        tempDir = tempfile.mkdtemp(dir=self.directory, prefix='.tmp-')
+        try:
+            size = 0
+            for f in files:
+                dest = os.path.join(tempDir, FILES_DIRNAME, f)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                shutil.copy2(os.path.join(outputDir, f), dest)
+                size += os.path.getsize(dest)
+            entry = CacheEntry(key=key, modelKeys=modelKeys, files=files, mainFile=mainFile, size=size)
+            with open(os.path.join(tempDir, ENTRY_FILENAME), 'w', encoding='utf-8') as fout:
+                json.dump(entry.asDict(), fout, indent=1)
+            self.remove(key)
+            try:
+                os.replace(tempDir, self.entryDirectory(key))
+            except OSError:
+                # Another process or thread has stored the same key since it
+                # was removed, and its entry is equivalent to this one.
+                if (existing := self.readEntry(key)) is None:
+                    raise
+                shutil.rmtree(tempDir, ignore_errors=True)
+                return existing
+        except BaseException:
+            shutil.rmtree(tempDir, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+        return entry
+
+    def restore(self, entry: CacheEntry, destination: str, hardlink: bool = False) -> list[str]:
+        """
+        Copy the output of a cached entry to the given destination, returning
+        the paths written.
+        :param hardlink: True to hard link the output files to the cached
+            files, where possible, rather than copying them.  The output files
+            must not then be modified, as this would also modify the cache.
+        """
+        if entry.mainFile is None:
+            outputDir = destination
+        else:
+            outputDir = os.path.dirname(os.path.abspath(destination))
+        written = []
+        for f in entry.files:
+            src = os.path.join(self.entryDirectory(entry.key), FILES_DIRNAME, f)
+            if entry.mainFile is not None and f == entry.mainFile:
+                dest = os.path.abspath(destination)
+            else:
+                dest = os.path.join(outputDir, f)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            if os.path.lexists(dest):
+                os.remove(dest)
+            if hardlink:
+                try:
+                    os.link(src, dest)
+                except OSError:
+                    shutil.copy2(src, dest)
+            else:
+                shutil.copy2(src, dest)
+            written.append(dest)
+        return written
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(self.entryDirectory(key), ignore_errors=True)
+
+    def evict(self, keep: str | None = None) -> list[CacheEntry]:
+        """
+        Remove least recently used entries until the cache is within its
+        maximum size, returning the removed entries.
+        :param keep: Key of an entry not to remove.
+        """
+        if self.maxSize is None:
+            return []
+        entries = self.entries()
+        total = sum(e.size for e in entries)
+        removed = []
+        for entry in entries:
+            if total <= self.maxSize:
+                break
+            if entry.key == keep:
+                continue
+            self.remove(entry.key)
+            total -= entry.size
+            removed.append(entry)
+        return removed
+
+    def purge(self) -> list[CacheEntry]:
+        """
+        Remove all entries, returning the removed entries.
+        """
+        entries = self.entries()
+        for entry in entries:
+            self.remove(entry.key)
+        return entries
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or purge an iXBRL Viewer generation cache")
+    parser.add_argument("directory", help="Cache directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List cache entries, least recently used first")
+    purgeParser = subparsers.add_parser("purge", help="Remove cache entries")
+    purgeParser.add_argument("--max-size", type=float, help="Only remove least recently used entries until the cache is at most this many MB")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        cache = ViewerCache(args.directory, maxSize=None)
+        entries = cache.entries()
+        for entry in entries:
+            lastUsed = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.lastUsed))
+            print(f"{entry.key}  {entry.size:>12}  {lastUsed}  {entry.mainFile or ', '.join(entry.files)}")
+        print(f"{len(entries)} entries, {sum(e.size for e in entries)} bytes")
+    else:
+        if args.max_size is not None:
+            removed = ViewerCache(args.directory, maxSize=int(args.max_size * 1024 * 1024)).evict()
+        else:
+            removed = ViewerCache(args.directory).purge()
+        print(f"Removed {len(removed)} entries, {sum(e.size for e in removed)} bytes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
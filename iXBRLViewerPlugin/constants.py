@@ -8,6 +8,7 @@ from .featureConfig import FeatureConfig
 
 CONFIG_FEATURE_PREFIX = 'iXBRLViewerFeature_'
 CONFIG_FILE_DIRECTORY = 'iXBRLViewerFileDir'
+CONFIG_LABEL_LANGUAGES = 'iXBRLViewerLabelLanguages'
 CONFIG_LAUNCH_ON_LOAD = 'iXBRLViewerLaunchOnLoad'
 CONFIG_COPY_SCRIPT = 'iXBRLViewerCopyScript'
 CONFIG_OUTPUT_FILE = 'iXBRLViewerOutputFile'
@@ -22,6 +23,9 @@ DEFAULT_LAUNCH_ON_LOAD = True
 DEFAULT_COPY_SCRIPT = True
 DEFAULT_OUTPUT_NAME = 'ixbrlviewer.html'
 DEFAULT_JS_FILENAME = 'ixbrlviewer.js'
+DEFAULT_DATA_FILENAME = 'ixbrlviewer-data.json'
+# Default maximum size of the generated viewer cache, in bytes
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
 DEFAULT_VIEWER_PATH = os.path.join(os.path.dirname(__file__), "viewer", "dist", DEFAULT_JS_FILENAME)
 
 FEATURE_CONFIGS = [
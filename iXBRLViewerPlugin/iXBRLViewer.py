@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import gzip
 import io
 import json
 import logging
@@ -11,16 +12,18 @@ import re
 import shutil
 import urllib.parse
 import zipfile
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
 from pathlib import Path
-from typing import Any, Literal, NamedTuple, cast
+from typing import IO, Any, Literal, NamedTuple, TypeVar, cast
 
 from arelle import XbrlConst
 from arelle.Cntlr import Cntlr
 from arelle.ModelDocument import ModelDocument, Type
-from arelle.ModelDtsObject import ModelConcept, ModelResource, ModelRoleType
-from arelle.ModelInstanceObject import ModelInlineFact, ModelUnit
+from arelle.ModelDtsObject import ModelConcept, ModelRelationship, ModelResource, ModelRoleType
+from arelle.ModelInstanceObject import ModelContext, ModelInlineFact, ModelUnit
 from arelle.ModelRelationshipSet import ModelRelationshipSet
 from arelle.ModelValue import INVALIDixVALUE, QName
 from arelle.ModelXbrl import ModelXbrl
@@ -36,7 +39,14 @@ from .constants import (
     INFO_MESSAGE_CODE,
     MANDATORY_FACTS,
 )
-from .xhtmlserialize import XHTMLSerializer
+from .preprocess import continuationChains, documentItems
+from .profiling import StageProfiler
+from .prune import pruneTargetReport
+from .progress import GenerationProgress
+from .searchindex import SearchIndexBuilder, isLunrAvailable
+from .taxonomypack import TAXONOMY_PACK_FORMAT, TaxonomyPack
+from .xhtmlserialize import TextWriter, XHTMLSerializer
+from .ziputil import CompressedMember, compressMember, compressTypeForFilename, copyZipMember, writeCompressedMember
 
 REPORT_TYPE_EXTENSIONS = ('.xbrl', '.xhtml', '.html', '.htm', '.json')
 UNRECOGNIZED_LINKBASE_LOCAL_DOCUMENTS_TYPE = 'unrecognizedLinkbase'
@@ -50,11 +60,41 @@ LINK_QNAME_TO_LOCAL_DOCUMENTS_LINKBASE_TYPE = {
 
 WIDER_NARROWER_ARCROLE = 'http://www.esma.europa.eu/xbrl/esef/arcrole/wider-narrower'
 
+DEFAULT_CONCEPT_CACHE_SIZE = 100000
+
+# Approximate size of the chunks in which viewer JSON is written out
+JSON_CHUNK_SIZE = 1024 * 1024
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
 
 def isInlineDoc(doc: ModelDocument | None) -> bool:
     return doc is not None and doc.type in {Type.INLINEXBRL, Type.INLINEXBRLDOCUMENTSET}
 
 
+def mapConcurrently(fn: Callable[[T], R], items: Iterable[T], workers: int) -> Iterator[R]:
+    """
+    Apply fn to each item using a pool of up to `workers` threads, yielding
+    the results in order.  At most `workers` results are held waiting to be
+    consumed, bounding the memory used by results such as serialized files.
+    If workers is 1 or less, items are processed serially on the calling
+    thread.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future[R]] = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
 class NamespaceMap:
     """
     Class for building a 1:1 map of prefixes to namespace URIs
@@ -133,6 +173,73 @@ class LabelData(NamedTuple):
     labelRole: str
 
 
+def parseLabelLanguages(value: str | None) -> list[str] | None:
+    """
+    Parse a comma or space separated list of label languages.  Returns None,
+    meaning that labels in all languages are included, if the list is empty.
+    """
+    languages = [lang.lower() for lang in re.split(r'[\s,]+', value or '') if lang]
+    return languages or None
+
+
+class ConceptCacheEntry(NamedTuple):
+    data: dict[str, Any]
+    labelRoles: tuple[str, ...]
+    typedDomainQName: QName | None
+
+
+# Identifies the DTS of a report, by the URLs of its taxonomy documents
+DTSKey = frozenset[str]
+
+
+class ConceptCache:
+    """
+    LRU cache of concept payloads, keyed by DTS and concept QName.
+
+    A single cache is shared by all target reports processed by a builder so
+    that labels, references and type information for a concept are only
+    extracted once, regardless of how many facts, dimensions or relationships
+    refer to it.  Reports with different DTSes, such as filings with their
+    own extension taxonomies, may have different labels for the same
+    concept, so have separate entries.
+    """
+
+    def __init__(self, maxSize: int | None = DEFAULT_CONCEPT_CACHE_SIZE) -> None:
+        """
+        :param maxSize: Maximum number of concepts to retain.  None for no limit, 0 to disable caching.
+        """
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[DTSKey, QName], ConceptCacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, dts: DTSKey, qname: QName) -> ConceptCacheEntry | None:
+        entry = self._entries.get((dts, qname))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end((dts, qname))
+        return entry
+
+    def put(self, dts: DTSKey, qname: QName, entry: ConceptCacheEntry) -> None:
+        if self.maxSize == 0:
+            return
+        self._entries[(dts, qname)] = entry
+        self._entries.move_to_end((dts, qname))
+        if self.maxSize is not None:
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 class IXBRLViewerBuilder:
 
     def __init__(
@@ -141,7 +248,32 @@ class IXBRLViewerBuilder:
         basenameSuffix: str = "",
         useStubViewer: bool = False,
         features: dict[str, Any] | None = None,
+        conceptCacheSize: int | None = DEFAULT_CONCEPT_CACHE_SIZE,
+        copyDocuments: bool = True,
+        profiler: StageProfiler | None = None,
+        searchIndex: bool = False,
+        progress: GenerationProgress | None = None,
+        taxonomyPacks: Iterable[TaxonomyPack] = (),
+        labelLanguages: Iterable[str] | None = None,
     ):
+        """
+        :param copyDocuments: True to copy each source document when it is
+            processed.  This is required if the model will be closed before
+            the viewer is saved.  If False, the source documents are
+            serialized directly, and are not modified other than to add IDs
+            to facts.
+        :param profiler: Optional profiler to record statistics for each
+            stage of generation.
+        :param searchIndex: True to build the viewer's search index at
+            generation time, rather than in the browser.
+        :param progress: Optional receiver of progress updates, through which
+            generation may be cancelled.
+        :param taxonomyPacks: Taxonomy packs from which the viewer takes the
+            data for concepts in their namespaces.
+        :param labelLanguages: If provided, the languages of the concept and
+            role labels to include.  A language also matches its subtags, so
+            "en" includes "en-gb".  See selectLabelLanguages.
+        """
         if features is None:
             features = {}
         featureNames = {c.key for c in FEATURE_CONFIGS}
@@ -151,12 +283,29 @@ class IXBRLViewerBuilder:
         self.reportZip: str | None = None
         self.nsmap = NamespaceMap()
         self.roleMap = NamespaceMap()
+        self.conceptCache = ConceptCache(conceptCacheSize)
+        self._dtsKeyReport: ModelXbrl | None = None
+        self._dtsKey: DTSKey = frozenset()
+        self.taxonomyPacks = {pack.namespace: pack for pack in taxonomyPacks}
+        self.labelLanguages = tuple(lang.lower() for lang in labelLanguages) if labelLanguages is not None else None
+        self.copyDocuments = copyDocuments
+        self.profiler = profiler if profiler is not None else StageProfiler(enabled=False)
+        self.searchIndex = SearchIndexBuilder() if searchIndex else None
+        self.progress = progress if progress is not None else GenerationProgress()
         self.taxonomyData: dict[str, Any] = {
             "sourceReports": [],
             "features": features,
         }
         self.basenameSuffix = basenameSuffix
         self.currentTargetReport: dict[str, Any] | None = None
+        # Aspects derived from contexts and units, keyed by ID.  IDs are only
+        # unique within a report, so these are reset for each target report.
+        self.entityAspectCache: dict[str, str] = {}
+        self.contextAspectCache: dict[str, dict[str, Any]] = {}
+        self.unitAspectCache: dict[str, str] = {}
+        # IDs of the footnotes and facts that each fact in the current report
+        # is linked to by footnote relationships.
+        self.footnoteMap: dict[str, list[str]] = {}
         self.useStubViewer = useStubViewer
         self.cntlr = cntlr
 
@@ -170,7 +319,7 @@ class IXBRLViewerBuilder:
         self.roleMap.getPrefix(WIDER_NARROWER_ARCROLE, "w-n")
 
         self.sourceReportsByFiles: dict[frozenset[str], dict[str, Any]] = {}
-        self.iv = iXBRLViewer(cntlr)
+        self.iv = iXBRLViewer(cntlr, self.profiler, self.progress)
         if self.useStubViewer:
             self.iv.addFile(iXBRLViewerFile(DEFAULT_OUTPUT_NAME, self.getStubDocument()))
 
@@ -218,6 +367,25 @@ class IXBRLViewerBuilder:
             return None
         return LabelData(lang.lower(), resource.stringValue.strip(), labelRole)
 
+    def isLabelLanguage(self, lang: str) -> bool:
+        assert self.labelLanguages is not None
+        return any(lang == selected or lang.startswith(selected + "-") for selected in self.labelLanguages)
+
+    def selectLabelLanguages(self, labels: dict[str, str]) -> dict[str, str]:
+        """
+        Return the labels, keyed by language, that are in the languages to be
+        included.  If there are none, the label that the viewer falls back on
+        when no label is in the selected language (English, or the first
+        language in order) is kept, so that every role still has a label.
+        """
+        if self.labelLanguages is None:
+            return labels
+        selected = {lang: label for lang, label in labels.items() if self.isLabelLanguage(lang)}
+        if not selected and labels:
+            lang = next((fallback for fallback in ("en", "en-us") if fallback in labels), min(labels))
+            selected[lang] = labels[lang]
+        return selected
+
     def getLabelsForRoleType(
         self, report: ModelXbrl, roleType: ModelRoleType
     ) -> dict[str, str]:
@@ -263,64 +431,220 @@ class IXBRLViewerBuilder:
                 label_by_lang
             )
 
+        if prefix in self.currentTargetReport["roleDefs"]:
+            self.currentTargetReport["roleDefs"][prefix] = self.selectLabelLanguages(
+                self.currentTargetReport["roleDefs"][prefix]
+            )
+
     def addConcept(self, report: ModelXbrl, concept: ModelConcept | None, dimensionType: str | None = None) -> None:
         if concept is None or concept.qname is None:
             return
-        labelsRelationshipSet = report.relationshipSet(XbrlConst.conceptLabel)
-        labels = labelsRelationshipSet.fromModelObject(concept)
         conceptName = self.nsmap.qname(concept.qname)
         assert self.currentTargetReport is not None, "Current target report must be set to add concept"
-        if conceptName not in self.currentTargetReport["concepts"]:
-            conceptData: dict[str, Any] = {
-                "labels": {  }
+        if conceptName in self.currentTargetReport["concepts"]:
+            return
+
+        dts = self.dtsKey(report)
+        entry = self.conceptCache.get(dts, concept.qname)
+        if entry is None:
+            entry = self.getConceptData(report, concept)
+            self.conceptCache.put(dts, concept.qname, entry)
+
+        # Role definitions are per target report, so need adding even if the
+        # concept data came from the cache.
+        for labelRole in entry.labelRoles:
+            self.addRoleDefinition(report, labelRole)
+
+        # Each target report has its own copy, so that changes made to one
+        # report's data don't affect others.
+        conceptData = deepcopy(entry.data)
+        if dimensionType is not None:
+            conceptData["d"] = dimensionType
+
+        if entry.typedDomainQName is not None:
+            # The cached entry may come from another model with the same DTS,
+            # so the domain element is looked up in this one.
+            self.addConcept(report, report.qnameConcepts.get(entry.typedDomainQName))
+
+        self.currentTargetReport["concepts"][conceptName] = conceptData
+
+    def dtsKey(self, report: ModelXbrl) -> DTSKey:
+        """
+        Return the key identifying the DTS of a report in the concept cache.
+        Target reports of a document set are separate models, but share a
+        DTS, so share cache entries.
+        """
+        if report is not self._dtsKeyReport:
+            self._dtsKey = frozenset(
+                url for url, doc in report.urlDocs.items()
+                if not isInlineDoc(doc)
+            )
+            self._dtsKeyReport = report
+        return self._dtsKey
+
+    def getConceptData(self, report: ModelXbrl, concept: ModelConcept) -> ConceptCacheEntry:
+        """
+        Extract the label, reference and type information for a concept.
+        The result depends only on the DTS, so can be shared between target
+        reports with the same DTS via the concept cache.
+
+        If the concept is in a taxonomy pack, only a reference to the pack,
+        and the labels and references from linkbases outside the pack, are
+        included.
+        """
+        labelRels, refRels = self.conceptResourceRelationships(report, concept)
+        qname = concept.qname
+        pack = self.taxonomyPacks.get(qname.namespaceURI) if qname is not None and qname.namespaceURI is not None else None
+        if qname is not None and pack is not None:
+            fromPack = [r for r in labelRels + refRels if r.modelDocument.uri in pack.linkbases]
+            # If relationships in the pack have been prohibited, the pack's
+            # data can't be used.
+            if len(fromPack) == pack.relationshipCounts.get(qname.localName):
+                return self.conceptDataFromRelationships(
+                    concept,
+                    [r for r in labelRels if r.modelDocument.uri not in pack.linkbases],
+                    [r for r in refRels if r.modelDocument.uri not in pack.linkbases],
+                    packIndex=self.taxonomyPackIndex(pack),
+                )
+        return self.conceptDataFromRelationships(concept, labelRels, refRels)
+
+    def conceptResourceRelationships(
+            self,
+            report: ModelXbrl,
+            concept: ModelConcept,
+    ) -> tuple[list[ModelRelationship], list[ModelRelationship]]:
+        """
+        Return the label and reference relationships of a concept.
+        """
+        labelRels = [
+            lr for lr in report.relationshipSet(XbrlConst.conceptLabel).fromModelObject(concept)
+            if isinstance(lr.toModelObject, ModelResource)
+        ]
+        refRels = []
+        if concept.modelXbrl is not None:
+            refRels = [
+                rr for rr in concept.modelXbrl.relationshipSet(XbrlConst.conceptReference).fromModelObject(concept)
+                if isinstance(rr.toModelObject, ModelResource)
+            ]
+        return labelRels, refRels
+
+    def conceptDataFromRelationships(
+            self,
+            concept: ModelConcept,
+            labelRels: list[ModelRelationship],
+            refRels: list[ModelRelationship],
+            packIndex: int | None = None,
+    ) -> ConceptCacheEntry:
+        """
+        :param packIndex: If provided, the index of the taxonomy pack holding
+            the concept's data, which is given instead of its type
+            information.
+        """
+        conceptData: dict[str, Any] = {
+            "labels": {  }
+        }
+        labelRoles: list[str] = []
+        for lr in labelRels:
+            if (result := self.getLabelData(cast(ModelResource, lr.toModelObject))) is None:
+                continue
+            conceptData["labels"].setdefault(
+                self.roleMap.getPrefix(result.labelRole), {}
+            )[result.lang] = result.value
+            if result.labelRole not in labelRoles:
+                labelRoles.append(result.labelRole)
+        if self.labelLanguages is not None:
+            conceptData["labels"] = {
+                role: self.selectLabelLanguages(labels)
+                for role, labels in conceptData["labels"].items()
             }
-            for lr in labels:
-                if not isinstance(lr.toModelObject, ModelResource):
-                    continue
-                if (result := self.getLabelData(lr.toModelObject)) is None:
-                    continue
-                conceptData["labels"].setdefault(
-                    self.roleMap.getPrefix(result.labelRole), {}
-                )[result.lang] = result.value
-                self.addRoleDefinition(report, result.labelRole)
 
-            refData = []
-            if concept.modelXbrl is not None:
-                for _refRel in concept.modelXbrl.relationshipSet(XbrlConst.conceptReference).fromModelObject(concept):
-                    if not isinstance(_refRel.toModelObject, ModelResource):
-                        continue
-                    currentRef = _refRel.toModelObject
-                    ref = []
-                    for _refPart in currentRef.iterchildren():
-                        ref.append([_refPart.localName, _refPart.stringValue.strip()])
-                    refData.append(ref)
+        refData = []
+        for _refRel in refRels:
+            currentRef = cast(ModelResource, _refRel.toModelObject)
+            ref = []
+            for _refPart in currentRef.iterchildren():
+                ref.append([_refPart.localName, _refPart.stringValue.strip()])
+            refData.append(ref)
+
+        if len(refData) > 0:
+            conceptData['r'] = refData
 
-            if len(refData) > 0:
-                conceptData['r'] = refData
+        typedDomainQName = None
+        if concept.isTypedDimension:
+            domainElement = concept.typedDomainElement
+            if isinstance(domainElement, ModelConcept) and domainElement.qname is not None:
+                typedDomainQName = domainElement.qname
 
-            if dimensionType is not None:
-                conceptData["d"] = dimensionType
+        if concept.isEnumeration:
+            conceptData["e"] = True
 
-            if concept.isEnumeration:
-                conceptData["e"] = True
+        if typedDomainQName is not None:
+            conceptData['td'] = self.nsmap.qname(typedDomainQName)
 
-            if concept.isTextBlock:
-                conceptData['t'] = True
+        if packIndex is not None:
+            # The rest of the type information is in the pack.  Enumerations
+            # and typed domains are needed when the viewer data is pruned.
+            conceptData["p"] = packIndex
+            if not conceptData["labels"]:
+                del conceptData["labels"]
+            return ConceptCacheEntry(conceptData, tuple(labelRoles), typedDomainQName)
 
-            if concept.balance is not None:
-                conceptData['b'] = concept.balance
+        if concept.isTextBlock:
+            conceptData['t'] = True
 
-            if concept.type is not None and concept.type.qname is not None:
-                conceptData['dt'] = self.nsmap.qname(concept.type.qname)
+        if concept.balance is not None:
+            conceptData['b'] = concept.balance
 
-            if concept.isTypedDimension:
-                typedDomainElement = concept.typedDomainElement
-                if isinstance(typedDomainElement, ModelConcept) and typedDomainElement.qname is not None:
-                    typedDomainName = self.nsmap.qname(typedDomainElement.qname)
-                    conceptData['td'] = typedDomainName
-                    self.addConcept(report, typedDomainElement)
+        if concept.type is not None and concept.type.qname is not None:
+            conceptData['dt'] = self.nsmap.qname(concept.type.qname)
 
-            self.currentTargetReport["concepts"][conceptName] = conceptData
+        return ConceptCacheEntry(conceptData, tuple(labelRoles), typedDomainQName)
+
+    def taxonomyPackIndex(self, pack: TaxonomyPack) -> int:
+        """
+        Return the index of a taxonomy pack in the viewer data, adding it if
+        it hasn't been used yet.
+        """
+        packs = self.taxonomyData.setdefault("taxonomyPacks", [])
+        for i, packData in enumerate(packs):
+            if packData["namespace"] == pack.namespace:
+                return i
+        packs.append({"namespace": pack.namespace, "url": pack.url})
+        return len(packs) - 1
+
+    def createTaxonomyPack(self, report: ModelXbrl, namespace: str) -> dict[str, Any]:
+        """
+        Create a taxonomy pack of the data for the concepts in a namespace.
+        See taxonomypack.py.
+        """
+        self.nsmap.stashReportNSMap(report)
+        # Role definitions of label roles are collected as for a target report
+        self.currentTargetReport = self.newTargetReport(None)
+        concepts = {}
+        relationshipCounts = {}
+        linkbases: set[str] = set()
+        for qname, concept in report.qnameConcepts.items():
+            if qname.namespaceURI != namespace:
+                continue
+            labelRels, refRels = self.conceptResourceRelationships(report, concept)
+            entry = self.conceptDataFromRelationships(concept, labelRels, refRels)
+            for labelRole in entry.labelRoles:
+                self.addRoleDefinition(report, labelRole)
+            concepts[qname.localName] = entry.data
+            relationshipCounts[qname.localName] = len(labelRels) + len(refRels)
+            linkbases.update(r.modelDocument.uri for r in labelRels + refRels)
+        roleDefs = self.currentTargetReport.get("roleDefs", {})
+        self.currentTargetReport = None
+        return {
+            "format": TAXONOMY_PACK_FORMAT,
+            "namespace": namespace,
+            "prefixes": self.nsmap.prefixmap,
+            "roles": self.roleMap.prefixmap,
+            "roleDefs": roleDefs,
+            "concepts": concepts,
+            "linkbases": sorted(linkbases),
+            "relationshipCounts": relationshipCounts,
+        }
 
     def treeWalk(self, rels: ModelRelationshipSet, item: Any, indent: int = 0) -> None:
         for r in rels.fromModelObject(item):
@@ -337,28 +661,47 @@ class IXBRLViewerBuilder:
             XbrlConst.parentChild,
             XbrlConst.dimensionDefault,
         }
-        for baseSetKey in report.baseSets:
-            arcrole, ELR, _linkqname, _arcqname = baseSetKey
-            if ELR is not None and arcrole in arcroles:
-                self.addRoleDefinition(report, ELR)
-                rr: dict[str, list[dict[str, str | float]]] = {}
-                relSet = report.relationshipSet(arcrole, ELR)
-                for r in relSet.modelRelationships:
-                    if not isinstance(r.fromModelObject, ModelConcept) or not isinstance(r.toModelObject, ModelConcept):
-                        continue
-                    if r.fromModelObject.qname is None or r.toModelObject.qname is None:
-                        continue
-                    fromKey = self.nsmap.qname(r.fromModelObject.qname)
-                    rel: dict[str, str | float] = {
-                        "t": self.nsmap.qname(r.toModelObject.qname),
-                    }
-                    if r.weight is not None:
-                        rel['w'] = r.weight
-                    rr.setdefault(fromKey, []).append(rel)
-                    self.addConcept(report, r.toModelObject)
-                    self.addConcept(report, r.fromModelObject)
-
-                rels.setdefault(self.roleMap.getPrefix(arcrole), {})[self.roleMap.getPrefix(ELR)] = rr
+        # Arelle records each base set under several keys (with and without
+        # the link and arc element names), so find the distinct arcrole/ELR
+        # pairs first, in order of first appearance.
+        relSetKeys = dict.fromkeys(
+            (arcrole, ELR)
+            for arcrole, ELR, _linkqname, _arcqname in report.baseSets
+            if ELR is not None and arcrole in arcroles
+        )
+        # Concepts are typically the endpoints of many relationships, so only
+        # resolve their names and add them to the report once.
+        conceptNames: dict[ModelConcept, str] = {}
+
+        for arcrole, ELR in relSetKeys:
+            self.addRoleDefinition(report, ELR)
+            rr: dict[str, list[dict[str, str | float]]] = {}
+            relSet = report.relationshipSet(arcrole, ELR)
+            for r in relSet.modelRelationships:
+                fromConcept = r.fromModelObject
+                toConcept = r.toModelObject
+                if not isinstance(fromConcept, ModelConcept) or not isinstance(toConcept, ModelConcept):
+                    continue
+                if fromConcept.qname is None or toConcept.qname is None:
+                    continue
+                if (fromKey := conceptNames.get(fromConcept)) is None:
+                    fromKey = conceptNames[fromConcept] = self.nsmap.qname(fromConcept.qname)
+                    newFrom = True
+                else:
+                    newFrom = False
+                if (toKey := conceptNames.get(toConcept)) is None:
+                    toKey = conceptNames[toConcept] = self.nsmap.qname(toConcept.qname)
+                    self.addConcept(report, toConcept)
+                if newFrom:
+                    self.addConcept(report, fromConcept)
+                rel: dict[str, str | float] = {
+                    "t": toKey,
+                }
+                if r.weight is not None:
+                    rel['w'] = r.weight
+                rr.setdefault(fromKey, []).append(rel)
+
+            rels.setdefault(self.roleMap.getPrefix(arcrole), {})[self.roleMap.getPrefix(ELR)] = rr
         return rels
 
     def validationErrors(self) -> list[dict[str, str]]:
@@ -387,11 +730,10 @@ class IXBRLViewerBuilder:
         conceptName = self.nsmap.qname(f.qname)
         factList = MANDATORY_FACTS.get(self.taxonomyData["features"].get("mandatory_facts"), [])
         isMandatory = f.qname.localName in factList
-        scheme, ident = f.context.entityIdentifier
 
         aspects = {
             "c": conceptName,
-            "e": self.nsmap.qname(QName(self.nsmap.getPrefix(scheme,"e"), scheme, ident)),
+            "e": self.entityAspect(f.context),
             "m": isMandatory
         }
 
@@ -422,7 +764,7 @@ class IXBRLViewerBuilder:
 
         if f.isNumeric:
             if f.unit is not None and len(f.unit.measures[0]):
-                aspects['u'] = self.oimUnitString(f.unit)
+                aspects['u'] = self.unitAspect(f.unit)
             else:
                 # The presence of the unit aspect is used by the viewer to
                 # identify numeric facts.  If the fact has no unit (invalid
@@ -433,7 +775,34 @@ class IXBRLViewerBuilder:
             if d != float("INF") and not math.isnan(d):
                 factData["d"] = d
 
-        for v in f.context.qnameDims.values():
+        aspects.update(self.contextAspects(report, f.context))
+
+        assert self.currentTargetReport is not None, "Current target report must be set to add fact"
+        self.currentTargetReport["facts"][f.id] = factData
+        footnoteIds = self.footnoteMap.get(f.id) if f.id is not None else None
+        if footnoteIds:
+            self.currentTargetReport["footnotes"][f.id] = footnoteIds
+        self.addConcept(report, f.concept)
+
+    def entityAspect(self, context: ModelContext) -> str:
+        if context.id is not None and (entity := self.entityAspectCache.get(context.id)) is not None:
+            return entity
+        scheme, ident = context.entityIdentifier
+        entity = self.nsmap.qname(QName(self.nsmap.getPrefix(scheme, "e"), scheme, ident))
+        if context.id is not None:
+            self.entityAspectCache[context.id] = entity
+        return entity
+
+    def contextAspects(self, report: ModelXbrl, context: ModelContext) -> dict[str, Any]:
+        """
+        Return the dimension and period aspects of a context.  Dimension
+        concepts are added to the current target report when a context is
+        first seen.
+        """
+        if context.id is not None and (cached := self.contextAspectCache.get(context.id)) is not None:
+            return cached
+        aspects: dict[str, Any] = {}
+        for v in context.qnameDims.values():
             if v.dimensionQname is None:
                 continue
             if v.memberQname is not None:
@@ -444,22 +813,82 @@ class IXBRLViewerBuilder:
                 aspects[self.nsmap.qname(v.dimensionQname)] = v.typedMember.text
                 self.addConcept(report, v.dimension, dimensionType = "t")
 
-        if f.context.isForeverPeriod:
+        if context.isForeverPeriod:
             aspects["p"] = "f"
-        elif f.context.isInstantPeriod and f.context.instantDatetime is not None:
-            aspects["p"] = self.dateFormat(f.context.instantDatetime.isoformat())
-        elif f.context.isStartEndPeriod and f.context.startDatetime is not None and f.context.endDatetime is not None:
-            aspects["p"] = f"{self.dateFormat(f.context.startDatetime.isoformat())}/{self.dateFormat(f.context.endDatetime.isoformat())}"
+        elif context.isInstantPeriod and context.instantDatetime is not None:
+            aspects["p"] = self.dateFormat(context.instantDatetime.isoformat())
+        elif context.isStartEndPeriod and context.startDatetime is not None and context.endDatetime is not None:
+            aspects["p"] = f"{self.dateFormat(context.startDatetime.isoformat())}/{self.dateFormat(context.endDatetime.isoformat())}"
+        if context.id is not None:
+            self.contextAspectCache[context.id] = aspects
+        return aspects
+
+    def unitAspect(self, unit: ModelUnit) -> str:
+        if unit.id is not None and (unitString := self.unitAspectCache.get(unit.id)) is not None:
+            return unitString
+        unitString = self.oimUnitString(unit)
+        if unit.id is not None:
+            self.unitAspectCache[unit.id] = unitString
+        return unitString
+
+    def compactFactData(self, facts: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        """
+        Encode the facts of a target report in compact form.  Aspect names
+        and string aspect values, which are heavily repeated between facts,
+        are stored once in a string table.  Each fact is encoded as:
 
-        frels = self.footnoteRelationshipSet.fromModelObject(f)
-        if frels:
-            for frel in frels:
-                if frel.toModelObject is not None:
-                    factData.setdefault("fn", []).append(frel.toModelObject.id)
+            [ id, [ name, value, name, value, ... ], { other fact properties } ]
 
-        assert self.currentTargetReport is not None, "Current target report must be set to add fact"
-        self.currentTargetReport["facts"][f.id] = factData
-        self.addConcept(report, f.concept)
+        where aspect names and string values are indices into the string
+        table, and other values (null units, mandatory flags) are included
+        as is.
+        """
+        strings: list[str] = []
+        stringIndex: dict[str, int] = {}
+
+        def intern(s: str) -> int:
+            if (i := stringIndex.get(s)) is None:
+                i = len(strings)
+                stringIndex[s] = i
+                strings.append(s)
+            return i
+
+        encoded = []
+        for factId, factData in facts.items():
+            aspects: list[Any] = []
+            for name, value in factData["a"].items():
+                aspects.append(intern(name))
+                aspects.append(intern(value) if isinstance(value, str) else value)
+            encoded.append([factId, aspects, {k: v for k, v in factData.items() if k != "a"}])
+        return {
+            "strings": strings,
+            "facts": encoded,
+        }
+
+    def omitTextValues(self, targetReport: dict[str, Any], minSize: int) -> int:
+        """
+        Omit the values of nonNumeric facts of at least minSize characters,
+        which the viewer rebuilds from the fact's IX elements in the document.
+        The omitted value is replaced by an "ov" flag.  Values that can't be
+        rebuilt from the document, such as those of facts with a
+        transformation format or an enumeration concept, are kept.
+        :return: The number of characters omitted.
+        """
+        concepts = targetReport.get("concepts", {})
+        omitted = 0
+        for factData in targetReport.get("facts", {}).values():
+            value = factData.get("v")
+            if (not isinstance(value, str)
+                    or len(value) < minSize
+                    or "u" in factData["a"]
+                    or "f" in factData
+                    or "err" in factData
+                    or concepts.get(factData["a"]["c"], {}).get("e")):
+                continue
+            del factData["v"]
+            factData["ov"] = True
+            omitted += len(value)
+        return omitted
 
     def oimUnitString(self, unit: ModelUnit) -> str:
         """
@@ -482,9 +911,44 @@ class IXBRLViewerBuilder:
                 return f"{numeratorsString}/{denominatorsString}"
         return numeratorsString
 
-    def addViewerData(self, viewerFile: 'iXBRLViewerFile', scriptUrl: str) -> bool:
-        taxonomyDataJSON = self.escapeJSONForScriptTag(json.dumps(self.taxonomyData, indent=1, allow_nan=False))
-
+    def taxonomyDataJSON(self, compact: bool = False, escape: bool = True) -> Iterator[str]:
+        """
+        Encode the taxonomy data as JSON, escaped for inclusion in a script
+        tag, yielding it in chunks of roughly JSON_CHUNK_SIZE characters so
+        that the full JSON document is never held in memory.
+        :param compact: True to omit indentation and whitespace between tokens.
+        :param escape: False to skip escaping, for JSON written to a separate file.
+        """
+        if compact:
+            encoder = json.JSONEncoder(separators=(',', ':'), allow_nan=False)
+        else:
+            encoder = json.JSONEncoder(indent=1, allow_nan=False)
+        chunks: list[str] = []
+        size = 0
+        for chunk in encoder.iterencode(self.taxonomyData):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= JSON_CHUNK_SIZE:
+                yield self.escapeJSONForScriptTag(''.join(chunks)) if escape else ''.join(chunks)
+                chunks.clear()
+                size = 0
+        if chunks:
+            yield self.escapeJSONForScriptTag(''.join(chunks)) if escape else ''.join(chunks)
+
+    def addViewerData(
+            self,
+            viewerFile: 'iXBRLViewerFile',
+            scriptUrl: str,
+            compactJSON: bool = False,
+            dataUrl: str | None = None,
+    ) -> bool:
+        """
+        Add the viewer script tags to the body of the given file.  The JSON
+        data is not added to the document tree, but is streamed into the
+        output when the file is serialized.
+        :param dataUrl: If provided, the data script tag references the JSON
+            data at this URL rather than containing it.
+        """
         for child in viewerFile.xmlDocument.getroot():
             if child.tag == '{http://www.w3.org/1999/xhtml}body':
                 for body_child in child:
@@ -492,13 +956,14 @@ class IXBRLViewerBuilder:
                         self.cntlr.addToLog("File already contains iXBRL viewer", messageCode="error")
                         return False
 
-                child.append(etree.Comment("BEGIN IXBRL VIEWER EXTENSIONS"))
+                parent = viewerFile.appendTarget(child)
+                parent.append(etree.Comment("BEGIN IXBRL VIEWER EXTENSIONS"))
 
                 # Insert <script> tags, and make sure that they are in the
                 # default namespace, so that browsers in HTML mode will find
                 # them.
                 nsmap = { None: "http://www.w3.org/1999/xhtml" }
-                e = etree.SubElement(child, "{http://www.w3.org/1999/xhtml}script", nsmap = nsmap)
+                e = etree.SubElement(parent, "{http://www.w3.org/1999/xhtml}script", nsmap = nsmap)
                 e.set("type", "text/javascript")
                 e.set("src", scriptUrl)
                 # Don't self close
@@ -506,21 +971,56 @@ class IXBRLViewerBuilder:
 
                 # Putting this in the header can interfere with character set
                 # auto detection due to its length
-                e = etree.SubElement(child, "{http://www.w3.org/1999/xhtml}script", nsmap = nsmap)
+                e = etree.SubElement(parent, "{http://www.w3.org/1999/xhtml}script", nsmap = nsmap)
                 e.set("type", "application/x.ixbrl-viewer+json")
-                e.text = taxonomyDataJSON
-                child.append(etree.Comment("END IXBRL VIEWER EXTENSIONS"))
+                e.text = ''
+                if dataUrl is not None:
+                    e.set("src", dataUrl)
+                else:
+                    viewerFile.textWriters[e] = lambda: self.taxonomyDataJSON(compact=compactJSON)
+                parent.append(etree.Comment("END IXBRL VIEWER EXTENSIONS"))
                 return True
         return False
 
+    def hiddenFactIds(self, report: ModelXbrl) -> set[str]:
+        """
+        Return the IDs of the facts in the current target report that are in
+        ix:hidden.
+        """
+        facts = self.currentTargetReport["facts"] if self.currentTargetReport is not None else {}
+        hiddenTags = (f"{{{XbrlConst.ixbrl}}}hidden", f"{{{XbrlConst.ixbrl11}}}hidden")
+        return {
+            factId
+            for doc in report.urlDocs.values()
+            if doc.type == Type.INLINEXBRL and doc.xmlRootElement is not None
+            for hidden in doc.xmlRootElement.iter(*hiddenTags)
+            for e in hidden.iterdescendants()
+            if (factId := e.get("id")) is not None and factId in facts
+        }
+
     def getStubDocument(self) -> etree._ElementTree[etree._Element]:
         with open(os.path.join(os.path.dirname(__file__),"stubviewer.html")) as fin:
             return etree.parse(fin)
 
+    def getFootnoteMap(self, report: ModelXbrl) -> dict[str, list[str]]:
+        """
+        Return a map of fact IDs to the IDs of the footnotes and facts that
+        they are linked to by footnote relationships, built with a single pass
+        over the relationships, as most facts don't have footnotes.
+        """
+        footnoteMap: dict[str, list[str]] = defaultdict(list)
+        for rel in ModelRelationshipSet(report, "XBRL-footnotes").modelRelationships:
+            fromId = getattr(rel.fromModelObject, "id", None)
+            toId = getattr(rel.toModelObject, "id", None)
+            if fromId is not None and toId is not None:
+                footnoteMap[fromId].append(toId)
+        return dict(footnoteMap)
+
     def newTargetReport(self, target: str | None) -> dict[str, Any]:
         return {
             "concepts": {},
             "facts": {},
+            "footnotes": {},
             "target": target,
         }
 
@@ -532,9 +1032,22 @@ class IXBRLViewerBuilder:
         return sourceReport
 
     def processModel(self, report: ModelXbrl) -> None:
+        with self.profiler.stage('processModel'):
+            try:
+                self._processModel(report)
+            finally:
+                # The model may be closed once it has been processed, so
+                # isn't kept alive by the builder.
+                self._dtsKeyReport = None
+
+    def _processModel(self, report: ModelXbrl) -> None:
+        profiler = self.profiler
         self.nsmap.stashReportNSMap(report)
-        self.footnoteRelationshipSet = ModelRelationshipSet(report, "XBRL-footnotes")
+        self.footnoteMap = self.getFootnoteMap(report)
         self.currentTargetReport = self.newTargetReport(getattr(report, "ixdsTarget", None))
+        self.entityAspectCache.clear()
+        self.contextAspectCache.clear()
+        self.unitAspectCache.clear()
         softwareCredits = set()
         for document in report.urlDocs.values():
             if isInlineDoc(document):
@@ -542,13 +1055,25 @@ class IXBRLViewerBuilder:
                 softwareCredits.update(matches)
         if softwareCredits:
             self.currentTargetReport["softwareCredits"] = list(softwareCredits)
-        for f in report.facts:
-            if f.isTuple:
-                for nestedTupleFact in f.ixIter():  # type: ignore[attr-defined]
-                    self.addFact(report, nestedTupleFact)
-            else:
-                self.addFact(report, cast(ModelInlineFact, f))
-        self.currentTargetReport["rels"] = self.getRelationships(report)
+        with profiler.stage('processModel.facts') as stats:
+            factCount = len(report.facts)
+            for n, f in enumerate(report.facts):
+                self.progress.update("Processing facts", n, factCount, "facts")
+                if f.isTuple:
+                    for nestedTupleFact in f.ixIter():  # type: ignore[attr-defined]
+                        self.addFact(report, nestedTupleFact)
+                else:
+                    self.addFact(report, cast(ModelInlineFact, f))
+            self.progress.update("Processing facts", factCount, factCount, "facts")
+            stats.addItems(len(self.currentTargetReport["facts"]))
+        with profiler.stage('processModel.relationships') as stats:
+            self.currentTargetReport["rels"] = self.getRelationships(report)
+            stats.addItems(sum(
+                len(rels)
+                for relsByRole in self.currentTargetReport["rels"].values()
+                for relsBySource in relsByRole.values()
+                for rels in relsBySource.values()
+            ))
 
         docSetFiles = None
         self.reportCount += 1
@@ -558,28 +1083,30 @@ class IXBRLViewerBuilder:
         )
         assert report.modelDocument is not None
         assert report.modelDocument.xmlDocument is not None
-        if report.modelDocument.type == Type.INLINEXBRLDOCUMENTSET:
-            # Sort by object index to preserve order in which files were specified.
-            xmlDocsByFilename = {
-                os.path.basename(self.outputFilename(doc.filepath)): doc.xmlDocument
-                for doc in sorted(report.modelDocument.referencesDocument.keys(), key=lambda x: x.objectIndex)
-                if doc.type == Type.INLINEXBRL and doc.xmlDocument is not None
-            }
-            docSetFiles = list(xmlDocsByFilename.keys())
-
-            for filename, docSetXMLDoc in xmlDocsByFilename.items():
-                self.iv.addFile(iXBRLViewerFile(filename, docSetXMLDoc))
-
-        elif self.useStubViewer:
-            filename = self.outputFilename(os.path.basename(report.modelDocument.filepath))
-            docSetFiles = [ filename ]
-            self.iv.addFile(iXBRLViewerFile(filename, report.modelDocument.xmlDocument))
+        with profiler.stage('processModel.documents') as stats:
+            if report.modelDocument.type == Type.INLINEXBRLDOCUMENTSET:
+                # Sort by object index to preserve order in which files were specified.
+                xmlDocsByFilename = {
+                    os.path.basename(self.outputFilename(doc.filepath)): doc.xmlDocument
+                    for doc in sorted(report.modelDocument.referencesDocument.keys(), key=lambda x: x.objectIndex)
+                    if doc.type == Type.INLINEXBRL and doc.xmlDocument is not None
+                }
+                docSetFiles = list(xmlDocsByFilename.keys())
+
+                for filename, docSetXMLDoc in xmlDocsByFilename.items():
+                    self.iv.addFile(iXBRLViewerFile(filename, docSetXMLDoc, copy=self.copyDocuments))
+
+            elif self.useStubViewer:
+                filename = self.outputFilename(os.path.basename(report.modelDocument.filepath))
+                docSetFiles = [ filename ]
+                self.iv.addFile(iXBRLViewerFile(filename, report.modelDocument.xmlDocument, copy=self.copyDocuments))
 
-        else:
-            srcFilename = self.outputFilename(os.path.basename(report.modelDocument.filepath))
-            docSetFiles = [ srcFilename ]
-            filename = srcFilename
-            self.iv.addFile(iXBRLViewerFile(filename, report.modelDocument.xmlDocument))
+            else:
+                srcFilename = self.outputFilename(os.path.basename(report.modelDocument.filepath))
+                docSetFiles = [ srcFilename ]
+                filename = srcFilename
+                self.iv.addFile(iXBRLViewerFile(filename, report.modelDocument.xmlDocument, copy=self.copyDocuments))
+            stats.addItems(len(docSetFiles))
         docSetKey = frozenset(docSetFiles)
         sourceReport = self.sourceReportsByFiles.get(docSetKey)
         if sourceReport is None:
@@ -589,27 +1116,33 @@ class IXBRLViewerBuilder:
 
         sourceReport["targetReports"].append(self.currentTargetReport)
 
-        localDocs = defaultdict(set)
-        for path, doc in report.urlDocs.items():
-            if isHttpUrl(path) or doc.type == Type.INLINEXBRLDOCUMENTSET:
-                continue
-            if doc.type == Type.INLINEXBRL:
-                localDocs[doc.basename].add('inline')
-            elif doc.type == Type.SCHEMA:
-                localDocs[doc.basename].add('schema')
-            elif doc.type == Type.LINKBASE:
-                linkbaseIdentifed = False
-                for child in doc.xmlRootElement.iterchildren():
-                    linkbaseLocalDocumentsKey = LINK_QNAME_TO_LOCAL_DOCUMENTS_LINKBASE_TYPE.get(child.qname)
-                    if linkbaseLocalDocumentsKey is not None:
-                        localDocs[doc.basename].add(linkbaseLocalDocumentsKey)
-                        linkbaseIdentifed = True
-                if not linkbaseIdentifed:
-                    localDocs[doc.basename].add(UNRECOGNIZED_LINKBASE_LOCAL_DOCUMENTS_TYPE)
-        self.currentTargetReport["localDocs"] = {
-            localDoc: sorted(docTypes)
-            for localDoc, docTypes in localDocs.items()
-        }
+        if self.searchIndex is not None:
+            sourceReportIndex = next(i for i, s in enumerate(self.taxonomyData["sourceReports"]) if s is sourceReport)
+            self.searchIndex.addTargetReport(sourceReportIndex, self.currentTargetReport, self.hiddenFactIds(report))
+
+        with profiler.stage('processModel.localDocs') as stats:
+            localDocs = defaultdict(set)
+            for path, doc in report.urlDocs.items():
+                if isHttpUrl(path) or doc.type == Type.INLINEXBRLDOCUMENTSET:
+                    continue
+                if doc.type == Type.INLINEXBRL:
+                    localDocs[doc.basename].add('inline')
+                elif doc.type == Type.SCHEMA:
+                    localDocs[doc.basename].add('schema')
+                elif doc.type == Type.LINKBASE:
+                    linkbaseIdentifed = False
+                    for child in doc.xmlRootElement.iterchildren():
+                        linkbaseLocalDocumentsKey = LINK_QNAME_TO_LOCAL_DOCUMENTS_LINKBASE_TYPE.get(child.qname)
+                        if linkbaseLocalDocumentsKey is not None:
+                            localDocs[doc.basename].add(linkbaseLocalDocumentsKey)
+                            linkbaseIdentifed = True
+                    if not linkbaseIdentifed:
+                        localDocs[doc.basename].add(UNRECOGNIZED_LINKBASE_LOCAL_DOCUMENTS_TYPE)
+            self.currentTargetReport["localDocs"] = {
+                localDoc: sorted(docTypes)
+                for localDoc, docTypes in localDocs.items()
+            }
+            stats.addItems(len(localDocs))
 
         # If we only process a single ZIP, add a download link to it as the
         # "filing documents" on the viewer menu.
@@ -620,76 +1153,275 @@ class IXBRLViewerBuilder:
         else:
             self.fromSingleZIP = False
         if report.fileSource.isArchive and isinstance(report.fileSource.fs, zipfile.ZipFile):
-            filelist = report.fileSource.fs.filelist
-            for file in filelist:
-                directory, asset = os.path.split(file.filename)
-                if "reports" in directory and asset != '' and not asset.lower().endswith(REPORT_TYPE_EXTENSIONS):
-                    self.assets.append(file.filename)
-            if self.assets:
-                self.reportZip = report.fileSource.fs.filename
+            with profiler.stage('processModel.assets') as stats:
+                filelist = report.fileSource.fs.filelist
+                for file in filelist:
+                    directory, asset = os.path.split(file.filename)
+                    if "reports" in directory and asset != '' and not asset.lower().endswith(REPORT_TYPE_EXTENSIONS):
+                        self.assets.append(file.filename)
+                if self.assets:
+                    self.reportZip = report.fileSource.fs.filename
+                stats.addItems(len(filelist))
+
+    def addPreprocessedIXBRL(self, sourceReport: dict[str, Any]) -> None:
+        """
+        Add the inline XBRL elements of each document in a source report, and
+        their continuation chains, to the source report data.  This must be
+        done once all target reports have been processed, as each may add IDs
+        to facts in the documents.
+        """
+        xmlDocuments = [
+            self.iv.filesByFilename[urllib.parse.unquote(f)].xmlDocument
+            for f in sourceReport["docSetFiles"]
+        ]
+        continuations = continuationChains(xmlDocuments)
+        continuationIds = {c for chain in continuations.values() for c in chain}
+        sourceReport["ixItems"] = [documentItems(xmlDocument, continuationIds) for xmlDocument in xmlDocuments]
+        sourceReport["continuations"] = continuations
 
     def createViewer(
             self,
             scriptUrl: str = DEFAULT_JS_FILENAME,
             showValidations: bool = True,
             packageDownloadURL: str | None = None,
+            compactJSON: bool = False,
+            compactFacts: bool = False,
+            dataFilename: str | None = None,
+            compressData: bool = False,
+            preprocessIXBRL: bool = False,
+            pruneRelationships: bool = False,
+            omitTextValueSize: int | None = None,
     ) -> iXBRLViewer | None:
         """
         Create an iXBRL file with XBRL data as a JSON blob, and script tags added.
         :param scriptUrl: The `src` value of the script tag that loads the viewer script.
         :param showValidations: True if validation errors should be included in output taxonomy data.
+        :param packageDownloadURL: Optional URL to use as the report package download URL.
+        :param compactJSON: True if the JSON blob should be written without indentation.
+        :param compactFacts: True if facts should be written using the compact encoding produced by compactFactData.
+        :param dataFilename: If provided, the JSON data is saved to a separate file with this name, which is
+            referenced from, rather than included in, the first document.
+        :param compressData: True if a gzip-compressed copy of the separate JSON data file should also be saved.
+        :param preprocessIXBRL: True if the inline XBRL elements of each document and their continuation chains
+            should be found now and included in the JSON data, rather than by the viewer when it is opened.
+        :param pruneRelationships: True if relationships, concepts and role definitions that are not reachable from
+            the concepts and dimensions of reported facts should be omitted from the JSON data.
+        :param omitTextValueSize: If provided, the values of nonNumeric facts of at least this many characters are
+            omitted from the JSON data, and are rebuilt by the viewer from the document.
         :return: An iXBRLViewer instance that is ready to be saved.
         """
 
-        self.taxonomyData["prefixes"] = self.nsmap.prefixmap
-        self.taxonomyData["roles"] = self.roleMap.prefixmap
-        if showValidations:
-            self.taxonomyData["validation"] = self.validationErrors()
+        with self.profiler.stage('createViewer'):
+            self.progress.update("Creating viewer", 0)
+            self.taxonomyData["prefixes"] = self.nsmap.prefixmap
+            self.taxonomyData["roles"] = self.roleMap.prefixmap
+            if showValidations:
+                with self.profiler.stage('createViewer.validation') as stats:
+                    self.taxonomyData["validation"] = self.validationErrors()
+                    stats.addItems(len(self.taxonomyData["validation"]))
+
+            if packageDownloadURL is not None:
+                self.taxonomyData["filingDocuments"] = packageDownloadURL
+            elif self.fromSingleZIP:
+                filingDocZipName = os.path.basename(self.filingDocZipPath)
+                self.iv.addFilingDoc(self.filingDocZipPath)
+                self.taxonomyData["filingDocuments"] = filingDocZipName
+
+            if self.searchIndex is not None and "taxonomyPacks" in self.taxonomyData:
+                # The labels and references of concepts in taxonomy packs
+                # aren't available until the packs are merged in by the viewer.
+                self.cntlr.addToLog(
+                    "Taxonomy packs are used, so the search index is built when the viewer is opened",
+                    messageCode=INFO_MESSAGE_CODE,
+                )
+            elif self.searchIndex is not None:
+                with self.profiler.stage('createViewer.searchIndex'):
+                    if not isLunrAvailable():
+                        self.cntlr.addToLog(
+                            "The lunr package is not installed, so search documents are included in the viewer rather than a search index",
+                            messageCode=INFO_MESSAGE_CODE,
+                        )
+                    self.taxonomyData["search"] = self.searchIndex.searchData(buildIndex=isLunrAvailable())
+
+            if preprocessIXBRL:
+                with self.profiler.stage('createViewer.preprocessIXBRL') as stats:
+                    for sourceReport in self.taxonomyData["sourceReports"]:
+                        self.addPreprocessedIXBRL(sourceReport)
+                        stats.addItems(sum(len(items) for items in sourceReport["ixItems"]))
+
+            if pruneRelationships:
+                with self.profiler.stage('createViewer.pruneRelationships') as stats:
+                    bytesRemoved = 0
+                    for sourceReport in self.taxonomyData["sourceReports"]:
+                        for targetReport in sourceReport["targetReports"]:
+                            bytesRemoved += pruneTargetReport(targetReport)
+                            stats.addItems(1)
+                    self.cntlr.addToLog(
+                        f"Pruned relationships and concepts not reachable from reported facts, removing {bytesRemoved:,} bytes of viewer data",
+                        messageCode=INFO_MESSAGE_CODE,
+                    )
+
+            if omitTextValueSize is not None:
+                with self.profiler.stage('createViewer.omitTextValues') as stats:
+                    charsOmitted = 0
+                    for sourceReport in self.taxonomyData["sourceReports"]:
+                        for targetReport in sourceReport["targetReports"]:
+                            charsOmitted += self.omitTextValues(targetReport, omitTextValueSize)
+                            stats.addItems(1)
+                    self.cntlr.addToLog(
+                        f"Omitted {charsOmitted:,} characters of nonNumeric fact values included in the document",
+                        messageCode=INFO_MESSAGE_CODE,
+                    )
+
+            if compactFacts:
+                with self.profiler.stage('createViewer.compactFacts'):
+                    for sourceReport in self.taxonomyData["sourceReports"]:
+                        for targetReport in sourceReport["targetReports"]:
+                            if "facts" in targetReport:
+                                targetReport["compactFacts"] = self.compactFactData(targetReport.pop("facts"))
+
+            dataUrl = None
+            if dataFilename is not None:
+                dataUrl = urllib.parse.quote(dataFilename)
+                self.iv.addDataFile(iXBRLViewerDataFile(
+                    dataFilename,
+                    lambda: self.taxonomyDataJSON(compact=compactJSON, escape=False),
+                    compress=compressData,
+                ))
+
+            if not self.addViewerData(self.iv.files[0], scriptUrl, compactJSON, dataUrl):
+                return None
+
+            if len(self.iv.files) == 1:
+                # If there is only a single report, call the output file "xbrlviewer.html"
+                # We should probably preserve the source file extension here.
+                self.iv.files[0].filename = 'xbrlviewer.html'
+            if self.assets:
+                self.iv.addReportAssets(self.assets)
+            if self.reportZip:
+                self.iv.reportZip = self.reportZip
+            return self.iv
 
-        if packageDownloadURL is not None:
-            self.taxonomyData["filingDocuments"] = packageDownloadURL
-        elif self.fromSingleZIP:
-            filingDocZipName = os.path.basename(self.filingDocZipPath)
-            self.iv.addFilingDoc(self.filingDocZipPath)
-            self.taxonomyData["filingDocuments"] = filingDocZipName
 
-        if not self.addViewerData(self.iv.files[0], scriptUrl):
-            return None
+class iXBRLViewerFile:
+
+    def __init__(self, filename: str, xmlDocument: etree._ElementTree[etree._Element], copy: bool = True) -> None:
+        """
+        :param copy: True to take a copy of the document.  If False, the
+            document is referenced directly and is not modified by the viewer.
+            Content added to it is recorded separately and applied during
+            serialization, so the document must remain available until the
+            file has been saved.
+        """
+        self.filename = filename
+        self.copied = copy
+        if copy:
+            self.xmlDocument: etree._ElementTree[etree._Element] = deepcopy(xmlDocument)
+            # deepcopy does not retain the Python proxies, so iterating the node
+            # tree during serialization will create new ones. However, the original
+            # ModelObjectFactory is still referenced, and that references a
+            # ModelXbrl that will potentially be closed by the time we serialize.
+            # Serialization only requires standard XML features, so the default
+            # lxml.etree classes (and thus lookup) are fine.
+            if self.xmlDocument.parser is not None:
+                self.xmlDocument.parser.set_element_class_lookup(etree.ElementDefaultClassLookup())
+        else:
+            self.xmlDocument = xmlDocument
+        # Content to be streamed into elements at serialization time, rather
+        # than being held in the document tree.
+        self.textWriters: dict[etree._Element, TextWriter] = {}
+        # Detached elements holding children to be appended to elements of an
+        # uncopied document at serialization time.
+        self.elementExtensions: dict[etree._Element, etree._Element] = {}
+
+    def appendTarget(self, element: etree._Element) -> etree._Element:
+        """
+        Return the element to which children to be added to `element` in the
+        output should be appended.  For a copied document, this is the
+        element itself.
+        """
+        if self.copied:
+            return element
+        if (extension := self.elementExtensions.get(element)) is None:
+            extension = etree.Element(element.tag, nsmap=element.nsmap)
+            self.elementExtensions[element] = extension
+        return extension
 
-        if len(self.iv.files) == 1:
-            # If there is only a single report, call the output file "xbrlviewer.html"
-            # We should probably preserve the source file extension here.
-            self.iv.files[0].filename = 'xbrlviewer.html'
-        if self.assets:
-            self.iv.addReportAssets(self.assets)
-        if self.reportZip:
-            self.iv.reportZip = self.reportZip
-        return self.iv
+    def serialize(self, fout: IO[bytes]) -> None:
+        writer = XHTMLSerializer(fout, text_writers=self.textWriters, element_extensions=self.elementExtensions)
+        writer.serialize(self.xmlDocument)
 
+    def serializeToBytes(self) -> bytes:
+        buf = io.BytesIO()
+        self.serialize(buf)
+        return buf.getvalue()
 
-class iXBRLViewerFile:
 
-    def __init__(self, filename: str, xmlDocument: etree._ElementTree[etree._Element]) -> None:
+class iXBRLViewerDataFile:
+
+    def __init__(self, filename: str, textWriter: TextWriter, compress: bool = False) -> None:
+        """
+        JSON viewer data saved separately from the viewer documents.
+        :param textWriter: Callable producing the JSON data.
+        :param compress: True to also save a gzip-compressed copy, with a
+            ".gz" suffix, for web servers to send to clients that accept it.
+        """
         self.filename = filename
-        self.xmlDocument: etree._ElementTree[etree._Element] = deepcopy(xmlDocument)
-        # deepcopy does not retain the Python proxies, so iterating the node
-        # tree during serialization will create new ones. However, the original
-        # ModelObjectFactory is still referenced, and that references a
-        # ModelXbrl that will potentially be closed by the time we serialize.
-        # Serialization only requires standard XML features, so the default
-        # lxml.etree classes (and thus lookup) are fine.
-        if self.xmlDocument.parser is not None:
-            self.xmlDocument.parser.set_element_class_lookup(etree.ElementDefaultClassLookup())
+        self.textWriter = textWriter
+        self.compress = compress
+
+    @property
+    def compressedFilename(self) -> str:
+        return f"{self.filename}.gz"
+
+    def serialize(self, *fouts: IO[bytes] | gzip.GzipFile) -> None:
+        for chunk in self.textWriter():
+            data = chunk.encode("utf-8")
+            for fout in fouts:
+                fout.write(data)
+
+    def serializeToBytes(self) -> bytes:
+        buf = io.BytesIO()
+        self.serialize(buf)
+        return buf.getvalue()
+
+    def save(self, directory: str) -> None:
+        with open(os.path.join(directory, self.filename), "wb") as fout:
+            if self.compress:
+                # Fixed mtime so that output is reproducible
+                with (
+                    open(os.path.join(directory, self.compressedFilename), "wb") as gzout,
+                    gzip.GzipFile(self.filename, "wb", fileobj=gzout, mtime=0) as gzfout,
+                ):
+                    self.serialize(fout, gzfout)
+            else:
+                self.serialize(fout)
+
+    def saveToZip(self, zout: zipfile.ZipFile) -> None:
+        data = self.serializeToBytes()
+        zout.writestr(self.filename, data)
+        if self.compress:
+            # Already compressed, so store rather than deflate
+            zout.writestr(
+                self.compressedFilename,
+                gzip.compress(data, mtime=0),
+                compress_type=zipfile.ZIP_STORED,
+            )
 
 
 class iXBRLViewer:
 
-    def __init__(self, cntlr: Cntlr) -> None:
+    def __init__(self, cntlr: Cntlr, profiler: StageProfiler | None = None, progress: GenerationProgress | None = None) -> None:
         self.reportZip: str | None = None
         self.filesByFilename: dict[str, iXBRLViewerFile] = {}
         self.filingDocuments: str | None = None
         self.cntlr = cntlr
         self.assets: list[str] = []
+        self.dataFile: iXBRLViewerDataFile | None = None
+        self.profiler = profiler if profiler is not None else StageProfiler(enabled=False)
+        self.progress = progress if progress is not None else GenerationProgress()
+        # Paths of the files written by the last call to save
+        self.savedFiles: list[str] = []
 
     def addReportAssets(self, assets: list[str]) -> None:
         self.assets.extend(assets)
@@ -706,20 +1438,49 @@ class iXBRLViewer:
     def addFilingDoc(self, filingDocuments: str) -> None:
         self.filingDocuments = filingDocuments
 
-    def save(self, destination: io.BytesIO | str, zipOutput: bool = False, copyScriptPath: Path | None = None) -> None:
+    def addDataFile(self, dataFile: iXBRLViewerDataFile) -> None:
+        self.dataFile = dataFile
+
+    def _saveDataFile(self, directory: str) -> None:
+        if self.dataFile is not None:
+            self.cntlr.addToLog(f"Writing {os.path.join(directory, self.dataFile.filename)}", messageCode=INFO_MESSAGE_CODE)
+            with self.profiler.stage('save.data'):
+                self.dataFile.save(directory)
+            self.savedFiles.append(os.path.join(directory, self.dataFile.filename))
+            if self.dataFile.compress:
+                self.savedFiles.append(os.path.join(directory, self.dataFile.compressedFilename))
+
+    def save(
+        self,
+        destination: IO[bytes] | str,
+        zipOutput: bool = False,
+        copyScriptPath: Path | None = None,
+        workers: int = 1,
+    ) -> None:
         """
         Save the iXBRL viewer.
         :param destination: The target that viewer data/files will be written to (path to file/directory, or a file object itself).
+            A seekable file object is appended to as a zip archive, and a non-seekable one is written as a new zip archive.
         :param zipOutput: True if the destination is a zip archive.
         :param copyScriptPath: If provided, the path from where the viewer JS will be copied into the output from.
+        :param workers: Number of threads to use to write files in a document set.
+            When writing a zip, files are serialized and compressed in memory
+            by the workers and added to the archive in order, so that its
+            contents are deterministic.
         """
-        if isinstance(destination, io.BytesIO) or zipOutput: # zip output stream
+        self.savedFiles = []
+        with self.profiler.stage('save'):
+            self._save(destination, zipOutput, copyScriptPath, workers)
+
+    def _save(self, destination: IO[bytes] | str, zipOutput: bool, copyScriptPath: Path | None, workers: int) -> None:
+        if not isinstance(destination, str) or zipOutput: # zip output stream
             # zipfile may be cumulatively added to by inline extraction, EdgarRenderer etc
-            filepath: io.BytesIO | str
+            filepath: IO[bytes] | str
             fileMode: Literal['a', 'w']
-            if isinstance(destination, io.BytesIO):
+            if not isinstance(destination, str):
                 filepath = destination
-                fileMode = 'a'
+                # Non-seekable streams can't be appended to
+                fileMode = 'a' if destination.seekable() else 'w'
                 destination = os.sep
             elif os.path.isdir(destination):
                 filepath = os.path.join(
@@ -752,41 +1513,93 @@ class iXBRLViewer:
                 filepath = destination
                 fileMode = 'w'
 
-            with zipfile.ZipFile(filepath, fileMode, zipfile.ZIP_DEFLATED, allowZip64=True) as zout:
-                for f in self.files:
-                    self.cntlr.addToLog(f"Saving in output zip {f.filename}", messageCode=INFO_MESSAGE_CODE)
-                    with zout.open(f.filename, "w") as fout:
-                        writer = XHTMLSerializer(fout)
-                        writer.serialize(f.xmlDocument)
+            with (
+                zipfile.ZipFile(filepath, fileMode, zipfile.ZIP_DEFLATED, allowZip64=True) as zout,
+                self.profiler.stage('save.files') as stats,
+            ):
+                fileCount = len(self.files)
+                self.progress.update("Saving files", 0, fileCount, "files")
+                if workers > 1 and len(self.files) > 1:
+
+                    def compressFile(f: iXBRLViewerFile) -> CompressedMember:
+                        return compressMember(f.serializeToBytes(), compressTypeForFilename(f.filename))
+
+                    compressed = mapConcurrently(compressFile, self.files, workers)
+                    for n, (f, member) in enumerate(zip(self.files, compressed), start=1):
+                        self.cntlr.addToLog(f"Saving in output zip {f.filename}", messageCode=INFO_MESSAGE_CODE)
+                        writeCompressedMember(zout, f.filename, member)
+                        self.progress.update("Saving files", n, fileCount, "files", zout.start_dir)
+                else:
+                    for n, f in enumerate(self.files, start=1):
+                        self.cntlr.addToLog(f"Saving in output zip {f.filename}", messageCode=INFO_MESSAGE_CODE)
+                        with zout.open(f.filename, "w") as fout:
+                            f.serialize(fout)
+                        self.progress.update("Saving files", n, fileCount, "files", zout.start_dir)
+                stats.addItems(len(self.files))
+                if self.dataFile is not None:
+                    self.cntlr.addToLog(f"Saving in output zip {self.dataFile.filename}", messageCode=INFO_MESSAGE_CODE)
+                    with self.profiler.stage('save.data'):
+                        self.dataFile.saveToZip(zout)
                 if self.filingDocuments:
                     filename = os.path.basename(self.filingDocuments)
                     self.cntlr.addToLog(f"Writing {filename}", messageCode=INFO_MESSAGE_CODE)
-                    zout.write(self.filingDocuments, filename)
+                    zout.write(self.filingDocuments, filename, compress_type=compressTypeForFilename(filename))
+                if self.assets and self.reportZip is not None:
+                    with zipfile.ZipFile(self.reportZip) as z, self.profiler.stage('save.assets') as stats:
+                        for n, asset in enumerate(self.assets, start=1):
+                            self.cntlr.addToLog(f"Saving in output zip {asset}", messageCode=INFO_MESSAGE_CODE)
+                            copyZipMember(z, z.getinfo(asset), zout, os.path.basename(asset))
+                            self.progress.update("Copying assets", n, len(self.assets), "files", zout.start_dir)
+                        stats.addItems(len(self.assets))
                 if copyScriptPath is not None:
                     self.cntlr.addToLog(f"Writing script from {copyScriptPath}", messageCode=INFO_MESSAGE_CODE)
-                    zout.write(copyScriptPath, copyScriptPath.name)
+                    zout.write(copyScriptPath, copyScriptPath.name, compress_type=compressTypeForFilename(copyScriptPath.name))
+            if isinstance(filepath, str):
+                self.savedFiles.append(filepath)
         elif os.path.isdir(destination):
             # If output is a directory, write each file in the doc set to that
             # directory using its existing filename
+            destDirectory = destination
+
+            def writeFile(f: iXBRLViewerFile) -> int:
+                self.progress.checkCancelled()
+                with open(os.path.join(destDirectory, f.filename), "wb") as fout:
+                    f.serialize(fout)
+                    return fout.tell()
+
             for f in self.files:
-                filename = os.path.join(destination, f.filename)
-                self.cntlr.addToLog(f"Writing {filename}", messageCode=INFO_MESSAGE_CODE)
-                with open(filename, "wb") as fout:
-                    writer = XHTMLSerializer(fout)
-                    writer.serialize(f.xmlDocument)
+                self.cntlr.addToLog(f"Writing {os.path.join(destination, f.filename)}", messageCode=INFO_MESSAGE_CODE)
+            with self.profiler.stage('save.files') as stats:
+                fileCount = len(self.files)
+                bytesWritten = 0
+                self.progress.update("Saving files", 0, fileCount, "files")
+                for n, size in enumerate(mapConcurrently(writeFile, self.files, workers), start=1):
+                    bytesWritten += size
+                    self.progress.update("Saving files", n, fileCount, "files", bytesWritten)
+                stats.addItems(len(self.files))
+            self.savedFiles.extend(os.path.join(destDirectory, f.filename) for f in self.files)
+            self._saveDataFile(destination)
             if self.filingDocuments:
                 filename = os.path.basename(self.filingDocuments)
                 self.cntlr.addToLog(f"Writing {filename}", messageCode=INFO_MESSAGE_CODE)
                 shutil.copy2(self.filingDocuments, os.path.join(destination, filename))
+                self.savedFiles.append(os.path.join(destination, filename))
             if self.assets and self.reportZip is not None:
-                with zipfile.ZipFile(self.reportZip) as z:
-                    for asset in self.assets:
-                        fileName = os.path.basename(asset)
-                        path = os.path.join(destination, fileName)
-                        self.cntlr.addToLog(f"Writing {asset}", messageCode=INFO_MESSAGE_CODE)
+                with zipfile.ZipFile(self.reportZip) as z, self.profiler.stage('save.assets') as stats:
+
+                    def copyAsset(asset: str) -> None:
+                        self.progress.checkCancelled()
+                        path = os.path.join(destDirectory, os.path.basename(asset))
                         with z.open(asset) as zf, open(path, 'wb') as assetFile:
                             shutil.copyfileobj(zf, assetFile)
 
+                    for asset in self.assets:
+                        self.cntlr.addToLog(f"Writing {asset}", messageCode=INFO_MESSAGE_CODE)
+                    for n, _ in enumerate(mapConcurrently(copyAsset, self.assets, workers), start=1):
+                        self.progress.update("Copying assets", n, len(self.assets), "files")
+                    stats.addItems(len(self.assets))
+                self.savedFiles.extend(os.path.join(destDirectory, os.path.basename(asset)) for asset in self.assets)
+
             if copyScriptPath is not None:
                 self._copyScript(Path(destination), copyScriptPath)
         else:
@@ -809,13 +1622,18 @@ class iXBRLViewer:
                 )
             else:
                 self.cntlr.addToLog(f"Writing {destination}", messageCode=INFO_MESSAGE_CODE)
-                with open(destination, "wb") as fout:
-                    writer = XHTMLSerializer(fout)
-                    writer.serialize(self.files[0].xmlDocument)
+                self.progress.update("Saving files", 0, 1, "files")
+                with open(destination, "wb") as fout, self.profiler.stage('save.files') as stats:
+                    self.files[0].serialize(fout)
+                    stats.addItems(1)
+                    self.progress.update("Saving files", 1, 1, "files", fout.tell())
+                self.savedFiles.append(destination)
+                self._saveDataFile(os.path.dirname(os.path.abspath(destination)))
                 if self.filingDocuments:
                     filename = os.path.basename(self.filingDocuments)
                     self.cntlr.addToLog(f"Writing {filename}", messageCode=INFO_MESSAGE_CODE)
                     shutil.copy2(self.filingDocuments, os.path.join(os.path.dirname(destination), filename))
+                    self.savedFiles.append(os.path.join(os.path.dirname(destination), filename))
                 if copyScriptPath is not None:
                     outDirectory = Path(destination).parent
                     self._copyScript(outDirectory, copyScriptPath)
@@ -825,3 +1643,4 @@ class iXBRLViewer:
         if scriptPath != scriptDest:
             self.cntlr.addToLog(f"Copying script from {scriptPath} to {scriptDest}.", messageCode=INFO_MESSAGE_CODE)
             shutil.copy2(scriptPath, scriptDest)
+            self.savedFiles.append(str(scriptDest))
@@ -2,11 +2,57 @@
 
 from __future__ import annotations
 
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
 from arelle.utils.PluginData import PluginData
 
 from .iXBRLViewer import IXBRLViewerBuilder
 
+if TYPE_CHECKING:
+    from .cache import CacheEntry
 
-class IXBRLViewerPluginData(PluginData):
+
+class IXBRLViewerFilingData:
+    """
+    State for the filing being processed.
+    """
 
     builder: IXBRLViewerBuilder | None = None
+    # Generation cache key and entry for the filing being processed, and the
+    # keys of the models loaded so far.
+    cacheKey: str | None = None
+    cacheEntry: CacheEntry | None = None
+    cacheModelKeys: tuple[str, ...] = ()
+    # True if the filing has a single entry point, so that a cached viewer can
+    # be used without processing the model.
+    cacheSingleModel: bool = False
+
+
+class IXBRLViewerPluginData(PluginData):
+    """
+    Plugin data for a controller.
+
+    A long-lived controller, such as that of a web server, may process
+    filings for several requests concurrently, each in its own thread, so the
+    state for each filing is held in a context variable rather than on the
+    controller itself.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self._filingData: ContextVar[IXBRLViewerFilingData] = ContextVar(f"{name}.filingData")
+
+    def filingData(self) -> IXBRLViewerFilingData:
+        """
+        Return the state for the filing being processed in the current
+        context, creating it if necessary.
+        """
+        filingData = self._filingData.get(None)
+        if filingData is None:
+            filingData = IXBRLViewerFilingData()
+            self._filingData.set(filingData)
+        return filingData
+
+    def resetFilingData(self) -> None:
+        self._filingData.set(IXBRLViewerFilingData())
@@ -0,0 +1,123 @@
+# See COPYRIGHT.md for copyright information
+
+"""
+Generation-time discovery of the inline XBRL elements in each document.
+
+When a viewer is opened, Viewer._preProcessiXBRL in viewer.js traverses every
+node of every document to find facts, footnotes, continuations and links to
+hidden facts, and _buildContinuationMaps traverses them all again to resolve
+continuation chains.  Both depend only on the document structure, so they can
+instead be found when the viewer is generated, leaving the viewer to look up
+each element directly.
+
+Wrapper elements can't be added here, as the choice of wrapper depends on the
+styles computed by the browser.
+
+The results must match those found by viewer.js, so elements are identified by
+local name alone, as they are there.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from lxml import etree
+
+# Local names of elements that may start or continue a continuation chain
+CONTINUATION_CHAIN_ELEMENTS = frozenset(('NONNUMERIC', 'NONFRACTION', 'FOOTNOTE', 'CONTINUATION'))
+IX_HIDDEN_LINK_STYLE_RE = re.compile(r'(?:^|\s|;)(?:-sec|-esef)?-ix-hidden:\s*([^\s;]+)')
+# Elements linking to hidden facts are identified in the viewer by their
+# position amongst the elements matching this CSS selector:
+#   [style*="-ix-hidden"]
+IX_HIDDEN_LINK_STYLE_MARKER = '-ix-hidden'
+
+
+def _localName(e: etree._Element) -> str | None:
+    if not isinstance(e.tag, str):
+        # Comment or processing instruction
+        return None
+    return etree.QName(e).localname.upper()
+
+
+def findBody(xmlDocument: etree._ElementTree[etree._Element]) -> etree._Element | None:
+    return next(xmlDocument.getroot().iter('{http://www.w3.org/1999/xhtml}body', 'body'), None)
+
+
+def continuationChains(xmlDocuments: list[etree._ElementTree[etree._Element]]) -> dict[str, list[str]]:
+    """
+    Return a map of the IDs of facts and footnotes in the documents of a
+    source report to the IDs of their continuations, in order.  Facts and
+    footnotes without continuations are omitted.
+    """
+    nextContinuation: dict[str, str] = {}
+    itemIds: dict[str, None] = {}
+    for xmlDocument in xmlDocuments:
+        body = findBody(xmlDocument)
+        if body is None:
+            continue
+        for e in body.iterdescendants():
+            name = _localName(e)
+            if name not in CONTINUATION_CHAIN_ELEMENTS or (elementId := e.get('id')) is None:
+                continue
+            if (continuedAt := e.get('continuedAt')) is not None:
+                nextContinuation[elementId] = continuedAt
+            if name != 'CONTINUATION':
+                itemIds[elementId] = None
+
+    chains = {}
+    for itemId in itemIds:
+        chain = []
+        seen = {itemId}
+        nextId = nextContinuation.get(itemId)
+        while nextId is not None and nextId not in seen:
+            chain.append(nextId)
+            seen.add(nextId)
+            nextId = nextContinuation.get(nextId)
+        if chain:
+            chains[itemId] = chain
+    return chains
+
+
+def documentItems(xmlDocument: etree._ElementTree[etree._Element], continuationIds: set[str]) -> list[list[Any]]:
+    """
+    Return the elements of a document that the viewer adds wrappers to, in the
+    order in which Viewer._preProcessiXBRL visits them (children before their
+    parents).  Each is given as:
+
+        [ ref, inHidden ]
+
+    where ref is the ID of a fact, footnote or continuation, or, for an
+    element linking to a hidden fact using an -ix-hidden style, its index
+    amongst the elements of the body with such a style.  inHidden is 1 for
+    elements within ix:hidden, and 0 otherwise.
+    :param continuationIds: IDs of continuations that are part of a chain.
+        Other continuations are ignored by the viewer.
+    """
+    body = findBody(xmlDocument)
+    if body is None:
+        return []
+    items: list[list[Any]] = []
+    hiddenLinkIndexes: dict[etree._Element, int] = {}
+    hiddenDepth = 0
+    for event, e in etree.iterwalk(body, events=('start', 'end')):
+        name = _localName(e)
+        if name is None:
+            continue
+        if event == 'start':
+            if name == 'HIDDEN':
+                hiddenDepth += 1
+            if e is not body and IX_HIDDEN_LINK_STYLE_MARKER in (e.get('style') or ''):
+                hiddenLinkIndexes[e] = len(hiddenLinkIndexes)
+            continue
+
+        inHidden = 1 if hiddenDepth > 0 else 0
+        if name == 'HIDDEN':
+            hiddenDepth -= 1
+        elementId = e.get('id')
+        if name in CONTINUATION_CHAIN_ELEMENTS:
+            if elementId is not None and (name != 'CONTINUATION' or elementId in continuationIds):
+                items.append([elementId, inHidden])
+        elif e in hiddenLinkIndexes and IX_HIDDEN_LINK_STYLE_RE.search(e.get('style') or ''):
+            items.append([hiddenLinkIndexes[e], inHidden])
+    return items
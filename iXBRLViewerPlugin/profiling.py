@@ -0,0 +1,130 @@
+# See COPYRIGHT.md for copyright information
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+# Filename used for the profile report when the viewer is saved to a directory
+PROFILE_REPORT_FILENAME = 'ixbrlviewer-profile.json'
+
+
+@dataclass
+class StageStats:
+    """
+    Statistics for a stage of viewer generation.  If a stage is run more than
+    once (for example, processModel for each target document) times and item
+    counts are totalled, and the peak memory is the largest of any run.
+    """
+    calls: int = 0
+    wallTime: float = 0.0
+    cpuTime: float = 0.0
+    peakMemory: int | None = None
+    items: int | None = None
+
+    def addItems(self, n: int) -> None:
+        self.items = (self.items or 0) + n
+
+    def asDict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "wallTime": self.wallTime,
+            "cpuTime": self.cpuTime,
+            "peakMemory": self.peakMemory,
+            "items": self.items,
+        }
+
+
+@dataclass
+class _RunningStage:
+    stats: StageStats
+    baseline: int
+    peak: int = 0
+
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, peak allocated memory and item counts for
+    named stages of viewer generation.  Stages may be nested.  Each stage is
+    recorded under the name given, so nested stages are named with the name
+    of the enclosing stage as a prefix by convention, e.g.
+    "processModel.facts".
+
+    A disabled profiler records nothing, so stages can be marked
+    unconditionally.
+    """
+
+    def __init__(self, enabled: bool = True, traceMemory: bool = False) -> None:
+        """
+        :param traceMemory: True to record peak memory using tracemalloc.
+            This slows generation considerably, so distorts timings.
+            tracemalloc traces the whole process, and stage() resets its
+            peak, so memory is only attributed correctly if a single viewer
+            is generated at a time.  Concurrent builders, such as those of a
+            web server handling several requests, record each other's
+            allocations and reset each other's peaks.
+        """
+        self.enabled = enabled
+        self.traceMemory = traceMemory
+        self.stages: dict[str, StageStats] = {}
+        self._running: list[_RunningStage] = []
+        self._startedTracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        if not self.enabled:
+            yield StageStats()
+            return
+        stats = self.stages.setdefault(name, StageStats())
+        running = None
+        if self.traceMemory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._startedTracing = True
+            # Resetting the peak loses the peak for any enclosing stages, so
+            # record it first.
+            self._updatePeaks()
+            tracemalloc.reset_peak()
+            running = _RunningStage(stats, baseline=tracemalloc.get_traced_memory()[0])
+            self._running.append(running)
+        wallStart = time.perf_counter()
+        cpuStart = time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.calls += 1
+            stats.wallTime += time.perf_counter() - wallStart
+            stats.cpuTime += time.process_time() - cpuStart
+            if running is not None:
+                self._updatePeaks()
+                self._running.pop()
+                peak = running.peak - running.baseline
+                stats.peakMemory = peak if stats.peakMemory is None else max(stats.peakMemory, peak)
+
+    def _updatePeaks(self) -> None:
+        peak = tracemalloc.get_traced_memory()[1]
+        for running in self._running:
+            running.peak = max(running.peak, peak)
+
+    def close(self) -> None:
+        """
+        Stop tracing memory allocations, if this profiler started it.
+        """
+        if self._startedTracing:
+            tracemalloc.stop()
+            self._startedTracing = False
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "traceMemory": self.traceMemory,
+            "stages": {name: stats.asDict() for name, stats in self.stages.items()},
+        }
+
+    def writeReport(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fout:
+            json.dump(self.report(), fout, indent=2)
@@ -0,0 +1,82 @@
+# See COPYRIGHT.md for copyright information
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+# Minimum interval between progress updates passed to a callback, in seconds
+DEFAULT_PROGRESS_INTERVAL = 0.1
+
+
+class ViewerGenerationCancelled(Exception):
+    """
+    Raised in the thread generating a viewer when generation is cancelled.
+    """
+
+    def __init__(self) -> None:
+        super().__init__("iXBRL Viewer generation cancelled")
+
+
+class ProgressUpdate(NamedTuple):
+    stage: str
+    done: int
+    total: int | None = None
+    unit: str = ''
+    bytesWritten: int | None = None
+
+    def describe(self) -> str:
+        text = f"{self.stage}: {self.done:,}"
+        if self.total is not None:
+            text += f" of {self.total:,}"
+        if self.unit:
+            text += f" {self.unit}"
+        if self.bytesWritten is not None:
+            text += f" ({self.bytesWritten / (1024 * 1024):,.1f} MB written)"
+        return text
+
+
+class GenerationProgress:
+    """
+    Receives progress updates from the builder and viewer as a viewer is
+    generated, and allows generation to be cancelled from another thread.
+
+    Updates are passed to the callback, if any, in the generating thread, at
+    most once per interval, except for the first and last update of each
+    stage.  Once cancelled, the next update raises
+    ViewerGenerationCancelled.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[ProgressUpdate], None] | None = None,
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+    ) -> None:
+        self.callback = callback
+        self.interval = interval
+        self._cancelled = threading.Event()
+        self._lastStage: str | None = None
+        self._lastUpdate = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def checkCancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise ViewerGenerationCancelled()
+
+    def update(self, stage: str, done: int, total: int | None = None, unit: str = '', bytesWritten: int | None = None) -> None:
+        self.checkCancelled()
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        if stage != self._lastStage or done == total or now - self._lastUpdate >= self.interval:
+            self._lastStage = stage
+            self._lastUpdate = now
+            self.callback(ProgressUpdate(stage, done, total, unit, bytesWritten))
@@ -0,0 +1,169 @@
+# See COPYRIGHT.md for copyright information
+
+"""
+Removal of the relationships and concepts in a target report's data that are
+not reachable from its facts.
+
+getRelationships includes every presentation, calculation, wider-narrower and
+dimension-default relationship in the DTS, and the concepts at both ends of
+each, but the viewer only uses those that relate to the concepts and
+dimensions of reported facts:
+
+ * Presentation trees are used to build the document outline, so any tree
+   that contains a reported concept is kept whole.
+ * Calculation and wider-narrower relationships are only shown for the
+   concept of a fact, so those to or from a reported concept are kept.
+ * Dimension defaults are kept for reported dimensions, and for dimensions in
+   the presentation trees that are kept.
+
+ELRs with no remaining relationships, and their role definitions, are
+removed, as are concepts that are neither reported nor an endpoint of a
+remaining relationship.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Aspects of a fact that aren't dimensions
+CORE_ASPECTS = frozenset(("c", "e", "m", "u", "p"))
+
+PRESENTATION_ARCROLE = "pres"
+DIMENSION_DEFAULT_ARCROLE = "d-d"
+
+RelationshipsByELR = dict[str, dict[str, list[dict[str, Any]]]]
+
+
+def reportedConcepts(targetReport: dict[str, Any]) -> set[str]:
+    """
+    Return the names of the concepts, dimensions and members used by the
+    facts of a target report, and of the concepts that are the values of
+    enumeration facts.
+    """
+    concepts = targetReport["concepts"]
+    reported = set()
+    for fact in targetReport["facts"].values():
+        aspects = fact["a"]
+        reported.add(aspects["c"])
+        for aspect, value in aspects.items():
+            if aspect not in CORE_ASPECTS:
+                reported.add(aspect)
+                if isinstance(value, str) and value in concepts:
+                    reported.add(value)
+        if concepts.get(aspects["c"], {}).get("e") and isinstance(fact.get("v"), str):
+            reported.update(v for v in fact["v"].split() if v in concepts)
+    return reported
+
+
+def _treeConcepts(relationships: dict[str, list[dict[str, Any]]], root: str) -> set[str]:
+    concepts = set()
+    pending = [root]
+    while pending:
+        concept = pending.pop()
+        if concept in concepts:
+            continue
+        concepts.add(concept)
+        pending.extend(rel["t"] for rel in relationships.get(concept, ()))
+    return concepts
+
+
+def _prunePresentation(relsByELR: RelationshipsByELR, reported: set[str]) -> tuple[RelationshipsByELR, set[str]]:
+    """
+    Return the presentation relationships in trees that contain a reported
+    concept, and the concepts in those trees.
+    """
+    pruned: RelationshipsByELR = {}
+    treeConcepts: set[str] = set()
+    for elr, relationships in relsByELR.items():
+        targets = {rel["t"] for rels in relationships.values() for rel in rels}
+        kept: set[str] = set()
+        for root in relationships:
+            if root not in targets:
+                concepts = _treeConcepts(relationships, root)
+                if not concepts.isdisjoint(reported):
+                    kept |= concepts
+        if kept:
+            pruned[elr] = {src: rels for src, rels in relationships.items() if src in kept}
+            treeConcepts |= kept
+    return pruned, treeConcepts
+
+
+def _pruneAdjacent(relsByELR: RelationshipsByELR, concepts: set[str], sourceOnly: bool = False) -> RelationshipsByELR:
+    """
+    Return the relationships from, or unless sourceOnly is True, to, one of
+    the given concepts.
+    """
+    pruned: RelationshipsByELR = {}
+    for elr, relationships in relsByELR.items():
+        kept: dict[str, list[dict[str, Any]]] = {}
+        for src, rels in relationships.items():
+            if src in concepts:
+                kept[src] = rels
+            elif not sourceOnly and (keptRels := [rel for rel in rels if rel["t"] in concepts]):
+                kept[src] = keptRels
+        if kept:
+            pruned[elr] = kept
+    return pruned
+
+
+def _encodedSize(encoder: json.JSONEncoder, data: dict[str, Any]) -> int:
+    return sum(len(chunk.encode()) for chunk in encoder.iterencode(data))
+
+
+def pruneTargetReport(targetReport: dict[str, Any]) -> int:
+    """
+    Remove the relationships, concepts and role definitions that are not
+    reachable from the facts of a target report, which must not yet be
+    encoded with compactFactData.
+
+    :return: The number of bytes removed from the compact JSON encoding of
+        the target report.
+    """
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    prunedKeys = ("rels", "concepts", "roleDefs")
+    sizeBefore = _encodedSize(encoder, {k: targetReport.get(k) for k in prunedKeys})
+
+    reported = reportedConcepts(targetReport)
+    rels: dict[str, RelationshipsByELR] = targetReport.get("rels", {})
+    prunedRels: dict[str, RelationshipsByELR] = {}
+    presentationConcepts: set[str] = set()
+    if PRESENTATION_ARCROLE in rels:
+        prunedRels[PRESENTATION_ARCROLE], presentationConcepts = _prunePresentation(rels[PRESENTATION_ARCROLE], reported)
+    for arcrole, relsByELR in rels.items():
+        if arcrole == PRESENTATION_ARCROLE:
+            continue
+        if arcrole == DIMENSION_DEFAULT_ARCROLE:
+            prunedRels[arcrole] = _pruneAdjacent(relsByELR, reported | presentationConcepts, sourceOnly=True)
+        else:
+            prunedRels[arcrole] = _pruneAdjacent(relsByELR, reported)
+    # Preserve the order of the arcroles
+    prunedRels = {arcrole: prunedRels[arcrole] for arcrole in rels}
+
+    concepts = targetReport["concepts"]
+    keep = set(reported)
+    for relsByELR in prunedRels.values():
+        for relationships in relsByELR.values():
+            for src, relList in relationships.items():
+                keep.add(src)
+                keep.update(rel["t"] for rel in relList)
+    # Typed dimensions refer to their domain elements
+    keep |= {td for name in list(keep) if (td := concepts.get(name, {}).get("td")) is not None}
+    targetReport["concepts"] = {name: data for name, data in concepts.items() if name in keep}
+
+    if "rels" in targetReport:
+        targetReport["rels"] = prunedRels
+        originalELRs = {elr for relsByELR in rels.values() for elr in relsByELR}
+        keptELRs = {elr for relsByELR in prunedRels.values() for elr in relsByELR}
+        labelRoles = {
+            role
+            for data in targetReport["concepts"].values()
+            for role in data.get("labels", {})
+        }
+        removedELRs = originalELRs - keptELRs - labelRoles
+        if "roleDefs" in targetReport:
+            targetReport["roleDefs"] = {
+                role: labels for role, labels in targetReport["roleDefs"].items() if role not in removedELRs
+            }
+
+    return sizeBefore - _encodedSize(encoder, {k: targetReport.get(k) for k in prunedKeys})
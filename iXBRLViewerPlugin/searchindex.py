@@ -0,0 +1,196 @@
+# See COPYRIGHT.md for copyright information
+
+"""
+Generation-time construction of the viewer's full text search index.
+
+By default the viewer builds its search index in the browser each time a
+report is opened, which can take many seconds for large reports.  The
+documents indexed are derived entirely from the viewer data, so they can
+instead be built when the viewer is generated.  If the optional "lunr"
+package is installed, the index itself is built too, and the viewer only
+needs to load it.
+
+The search documents must match those built by ReportSearch.buildSearchIndex
+in search.js, so that search results don't depend on whether the index was
+built in advance.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timezone
+from typing import Any
+
+try:
+    from lunr import lunr
+except ImportError:
+    lunr = None
+
+SEARCH_FIELDS = (
+    'label',
+    'concept',
+    'startDate',
+    'date',
+    'doc',
+    'ref',
+    'widerLabel',
+    'widerDoc',
+    'widerConcept',
+)
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_DATE_WITHOUT_TIME_RE = re.compile(r'^(\d{4,}-\d{2}-\d{2})(?!T|$)')
+
+
+def isLunrAvailable() -> bool:
+    return lunr is not None
+
+
+def momentString(xbrlDate: str) -> str:
+    """
+    Format a date in the way that the viewer's search index sees it: as the
+    string representation of the moment returned by xbrlDateToMoment.
+    """
+    xbrlDate = _DATE_WITHOUT_TIME_RE.sub(r'\1T00:00:00', xbrlDate)
+    if xbrlDate.endswith('Z'):
+        xbrlDate = xbrlDate[:-1] + '+00:00'
+    try:
+        d = datetime.fromisoformat(xbrlDate)
+    except ValueError:
+        return 'Invalid date'
+    if d.tzinfo is not None:
+        d = d.astimezone(timezone.utc)
+    # Not strftime, as %a and %b are locale dependent.
+    return (
+        f"{_DAYS[d.weekday()]} {_MONTHS[d.month - 1]} {d.day:02d} {d.year:04d} "
+        f"{d.hour:02d}:{d.minute:02d}:{d.second:02d} GMT+0000"
+    )
+
+
+def _jsString(s: str | None) -> str:
+    # String concatenation in the viewer renders missing labels as "undefined"
+    return 'undefined' if s is None else s
+
+
+class SearchIndexBuilder:
+
+    def __init__(self) -> None:
+        # (source report index, target report data, IDs of facts in ix:hidden)
+        self._targetReports: list[tuple[int, dict[str, Any], set[str]]] = []
+
+    def addTargetReport(self, sourceReportIndex: int, reportData: dict[str, Any], hiddenFactIds: set[str]) -> None:
+        """
+        Add a target report whose facts should be indexed.  The report data
+        is read when the index is built, so may still be added to.
+        """
+        self._targetReports.append((sourceReportIndex, reportData, hiddenFactIds))
+
+    def availableLanguages(self) -> list[str]:
+        langs: dict[str, None] = {}
+        for _, reportData, _ in self._targetReports:
+            for concept in reportData["concepts"].values():
+                for labels in concept.get("labels", {}).values():
+                    langs.update(dict.fromkeys(labels))
+        return list(langs)
+
+    def defaultLanguage(self) -> str | None:
+        langs = self.availableLanguages()
+        for lang in ("en", "en-us"):
+            if lang in langs:
+                return lang
+        return min(langs, default=None)
+
+    def label(self, reportData: dict[str, Any], conceptName: str, role: str, lang: str | None) -> str | None:
+        """
+        Select a label in the same way as the viewer's XBRLReport.getLabel.
+        """
+        concept = reportData["concepts"].get(conceptName)
+        if concept is None:
+            return "<no label>"
+        labels = concept.get("labels", {}).get(role)
+        if not labels:
+            return None
+        if lang and labels.get(lang):
+            return str(labels[lang])
+        for fallback in ("en", "en-us", min(labels)):
+            if labels.get(fallback) is not None:
+                return str(labels[fallback])
+        return None
+
+    def widerConcepts(self, reportData: dict[str, Any], conceptName: str) -> list[str]:
+        return [
+            src
+            for relsBySource in reportData.get("rels", {}).get("w-n", {}).values()
+            for src, rels in relsBySource.items()
+            for rel in rels
+            if rel["t"] == conceptName
+        ]
+
+    def searchDocument(self, vuid: str, factData: dict[str, Any], reportData: dict[str, Any], lang: str | None) -> dict[str, Any]:
+        aspects = factData["a"]
+        conceptName = aspects["c"]
+        doc: dict[str, Any] = {
+            "id": vuid,
+            "concept": conceptName.split(":")[1],
+            "doc": self.label(reportData, conceptName, "doc", lang),
+        }
+        period = aspects.get("p")
+        if period and period != "f":
+            doc["date"] = momentString(period.split("/")[-1])
+            if "/" in period:
+                doc["startDate"] = momentString(period.split("/")[0])
+
+        label = self.label(reportData, conceptName, "std", lang)
+        for dim, member in aspects.items():
+            if ":" not in dim:
+                continue
+            if reportData["concepts"].get(dim, {}).get("d") == "t":
+                if member is not None:
+                    label = f"{_jsString(label)} {member}"
+            else:
+                label = f"{_jsString(label)} {_jsString(self.label(reportData, member, 'std', lang))}"
+        doc["label"] = label
+
+        references = reportData["concepts"].get(conceptName, {}).get("r")
+        doc["ref"] = " ".join(part[1] for ref in references for part in ref) if references else ""
+
+        wider = self.widerConcepts(reportData, conceptName)
+        if wider:
+            doc["widerConcept"] = wider[0].split(":")[1]
+            doc["widerLabel"] = self.label(reportData, wider[0], "std", lang)
+            doc["widerDoc"] = self.label(reportData, wider[0], "doc", lang)
+        return {k: v for k, v in doc.items() if v is not None}
+
+    def searchDocuments(self, lang: str | None) -> list[dict[str, Any]]:
+        """
+        Build search documents for all facts, in the order in which the
+        viewer would index them: facts in ix:hidden are added last, so that
+        they appear later in the default search.
+        """
+        docs: list[dict[str, Any]] = []
+        for hidden in (False, True):
+            for sourceReportIndex, reportData, hiddenFactIds in self._targetReports:
+                for factId, factData in reportData["facts"].items():
+                    if (factId in hiddenFactIds) == hidden:
+                        docs.append(self.searchDocument(f"{sourceReportIndex}-{factId}", factData, reportData, lang))
+        return docs
+
+    def searchData(self, buildIndex: bool = False) -> dict[str, Any]:
+        """
+        Return the search data to be included in the viewer data.  Labels are
+        selected for a single language, so the viewer only uses this data if
+        it is showing that language, or if the report only has one.
+        :param buildIndex: True to include a serialized lunr index, rather
+            than the documents to build it from.  Requires the lunr package.
+        """
+        lang = self.defaultLanguage()
+        docs = self.searchDocuments(lang)
+        if buildIndex and lunr is not None:
+            index = lunr(
+                ref="id",
+                fields=SEARCH_FIELDS,
+                documents=[{"id": doc["id"], **{f: doc.get(f) for f in SEARCH_FIELDS}} for doc in docs],
+            )
+            return {"lang": lang, "index": index.serialize()}
+        return {"lang": lang, "docs": docs}
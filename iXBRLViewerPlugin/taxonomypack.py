@@ -0,0 +1,140 @@
+# See COPYRIGHT.md for copyright information
+
+"""
+Taxonomy packs hold the concept data for a base taxonomy (such as US-GAAP,
+IFRS or ESEF) that would otherwise be repeated in every viewer generated for
+a filing using it.
+
+A pack covers a single taxonomy namespace.  The namespaces of the base
+taxonomies change with each version, so a pack is specific to a version, and
+is named after its namespace.  Concept data is in the same form as in the
+viewer data, but keyed by local name, with its own prefix and role maps.
+
+When a builder is given a pack, the data for concepts in the pack is replaced
+with a reference to it, along with any labels and references for the concept
+from linkbases outside the pack, such as those of an extension taxonomy.  The
+viewer fetches the pack, which can be cached by the browser or a CDN, and
+merges the data back in.
+
+A concept's data is only taken from the pack if all of the label and
+reference relationships extracted when the pack was created are still in
+effect, so that labels prohibited by an extension taxonomy are not shown.
+
+Usage:
+
+    python -m iXBRLViewerPlugin.taxonomypack https://xbrl.fasb.org/us-gaap/2024/entire/us-gaap-entryPoint-std-2024.xsd --namespace http://fasb.org/us-gaap/2024 --out packs/
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+
+# Version of the taxonomy pack format
+TAXONOMY_PACK_FORMAT = 1
+
+
+def taxonomyPackFilename(namespace: str) -> str:
+    """
+    Return the filename for the taxonomy pack of a namespace.
+    """
+    name = re.sub(r'^[a-z]+://', '', namespace)
+    return re.sub(r'[^A-Za-z0-9.-]+', '-', name).strip('-') + '.json'
+
+
+class TaxonomyPack:
+    """
+    The parts of a taxonomy pack needed by the builder to decide whether a
+    concept's data can be taken from the pack.
+    """
+
+    def __init__(self, namespace: str, url: str, linkbases: frozenset[str], relationshipCounts: dict[str, int]) -> None:
+        """
+        :param url: The URL from which the viewer fetches the pack, relative to the viewer data.
+        :param linkbases: URLs of the linkbases from which the pack's labels and references were extracted.
+        :param relationshipCounts: The number of label and reference relationships of each concept in the pack.
+        """
+        self.namespace = namespace
+        self.url = url
+        self.linkbases = linkbases
+        self.relationshipCounts = relationshipCounts
+
+    @classmethod
+    def load(cls, path: str, url: str | None = None) -> TaxonomyPack:
+        """
+        Load a taxonomy pack file.
+        :param url: The URL from which the viewer fetches the pack.  Defaults to the name of the file.
+        """
+        return _loadTaxonomyPack(os.path.abspath(path), url or os.path.basename(path), os.path.getmtime(path))
+
+
+def loadTaxonomyPacks(paths: list[str], baseUrl: str | None = None) -> list[TaxonomyPack]:
+    """
+    Load taxonomy pack files.
+    :param baseUrl: The URL at which the packs are published.  If not
+        provided, packs are fetched from alongside the viewer data.
+    """
+    packs = []
+    for path in paths:
+        url = None
+        if baseUrl:
+            url = baseUrl.rstrip('/') + '/' + os.path.basename(path)
+        packs.append(TaxonomyPack.load(path, url))
+    return packs
+
+
+@lru_cache(maxsize=16)
+def _loadTaxonomyPack(path: str, url: str, mtime: float) -> TaxonomyPack:
+    # Packs are typically used for every filing processed by a long-running
+    # controller, so are only read again if they change.
+    with open(path, encoding="utf-8") as fin:
+        data = json.load(fin)
+    if data.get("format") != TAXONOMY_PACK_FORMAT:
+        raise ValueError(f"Unsupported taxonomy pack format in {path}: {data.get('format')}")
+    return TaxonomyPack(
+        data["namespace"],
+        url,
+        frozenset(data["linkbases"]),
+        data["relationshipCounts"],
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    from arelle import FileSource
+
+    from .batch import createController
+    from .constants import ERROR_MESSAGE_CODE, INFO_MESSAGE_CODE
+    from .iXBRLViewer import IXBRLViewerBuilder
+
+    parser = argparse.ArgumentParser(description="Create taxonomy packs of concept data shared between iXBRL Viewers")
+    parser.add_argument("entryPoint", help="Taxonomy entry point including the concepts of each namespace")
+    parser.add_argument("--namespace", action="append", required=True, help="Namespace of the concepts to include in a pack. May be repeated")
+    parser.add_argument("--package", action="append", default=[], help="Taxonomy package to load. May be repeated")
+    parser.add_argument("--out", default=".", help="Directory in which to save the packs")
+    args = parser.parse_args(argv)
+
+    cntlr = createController(args.package)
+    modelXbrl = cntlr.modelManager.load(FileSource.openFileSource(args.entryPoint, cntlr))
+    if modelXbrl is None or modelXbrl.modelDocument is None:
+        cntlr.addToLog(f"Unable to load {args.entryPoint}", messageCode=ERROR_MESSAGE_CODE)
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    for namespace in args.namespace:
+        pack = IXBRLViewerBuilder(cntlr).createTaxonomyPack(modelXbrl, namespace)
+        if not pack["concepts"]:
+            cntlr.addToLog(f"No concepts found in namespace {namespace}", messageCode=ERROR_MESSAGE_CODE)
+            return 1
+        path = os.path.join(args.out, taxonomyPackFilename(namespace))
+        with open(path, "w", encoding="utf-8") as fout:
+            json.dump(pack, fout, separators=(',', ':'))
+        cntlr.addToLog(f"Saved taxonomy pack of {len(pack['concepts'])} concepts to {path}", messageCode=INFO_MESSAGE_CODE)
+    cntlr.modelManager.close(modelXbrl)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import os
 from tkinter import EW, NSEW, BooleanVar, E, Event, Misc, StringVar, Toplevel, W
-from tkinter.ttk import Button, Checkbutton, Entry, Frame, Label
+from tkinter.ttk import Button, Checkbutton, Entry, Frame, Label, Progressbar
 from typing import Any
 
 from arelle.CntlrWinMain import CntlrWinMain
@@ -14,6 +14,7 @@ from .constants import (
     CONFIG_COPY_SCRIPT,
     CONFIG_FEATURE_PREFIX,
     CONFIG_FILE_DIRECTORY,
+    CONFIG_LABEL_LANGUAGES,
     CONFIG_LAUNCH_ON_LOAD,
     CONFIG_OUTPUT_FILE,
     CONFIG_SCRIPT_URL,
@@ -22,6 +23,7 @@ from .constants import (
     DEFAULT_LAUNCH_ON_LOAD,
     GUI_FEATURE_CONFIGS,
 )
+from .progress import GenerationProgress, ProgressUpdate
 
 _: TypeGetText
 
@@ -45,6 +47,8 @@ class BaseViewerDialog(Toplevel):
         self._scriptUrl.set(self._cntlrConfig.setdefault(CONFIG_SCRIPT_URL, UNSET_SCRIPT_URL))
         self._copyScript = BooleanVar()
         self._copyScript.set(self._cntlrConfig.setdefault(CONFIG_COPY_SCRIPT, DEFAULT_COPY_SCRIPT))
+        self._labelLanguages = StringVar()
+        self._labelLanguages.set(self._cntlrConfig.setdefault(CONFIG_LABEL_LANGUAGES, ''))
 
     @property
     def _cntlrConfig(self) -> dict[str, Any]:
@@ -88,6 +92,12 @@ class BaseViewerDialog(Toplevel):
         copyScriptCheckbutton.grid(row=y, column=0, pady=3, padx=3, sticky=W)
         copyScriptLabel.grid(row=y, column=1, columnspan=3, pady=3, padx=3, sticky=W)
 
+        y += 1
+        labelLanguagesLabel = Label(frame, text="Label languages (leave blank for all)")
+        labelLanguagesEntry = Entry(frame, textvariable=self._labelLanguages, width=80)
+        labelLanguagesLabel.grid(row=y, column=0, sticky=W, pady=3, padx=3)
+        labelLanguagesEntry.grid(row=y, column=1, columnspan=2, sticky=EW, pady=3, padx=3)
+
         y += 1
         featuresLabel = Label(frame, text="Generate with optional features:")
         featuresLabel.grid(row=y, column=0, columnspan=2, pady=3, padx=3, sticky=W)
@@ -163,6 +173,9 @@ class BaseViewerDialog(Toplevel):
         # Return list of feature keys with corresponding BooleanVar is set to True
         return [feature for feature, value in self._features.items() if value.get()]
 
+    def labelLanguages(self) -> str:
+        return self._labelLanguages.get()
+
     def scriptUrl(self) -> str:
         return self._scriptUrl.get()
 
@@ -267,6 +280,7 @@ class SettingsDialog(BaseViewerDialog):
         self._cntlrConfig[CONFIG_LAUNCH_ON_LOAD] = self._launchOnLoad.get()
         self._cntlrConfig[CONFIG_SCRIPT_URL] = self._scriptUrl.get()
         self._cntlrConfig[CONFIG_COPY_SCRIPT] = self._copyScript.get()
+        self._cntlrConfig[CONFIG_LABEL_LANGUAGES] = self._labelLanguages.get()
         for key, var in self._features.items():
             self._cntlrConfig[f'{CONFIG_FEATURE_PREFIX}{key}'] = var.get()
         self.cntlr.saveConfig()
@@ -279,5 +293,65 @@ class SettingsDialog(BaseViewerDialog):
         self._launchOnLoad.set(DEFAULT_LAUNCH_ON_LOAD)
         self._scriptUrl.set(UNSET_SCRIPT_URL)
         self._copyScript.set(DEFAULT_COPY_SCRIPT)
+        self._labelLanguages.set('')
         for featureConfig in GUI_FEATURE_CONFIGS:
             self._features[featureConfig.key].set(featureConfig.guiDefault)
+
+
+class ProgressDialog(Toplevel):
+    """
+    Dialog showing the progress of viewer generation in a worker thread, from
+    which generation can be cancelled.  The dialog is not modal, so the rest
+    of the GUI can be used during generation.  Methods must be called on the
+    GUI thread.
+    """
+
+    def __init__(self, cntlr: CntlrWinMain, progress: GenerationProgress) -> None:
+        super().__init__(cntlr.parent)
+        self.cntlr = cntlr
+        self.progress = progress
+        self.title("Generating iXBRL Viewer")
+        self.transient(cntlr.parent)
+
+        frame = Frame(self)
+        self._message = StringVar()
+        self._message.set("Starting")
+        messageLabel = Label(frame, textvariable=self._message, width=60)
+        messageLabel.grid(row=0, column=0, columnspan=2, sticky=W, pady=3, padx=3)
+        self._progressBar = Progressbar(frame, mode="indeterminate", length=400)
+        self._progressBar.grid(row=1, column=0, columnspan=2, sticky=EW, pady=3, padx=3)
+        self._cancelButton = Button(frame, text=_("Cancel"), command=self.cancel)
+        self._cancelButton.grid(row=2, column=1, sticky=E, pady=3, padx=3)
+        frame.grid(row=0, column=0, padx=10, pady=10, sticky=NSEW)
+        frame.columnconfigure(0, weight=1)
+
+        self.bind("<Escape>", self.cancel)
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        self._progressBar.start()
+
+    def showProgress(self, update: ProgressUpdate) -> None:
+        if not self.winfo_exists() or self.progress.cancelled:
+            return
+        self._message.set(update.describe())
+        if update.total:
+            if str(self._progressBar.cget("mode")) != "determinate":
+                self._progressBar.stop()
+                self._progressBar.configure(mode="determinate")
+            self._progressBar.configure(maximum=update.total, value=update.done)
+        elif str(self._progressBar.cget("mode")) != "indeterminate":
+            self._progressBar.configure(mode="indeterminate")
+            self._progressBar.start()
+
+    def cancel(self, event: Event[Misc] | None = None) -> None:
+        """
+        Cancels generation.  The dialog is closed once the worker thread has
+        stopped.
+        """
+        self.progress.cancel()
+        self._message.set("Cancelling")
+        self._cancelButton.state(["disabled"])
+
+    def close(self) -> None:
+        if self.winfo_exists():
+            self.cntlr.parent.focus_set()
+            self.destroy()
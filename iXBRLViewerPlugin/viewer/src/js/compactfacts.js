@@ -0,0 +1,53 @@
+// See COPYRIGHT.md for copyright information
+
+// Facts may be provided in a compact form, in which aspect names and string
+// aspect values are stored once, in a per-report string table, rather than
+// being repeated for every fact.  Each fact is encoded as:
+//
+//   [ id, [ name, value, name, value, ... ], { other fact properties } ]
+//
+// where names and string values are indices into the string table, and other
+// values (null units, mandatory flags) are included as is.
+//
+// Aspects are decoded when they are first used, so a fact that is never
+// inspected holds only its encoded aspects and a reference to the string
+// table.
+
+function decodeAspects(strings, encoded) {
+    const aspects = {};
+    for (let i = 0; i < encoded.length; i += 2) {
+        const value = encoded[i + 1];
+        aspects[strings[encoded[i]]] = typeof value === "number" ? strings[value] : value;
+    }
+    return aspects;
+}
+
+/*
+ * Returns the fact data for a fact in the compact form, with its aspects
+ * ("a") decoded on first access.
+ */
+function compactFactData(strings, aspects, data) {
+    Object.defineProperty(data, "a", {
+        configurable: true,
+        enumerable: true,
+        get() {
+            const decoded = decodeAspects(strings, aspects);
+            Object.defineProperty(data, "a", { value: decoded, writable: true, enumerable: true, configurable: true });
+            return decoded;
+        },
+    });
+    return data;
+}
+
+/*
+ * Returns an array of [ id, factData ] for the facts in the given target
+ * report data.  Facts in the compact form are not decoded until their
+ * aspects are used.
+ */
+export function reportFactEntries(reportData) {
+    if (reportData.compactFacts === undefined) {
+        return Object.entries(reportData.facts ?? {});
+    }
+    const { strings, facts } = reportData.compactFacts;
+    return facts.map(([id, aspects, data]) => [id, compactFactData(strings, aspects, data)]);
+}
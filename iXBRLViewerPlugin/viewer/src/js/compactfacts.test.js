@@ -0,0 +1,61 @@
+// See COPYRIGHT.md for copyright information
+
+import { reportFactEntries } from "./compactfacts.js";
+
+describe("Compact facts", () => {
+    test("Uncompressed facts", () => {
+        const facts = { "f1": { "a": { "c": "eg:Concept1" }, "v": "1" } };
+        expect(reportFactEntries({ "facts": facts })).toEqual(Object.entries(facts));
+    });
+
+    test("No facts", () => {
+        expect(reportFactEntries({})).toEqual([]);
+    });
+
+    test("Decode", () => {
+        const reportData = {
+            "compactFacts": {
+                "strings": [ "c", "eg:Concept1", "u", "p", "2018-01-01", "eg:Concept2", "eg:Dim", "eg:Member" ],
+                "facts": [
+                    [ "f1", [ 0, 1, 2, null, 3, 4 ], { "v": "1000", "d": -3 } ],
+                    [ "f2", [ 0, 5, 3, 4, 6, 7 ], { "v": "text", "fn": [ "fn1" ] } ],
+                ]
+            }
+        };
+        expect(reportFactEntries(reportData)).toEqual([
+            [ "f1", { "a": { "c": "eg:Concept1", "u": null, "p": "2018-01-01" }, "v": "1000", "d": -3 } ],
+            [ "f2", { "a": { "c": "eg:Concept2", "p": "2018-01-01", "eg:Dim": "eg:Member" }, "v": "text", "fn": [ "fn1" ] } ],
+        ]);
+    });
+
+    test("Literal values", () => {
+        const reportData = {
+            "compactFacts": {
+                "strings": [ "c", "eg:Concept1", "m" ],
+                "facts": [
+                    [ "f1", [ 0, 1, 2, true ], { "v": null } ],
+                ]
+            }
+        };
+        expect(reportFactEntries(reportData)).toEqual([
+            [ "f1", { "a": { "c": "eg:Concept1", "m": true }, "v": null } ],
+        ]);
+    });
+
+    test("Aspects decoded on first use", () => {
+        const reportData = {
+            "compactFacts": {
+                "strings": [ "c", "eg:Concept1" ],
+                "facts": [
+                    [ "f1", [ 0, 1 ], { "v": "1" } ],
+                ]
+            }
+        };
+        const [ [ id, factData ] ] = reportFactEntries(reportData);
+        expect(id).toBe("f1");
+        expect(Object.getOwnPropertyDescriptor(factData, "a").get).toBeDefined();
+        expect(factData.a).toEqual({ "c": "eg:Concept1" });
+        expect(Object.getOwnPropertyDescriptor(factData, "a").value).toBe(factData.a);
+        expect(Object.keys(factData)).toEqual([ "v", "a" ]);
+    });
+});
@@ -77,6 +77,11 @@ export class Fact {
     }
 
     value() {
+        // Large nonNumeric values may be omitted from the viewer data, in
+        // which case they are rebuilt from the document.
+        if (this.f.ov && this.f.v === undefined) {
+            this.f.v = this.ixNode.valueFromDocument();
+        }
         return this.f.v;
     }
 
@@ -85,7 +90,7 @@ export class Fact {
     }
 
     readableValueHTML(val) {
-        let v = val === undefined ? this.f.v : val;
+        let v = val === undefined ? this.value() : val;
         const span = document.createElement("span");
         span.classList.add("fact-value");
         if (this.isInvalidIXValue()) {
@@ -271,6 +276,16 @@ export class Fact {
         return true;
     }
 
+    /*
+     * Returns a string representing the aspect values of this fact, other
+     * than those of the aspects in the Set excluded.  Facts that are aligned
+     * with the excluded aspects covered have equal signatures.
+     */
+    aspectSignature(excluded) {
+        const aspects = this.f.a;
+        return JSON.stringify(Object.keys(aspects).filter(a => !excluded.has(a)).sort().map(a => [ a, aspects[a] ?? null ]));
+    }
+
     isEquivalentDuration(of) {
         return this.period().isEquivalentDuration(of.period());
     }
@@ -3,6 +3,7 @@
 import interact from 'interactjs'
 import $ from 'jquery'
 import { ReportSet } from "./reportset.js";
+import { loadTaxonomyPacks } from "./taxonomypack.js";
 import { Viewer, DocumentTooLargeError } from "./viewer.js";
 import { Inspector } from "./inspector.js";
 import { initializeTheme } from './theme.js';
@@ -249,16 +250,44 @@ export class iXBRLViewer {
         return iframe;
     }
 
-    _getTaxonomyData() {
+    _getTaxonomyDataElement() {
         for (let i = document.body.children.length - 1; i >= 0; i--) {
             const elt = document.body.children[i];
             if (elt.tagName.toUpperCase() === 'SCRIPT' && elt.getAttribute("type") === 'application/x.ixbrl-viewer+json') {
-                return elt.innerHTML;
+                return elt;
             }
         }
         return null;
     }
 
+    /* Returns a Promise which resolves to the viewer data as a JSON string,
+     * or null if it can't be found.  The data is either inline in the script
+     * tag, or, if the script tag has a src attribute, a separate file which
+     * is fetched from that URL. */
+    _getTaxonomyData() {
+        const elt = this._getTaxonomyDataElement();
+        if (elt === null) {
+            return Promise.resolve(null);
+        }
+        const src = elt.getAttribute("src");
+        if (src === null) {
+            return Promise.resolve(elt.innerHTML);
+        }
+        return fetch(new URL(src, document.baseURI))
+            .then((resp) => resp.ok ? resp.text() : Promise.reject(`Fetch of ${src} failed: ${resp.status}`))
+            .catch((err) => {
+                console.log(err);
+                return null;
+            });
+    }
+
+    /* Returns the URL of the viewer data, against which the URLs of any
+     * taxonomy packs that it uses are resolved. */
+    _getTaxonomyDataURL() {
+        const src = this._getTaxonomyDataElement()?.getAttribute("src") ?? null;
+        return src === null ? document.baseURI : new URL(src, document.baseURI);
+    }
+
     _checkDocumentSetBrowserSupport() {
         if (document.location.protocol === 'file:') {
             alert("Displaying iXBRL document sets from local files is not supported.  Please view the viewer files using a web server.");
@@ -313,12 +342,19 @@ export class iXBRLViewer {
         const iv = this;
         const inspector = this.inspector;
     
-        this._loadRuntimeConfig().then((runtimeConfig) => {
+        const stubViewer = $('body').hasClass('ixv-stub-viewer');
+
+        // Start fetching the viewer data, if it isn't inline, and any
+        // taxonomy packs that it uses, while the runtime config is loaded.
+        // We need to parse JSON first so that we can determine feature
+        // enablement before loading begins.
+        const taxonomyDataPromise = (iv.isViewerEnabled() || stubViewer ? iv._getTaxonomyData() : Promise.resolve(null))
+            .then((taxonomyData) => taxonomyData && loadTaxonomyPacks(JSON.parse(taxonomyData), iv._getTaxonomyDataURL()));
+
+        Promise.all([this._loadRuntimeConfig(), taxonomyDataPromise]).then(([runtimeConfig, parsedTaxonomyData]) => {
             this.runtimeConfig = runtimeConfig;
             initializeTheme();
 
-            const stubViewer = $('body').hasClass('ixv-stub-viewer');
-
             // If viewer is disabled, but not in stub viewer mode, just abort
             // loading to leave the iXBRL file as-is
             if (!iv.isViewerEnabled() && !stubViewer) {
@@ -329,9 +365,6 @@ export class iXBRLViewer {
             iv._loadInspectorHTML();
             let iframes = $();
 
-            // We need to parse JSON first so that we can determine feature enablement before loading begins.
-            const taxonomyData = iv._getTaxonomyData();
-            const parsedTaxonomyData = taxonomyData && JSON.parse(taxonomyData);
             const features = iv._mergeFeatures(parsedTaxonomyData?.features, this.runtimeConfig.features);
             iv.setFeatures(features, window.location.search);
 
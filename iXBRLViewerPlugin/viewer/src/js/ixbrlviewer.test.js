@@ -253,3 +253,38 @@ describe("Guide link enablement", () => {
         expect(viewer.getGuideLinkUrl()).toEqual('/guide');
     });
 });
+
+describe("Viewer data", () => {
+    var viewer = null;
+    beforeAll(() => {
+        viewer = new iXBRLViewer({})
+    });
+
+    afterEach(() => {
+        document.body.innerHTML = '';
+        delete global.fetch;
+    });
+
+    test("No viewer data", async () => {
+        document.body.innerHTML = '<p>Report</p>';
+        await expect(viewer._getTaxonomyData()).resolves.toBeNull();
+    });
+
+    test("Inline viewer data", async () => {
+        document.body.innerHTML = '<p>Report</p><script type="application/x.ixbrl-viewer+json">{"features": {}}</script>';
+        await expect(viewer._getTaxonomyData()).resolves.toEqual('{"features": {}}');
+    });
+
+    test("Viewer data file", async () => {
+        document.body.innerHTML = '<p>Report</p><script type="application/x.ixbrl-viewer+json" src="ixbrlviewer-data.json"></script>';
+        global.fetch = jest.fn(() => Promise.resolve({ ok: true, text: () => Promise.resolve('{"features": {}}') }));
+        await expect(viewer._getTaxonomyData()).resolves.toEqual('{"features": {}}');
+        expect(global.fetch).toHaveBeenCalledWith(new URL("ixbrlviewer-data.json", document.baseURI));
+    });
+
+    test("Viewer data file missing", async () => {
+        document.body.innerHTML = '<p>Report</p><script type="application/x.ixbrl-viewer+json" src="ixbrlviewer-data.json"></script>';
+        global.fetch = jest.fn(() => Promise.resolve({ ok: false, status: 404 }));
+        await expect(viewer._getTaxonomyData()).resolves.toBeNull();
+    });
+});
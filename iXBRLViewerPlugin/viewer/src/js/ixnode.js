@@ -1,7 +1,7 @@
 // See COPYRIGHT.md for copyright information
 
 import $ from 'jquery';
-import { isTransparent } from './util.js';
+import { isTransparent, localName } from './util.js';
 
 /*
  * Object to hold information related to iXBRL nodes in the HTML document.
@@ -11,10 +11,48 @@ import { isTransparent } from './util.js';
  * The wrapperNodes property is a jQuery object for the "containing" elements
  * which will be a node list containng an inserted div or span wrapper, any
  * absolutely positioned elements or the nearest enclosing td or th.
+ *
+ * The element property is the IX element itself.
  */
 
 var docOrderindex = 0;
 
+// Wrapper elements and classes added by the viewer are identified by these
+// class prefixes.
+const viewerClassRE = /^(ixbrl|review)-/;
+
+function isViewerWrapper(e) {
+    return (['SPAN', 'DIV'].includes(e.nodeName.toUpperCase())
+        && e.attributes.length === 1
+        && e.classList.length > 0
+        && Array.from(e.classList).every(c => viewerClassRE.test(c)));
+}
+
+/*
+ * Returns a copy of the content of an IX element, as it was in the source
+ * document: nested IX elements and the wrappers and classes added by the
+ * viewer are replaced by their content, and ix:exclude elements are removed.
+ */
+function sourceContent(element) {
+    const copy = element.cloneNode(true);
+    for (const e of Array.from(copy.getElementsByTagName('*')).reverse()) {
+        const name = localName(e.nodeName).toUpperCase();
+        if (name === 'EXCLUDE') {
+            e.remove();
+        }
+        else if (['NONNUMERIC', 'NONFRACTION', 'FOOTNOTE'].includes(name) || isViewerWrapper(e)) {
+            e.replaceWith(...e.childNodes);
+        }
+        else if (e.hasAttribute('class')) {
+            e.classList.remove(...Array.from(e.classList).filter(c => viewerClassRE.test(c)));
+            if (e.classList.length === 0) {
+                e.removeAttribute('class');
+            }
+        }
+    }
+    return copy;
+}
+
 export class IXNode {
     constructor(id, wrapperNodes, docIndex) {
         this.wrapperNodes = wrapperNodes;
@@ -45,6 +83,19 @@ export class IXNode {
             .join(" ");
     }
 
+    /*
+     * Returns the value of a nonNumeric fact, rebuilt from the content of its
+     * IX element and continuations.  Used for facts with values that were
+     * omitted from the viewer data because they are already in the document.
+     */
+    valueFromDocument() {
+        return [this].concat(this.continuations)
+            .filter(n => n.element !== undefined)
+            .map(n => sourceContent(n.element))
+            .map(e => this.escaped ? e.innerHTML : e.textContent)
+            .join("");
+    }
+
     htmlHidden() {
         return this.wrapperNodes.filter(':not(.ixbrl-no-highlight)').is(':hidden') || this.wrapperNodes.is((i,e) => isTransparent($(e).css('color')));
     }
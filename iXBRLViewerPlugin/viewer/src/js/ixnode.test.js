@@ -0,0 +1,30 @@
+// See COPYRIGHT.md for copyright information
+
+import { IXNode } from "./ixnode.js";
+
+function ixNode(id, html) {
+    const div = document.createElement("div");
+    div.innerHTML = html;
+    const ixn = new IXNode(id, null, 0);
+    ixn.element = div.firstElementChild;
+    return ixn;
+}
+
+describe("Values rebuilt from the document", () => {
+    test("Text value", () => {
+        const ixn = ixNode("f1", '<ix:nonNumeric id="f1">Some <span class="ixbrl-element"><ix:nonNumeric id="f2">nested</ix:nonNumeric></span> text<ix:exclude> excluded</ix:exclude></ix:nonNumeric>');
+        expect(ixn.valueFromDocument()).toBe("Some nested text");
+    });
+
+    test("Continuations", () => {
+        const ixn = ixNode("f1", '<ix:nonNumeric id="f1" continuedAt="c1">Start, </ix:nonNumeric>');
+        ixn.continuations = [ ixNode("c1", '<ix:continuation id="c1">end</ix:continuation>') ];
+        expect(ixn.valueFromDocument()).toBe("Start, end");
+    });
+
+    test("Escaped value", () => {
+        const ixn = ixNode("f1", '<ix:nonNumeric id="f1" escape="true"><p class="ixbrl-element note">Total <b>assets</b> were <span class="review-untagged-number">1,000</span></p><div class="ixbrl-element ixbrl-element-nonnumeric"><ix:nonNumeric id="f2"><p class="ixbrl-sub-element">Nested</p></ix:nonNumeric></div></ix:nonNumeric>');
+        ixn.escaped = true;
+        expect(ixn.valueFromDocument()).toBe('<p class="note">Total <b>assets</b> were 1,000</p><p>Nested</p>');
+    });
+});
@@ -27,7 +27,7 @@ export class ReportSetOutline {
 export class DocumentOutline {
     constructor(report) {
         this.report = report;
-        const facts = report.facts().sort((a, b) => a.ixNode.docOrderindex - b.ixNode.docOrderindex);
+        const facts = [...report.facts()].sort((a, b) => a.ixNode.docOrderindex - b.ixNode.docOrderindex);
         const runFacts = {};
         const longestRunFacts = {};
         this._buildDimensionMap();
@@ -116,29 +116,19 @@ export class XBRLReport {
 
     getAlignedFacts(f, coveredAspects) {
         // XXX should filter to current report facts?
-        const all = this.reportSet.facts();
-        const aligned = [];
-        if (!coveredAspects) {
-            coveredAspects = {};
-        }
-        for (const ff of all) {
-            if (ff.isAligned(f, coveredAspects)) {
-                aligned.push(ff);
-            }
-        }
-        return aligned; 
+        return this.reportSet.getAlignedFacts(f, coveredAspects);
     }
 
     deduplicate(facts) {
+        // Facts with no aspects covered are aligned if and only if their
+        // signatures are equal.
+        const excluded = new Set();
+        const seen = new Set();
         const ff = [];
         for (const f of facts) {
-            let dupe = false;
-            for (const other of ff) {
-                if (other.isAligned(f,{})) {
-                    dupe = true;
-                }
-            }
-            if (!dupe) {
+            const signature = f.aspectSignature(excluded);
+            if (!seen.has(signature)) {
+                seen.add(signature);
                 ff.push(f);
             }
         }
@@ -8,11 +8,25 @@ import { titleCase, viewerUniqueId } from "./util.js";
 import { QName } from "./qname.js";
 import { ViewerOptions } from './viewerOptions.js';
 import { TaxonomyNamer } from './taxonomynamer.js';
+import { reportFactEntries } from './compactfacts.js';
 
 // Class represents the set of XBRL "target" reports shown in the viewer.
 // Each contained report represents the data from a single target document in a
 // single iXBRL Document or iXBRL Document Set
 
+/*
+ * Returns an array of [ factId, [ footnote or fact ID, ... ] ] for the facts
+ * in the given target report data that have footnotes.  Viewer data produced
+ * by older versions of the plugin records footnotes on each fact, rather than
+ * in a per-report map.
+ */
+function footnoteEntries(reportData, factEntries) {
+    if (reportData.footnotes !== undefined) {
+        return Object.entries(reportData.footnotes);
+    }
+    return factEntries.filter(([id, factData]) => factData.fn !== undefined).map(([id, factData]) => [id, factData.fn]);
+}
+
 export class ReportSet {
     constructor(data) {
         this._data = data;
@@ -32,6 +46,11 @@ export class ReportSet {
     _initialize() {
         this._items = {};
         this.reports = [];
+        this._facts = undefined;
+        this._factsByReport = undefined;
+        // Indexes of facts by aspect signature, keyed by the covered aspects
+        // excluded from the signature
+        this._alignedFactIndexes = new Map();
         // Build an array of footnotes IDs in document order so that we can assign
         // numbers to foonotes
         const fnorder = Object.keys(this._ixNodeMap).filter((id) => this._ixNodeMap[id].footnote);
@@ -42,7 +61,8 @@ export class ReportSet {
             for (const reportData of sourceReport.targetReports) {
                 const report = new XBRLReport(this, reportData);
                 this.reports.push(report);
-                for (const [id, factData] of Object.entries(reportData.facts)) {
+                const factEntries = reportFactEntries(reportData);
+                for (const [id, factData] of factEntries) {
                     const vuid = viewerUniqueId(reportIndex, id);
                     this._items[vuid] = new Fact(report, vuid, factData);
                 }
@@ -52,10 +72,9 @@ export class ReportSet {
                 //
                 // Associate source facts with target footnote/facts to allow two way
                 // navigation.
-                for (const [id, factData] of Object.entries(reportData.facts)) {
+                for (const [id, fns] of footnoteEntries(reportData, factEntries)) {
                     const vuid = viewerUniqueId(reportIndex, id);
                     const fact = this._items[vuid];
-                    const fns = factData.fn || [];
                     fns.forEach((fnid) => {
                         const fnvuid = viewerUniqueId(reportIndex, fnid);
                         var fn = this._items[fnvuid];
@@ -88,13 +107,58 @@ export class ReportSet {
     }
 
     facts() {
-        return Object.values(this._items).filter(i => i instanceof Fact);
+        if (this._facts === undefined) {
+            this._facts = Object.values(this._items).filter(i => i instanceof Fact);
+        }
+        return this._facts;
+    }
+
+    /*
+     * Returns the facts that are aligned with f (see Fact.isAligned).
+     *
+     * Facts are looked up in an index keyed on their signature with the
+     * covered aspects excluded, which is built on first use for each set of
+     * covered aspects.  Aligned facts always have the same signature as f,
+     * provided that f has all of the covered aspects.
+     */
+    getAlignedFacts(f, coveredAspects) {
+        coveredAspects = coveredAspects ?? {};
+        const covered = Object.keys(coveredAspects).sort();
+        if (!covered.every(a => a in f.f.a)) {
+            return this.facts().filter(ff => ff.isAligned(f, coveredAspects));
+        }
+        const excluded = new Set(covered);
+        const indexKey = JSON.stringify(covered);
+        let index = this._alignedFactIndexes.get(indexKey);
+        if (index === undefined) {
+            index = new Map();
+            for (const ff of this.facts()) {
+                const signature = ff.aspectSignature(excluded);
+                const facts = index.get(signature);
+                if (facts === undefined) {
+                    index.set(signature, [ ff ]);
+                }
+                else {
+                    facts.push(ff);
+                }
+            }
+            this._alignedFactIndexes.set(indexKey, index);
+        }
+        return (index.get(f.aspectSignature(excluded)) ?? []).filter(ff => ff.isAligned(f, coveredAspects));
     }
 
     filingDocuments() {
         return this._data.filingDocuments;
     }
 
+    /*
+     * Returns search documents or index built when the viewer was generated,
+     * if any.
+     */
+    searchData() {
+        return this._data.search;
+    }
+
     prefixMap() {
         return this._data.prefixes;
     }
@@ -229,6 +293,31 @@ export class ReportSet {
         return sourceReports.map((x, n) => (x.docSetFiles ?? []).map(file => ({ index: n, file: file }))).flat();
     }
 
+    /**
+     * Returns the inline XBRL elements and continuation chains found when the
+     * viewer was generated, or undefined if they were not included.
+     * The returned object has:
+     *   documents - for each entry in reportFiles(), a list of [ ref, inHidden ]
+     *   continuations - a map of viewer unique IDs to the IDs of their continuations
+     * @return {Object}   Preprocessed inline XBRL elements, or undefined
+     */
+    preprocessedIXBRL() {
+        const sourceReports = this._data.sourceReports;
+        if (sourceReports === undefined || !sourceReports.every(sr => sr.ixItems !== undefined)) {
+            return undefined;
+        }
+        const continuations = {};
+        for (const [reportIndex, sourceReport] of sourceReports.entries()) {
+            for (const [itemId, chain] of Object.entries(sourceReport.continuations ?? {})) {
+                continuations[viewerUniqueId(reportIndex, itemId)] = chain.map(id => viewerUniqueId(reportIndex, id));
+            }
+        }
+        return {
+            documents: sourceReports.flatMap(sr => sr.ixItems),
+            continuations: continuations,
+        };
+    }
+
     /**
      * Returns true if the viewer is for more than one Inline XBRL document
      * This may be a single document set with multiple files, or multiple
@@ -258,7 +347,13 @@ export class ReportSet {
     }
 
     factsForReport(report) {
-        return Object.values(this._items).filter(i => i instanceof Fact && i.report == report);
+        if (this._factsByReport === undefined) {
+            this._factsByReport = new Map(this.reports.map(r => [ r, [] ]));
+            for (const f of this.facts()) {
+                this._factsByReport.get(f.report)?.push(f);
+            }
+        }
+        return this._factsByReport.get(report) ?? [];
     }
 
 }
@@ -184,6 +184,61 @@ describe("Multi report - basic", () => {
     });
 });
 
+describe("Multi report - compact facts", () => {
+    const data = multiReportTestData();
+    for (const sourceReport of data.sourceReports) {
+        for (const reportData of sourceReport.targetReports) {
+            const strings = [];
+            const intern = (s) => strings.includes(s) ? strings.indexOf(s) : strings.push(s) - 1;
+            const facts = Object.entries(reportData.facts).map(([id, { a, ...rest }]) => [
+                id,
+                Object.entries(a).flatMap(([k, v]) => [intern(k), typeof v === "string" ? intern(v) : v]),
+                rest
+            ]);
+            delete reportData.facts;
+            reportData.compactFacts = { strings: strings, facts: facts };
+        }
+    }
+    const testReportSet = new ReportSet(data);
+    testReportSet._initialize();
+
+    test("Facts decoded", () => {
+        const f = testReportSet.getItemById(viewerUniqueId(0, "f2"));
+        expect(f.conceptName()).toEqual("eg:Concept2");
+        expect(f.decimals()).toEqual(-3);
+        expect(testReportSet.getItemById(viewerUniqueId(1, "f1")).conceptName()).toEqual("eg:Concept1");
+        expect(testReportSet.facts()).toHaveLength(3);
+    });
+});
+
+describe("Multi report - footnotes", () => {
+    function checkFootnotes(testReportSet) {
+        const f1 = testReportSet.getItemById(viewerUniqueId(0, "f1"));
+        const f2 = testReportSet.getItemById(viewerUniqueId(0, "f2"));
+        const fn = testReportSet.getItemById(viewerUniqueId(0, "fn1"));
+        expect(f1.footnotes()).toEqual([fn]);
+        expect(f2.footnotes()).toEqual([]);
+        expect(fn.linkedFacts).toEqual([f1]);
+        expect(testReportSet.facts()).toHaveLength(3);
+    }
+
+    test("Footnote map", () => {
+        const data = multiReportTestData();
+        data.sourceReports[0].targetReports[0].footnotes = { "f1": [ "fn1" ] };
+        const testReportSet = new ReportSet(data);
+        testReportSet._initialize();
+        checkFootnotes(testReportSet);
+    });
+
+    test("Footnotes on facts", () => {
+        const data = multiReportTestData();
+        data.sourceReports[0].targetReports[0].facts.f1.fn = [ "fn1" ];
+        const testReportSet = new ReportSet(data);
+        testReportSet._initialize();
+        checkFootnotes(testReportSet);
+    });
+});
+
 describe("Multi report - Language options", () => {
     const testReportSet = new ReportSet(multiReportTestData());
     testReportSet._initialize();
@@ -277,6 +332,29 @@ describe("Multi report - doc set files", () => {
     });
 });
 
+describe("Multi report - preprocessed inline XBRL", () => {
+    test("Not preprocessed", () => {
+        const testReportSet = new ReportSet(multiReportTestData(false));
+        testReportSet._initialize();
+        expect(testReportSet.preprocessedIXBRL()).toBeUndefined();
+    });
+    test("Preprocessed", () => {
+        const data = multiReportTestData(false);
+        data.sourceReports[0].docSetFiles = ["a.html", "b.html"];
+        data.sourceReports[0].ixItems = [[["c1", 0], ["f1", 0]], [[0, 1]]];
+        data.sourceReports[0].continuations = { "f1": [ "c1" ] };
+        data.sourceReports[1].docSetFiles = ["c.html"];
+        data.sourceReports[1].ixItems = [[["f1", 0]]];
+        data.sourceReports[1].continuations = {};
+        const testReportSet = new ReportSet(data);
+        testReportSet._initialize();
+        expect(testReportSet.preprocessedIXBRL()).toStrictEqual({
+            documents: [[["c1", 0], ["f1", 0]], [[0, 1]], [["f1", 0]]],
+            continuations: { [viewerUniqueId(0, "f1")]: [ viewerUniqueId(0, "c1") ] },
+        });
+    });
+});
+
 describe("Single report - basic", () => {
     const testReportSet = new ReportSet(singleReportTestData());
     testReportSet._initialize();
@@ -355,3 +433,44 @@ describe("Fetching software credit", () => {
         expect(softwareCredits).toEqual(["Example credit text A", "Example credit text B", "Example credit text C"]);
     });
 });
+
+describe("Aligned facts", () => {
+    const data = singleReportTestData();
+    data.facts = {
+        ...createNumericFact("f1", "eg:Concept1", "iso2417:USD", "2018-01-01/2019-01-01", 1000, -3),
+        ...createNumericFact("f2", "eg:Concept1", "iso2417:USD", "2018-01-01/2019-01-01", 1000, -3),
+        ...createNumericFact("f3", "eg:Concept1", "iso2417:USD", "2019-01-01/2020-01-01", 2000, -3),
+        ...createNumericFact("f4", "eg:Concept2", "iso2417:USD", "2018-01-01/2019-01-01", 3000, -3),
+        ...createNumericFact("f5", "eg:Concept2", "iso2417:GBP", "2018-01-01/2019-01-01", 4000, -3),
+    };
+    data.facts.f6 = { "a": { "c": "eg:Concept1", "u": "iso2417:USD", "p": "2018-01-01/2019-01-01", "eg:Dim": "eg:Member" }, "v": 5000 };
+    const testReportSet = new ReportSet(data);
+    testReportSet._initialize();
+    const fact = id => testReportSet.getItemById(viewerUniqueId(0, id));
+    const alignedIds = (f, covered) => testReportSet.getAlignedFacts(f, covered).map(ff => ff.localId()).sort();
+
+    test("Duplicate facts", () => {
+        expect(alignedIds(fact("f1"))).toEqual(["f1", "f2"]);
+        expect(alignedIds(fact("f6"))).toEqual(["f6"]);
+    });
+
+    test("Covered aspects", () => {
+        expect(alignedIds(fact("f1"), { "p": null })).toEqual(["f1", "f2", "f3"]);
+        expect(alignedIds(fact("f1"), { "c": null })).toEqual(["f1", "f2", "f4"]);
+        expect(alignedIds(fact("f1"), { "c": ["eg:Concept2"] })).toEqual(["f4"]);
+        expect(alignedIds(fact("f4"), { "c": "eg:Concept1", "p": null })).toEqual(["f1", "f2", "f3"]);
+        // Results are the same once the index for the covered aspects is built
+        expect(alignedIds(fact("f4"), { "p": null, "c": "eg:Concept1" })).toEqual(["f1", "f2", "f3"]);
+    });
+
+    test("Covered aspect not reported on fact", () => {
+        expect(alignedIds(fact("f1"), { "eg:Dim": null })).toEqual(["f1", "f2"]);
+        expect(alignedIds(fact("f6"), { "eg:Dim": null })).toEqual(["f6"]);
+    });
+
+    test("Deduplicate", () => {
+        const report = testReportSet.reports[0];
+        const facts = report.deduplicate(report.getAlignedFacts(fact("f1"), { "c": null }));
+        expect(facts.map(f => f.localId()).sort()).toEqual(["f1", "f4"]);
+    });
+});
@@ -8,9 +8,55 @@ export class ReportSearch {
         this.ready = false;
     }
 
+    /*
+     * Returns search data built when the viewer was generated, if it can be
+     * used.  Labels in the prebuilt data are in a single language, so it is
+     * only used if that is the language being shown, or if there is only
+     * one.
+     */
+    _prebuiltSearchData() {
+        const search = this._reportSet.searchData();
+        if (search === undefined) {
+            return undefined;
+        }
+        if (this._reportSet.availableLanguages().length > 1 && search.lang !== this._reportSet.viewerOptions.language) {
+            return undefined;
+        }
+        return search;
+    }
+
+    _searchDocument(f) {
+        var doc = { "id": f.vuid };
+        var l = f.getLabel("std");
+        doc.concept = f.conceptQName().localname;
+        doc.doc = f.getLabel("doc");
+        doc.date = f.periodTo();
+        doc.startDate = f.periodFrom();
+        var dims = f.dimensions();
+        for (var d in dims) {
+            if (f.report.getConcept(d).isTypedDimension()) {
+                if (dims[d] !== null) {
+                    l += " " + dims[d];
+                }
+            }
+            else {
+                l += " " + f.report.getLabel(dims[d], "std");
+            }
+        }
+        doc.label = l;
+        doc.ref = f.concept().referenceValuesAsString();
+        const wider = f.widerConcepts();
+        if (wider.length > 0) {
+            doc.widerConcept = f.report.qname(wider[0]).localname;
+            doc.widerLabel = f.report.getLabel(wider[0], "std");
+            doc.widerDoc = f.report.getLabel(wider[0], "doc");
+        }
+        return doc;
+    }
+
     * buildSearchIndex(doneCallback) {
+        const prebuilt = this._prebuiltSearchData();
         var docs = [];
-        var dims = {};
         var facts = this._reportSet.facts();
         this.periods = {};
         // Add hidden facts to index later, so that they appear later in the
@@ -21,32 +67,9 @@ export class ReportSearch {
                 if (f.isHidden() !== hidden) {
                     continue;
                 }
-                var doc = { "id": f.vuid };
-                var l = f.getLabel("std");
-                doc.concept = f.conceptQName().localname;
-                doc.doc = f.getLabel("doc");
-                doc.date = f.periodTo();
-                doc.startDate = f.periodFrom();
-                var dims = f.dimensions();
-                for (var d in dims) {
-                    if (f.report.getConcept(d).isTypedDimension()) {
-                        if (dims[d] !== null) {
-                            l += " " + dims[d];
-                        }
-                    }
-                    else {
-                        l += " " + f.report.getLabel(dims[d], "std");
-                    }
+                if (prebuilt === undefined) {
+                    docs.push(this._searchDocument(f));
                 }
-                doc.label = l;
-                doc.ref = f.concept().referenceValuesAsString();
-                const wider = f.widerConcepts();
-                if (wider.length > 0) {
-                    doc.widerConcept = f.report.qname(wider[0]).localname;
-                    doc.widerLabel = f.report.getLabel(wider[0], "std");
-                    doc.widerDoc = f.report.getLabel(wider[0], "doc");
-                }
-                docs.push(doc);
 
                 var p = f.period();
                 if (p) {
@@ -58,6 +81,12 @@ export class ReportSearch {
                 }
             }
         }
+        if (prebuilt?.index !== undefined) {
+            this._searchIndex = lunr.Index.load(prebuilt.index);
+            this.ready = true;
+            doneCallback();
+            return;
+        }
         const builder = new lunr.Builder();
         builder.pipeline.add(
           lunr.trimmer,
@@ -81,7 +110,7 @@ export class ReportSearch {
         builder.field('widerConcept');
 
 
-        for (const [i, doc] of docs.entries()) {
+        for (const [i, doc] of (prebuilt?.docs ?? docs).entries()) {
             builder.add(doc);
             if (i % 100 === 0) {
                 yield;
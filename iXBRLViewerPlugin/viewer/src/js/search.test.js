@@ -1,5 +1,6 @@
 // See COPYRIGHT.md for copyright information
 
+import lunr from "lunr";
 import { ReportSearch } from "./search.js"
 import { ReportSet } from "./reportset.js";
 import { viewerUniqueId } from "./util.js";
@@ -729,3 +730,49 @@ describe("Search mandatory facts filter", () => {
         expect(results).toEqual(['mandatory1', 'other1']);
     });
 });
+
+describe("Prebuilt search documents", () => {
+    const cashConcept = 'us-gaap:Cash';
+    function reportWithSearchData(search) {
+        const report = testReport(
+            {
+                'concepts': {
+                    ...createSimpleConcept(cashConcept, 'Cash')
+                },
+                'facts': {
+                    ...createNumericFact('f1', cashConcept, 'iso4217:USD', '2018-01-01/2019-01-01', 1000 ),
+                }
+            },
+        );
+        report._data.search = search;
+        return report;
+    }
+
+    test("Prebuilt documents are indexed", () => {
+        const reportSearch = getReportSearch(reportWithSearchData({
+            "lang": "en-us",
+            "docs": [ { "id": viewerUniqueId(0, 'f1'), "label": "Prebuilt label" } ]
+        }));
+        expect(reportSearch.search(testSearchSpec('prebuilt')).map(r => r.fact.vuid)).toEqual([ viewerUniqueId(0, 'f1') ]);
+        // Documents are not rebuilt from the report
+        expect(reportSearch.search(testSearchSpec('cash'))).toEqual([]);
+        expect(Object.keys(reportSearch.periods)).toHaveLength(1);
+    });
+
+    test("Prebuilt index is loaded", () => {
+        const builder = new lunr.Builder();
+        builder.ref('id');
+        builder.field('label');
+        builder.add({ "id": viewerUniqueId(0, 'f1'), "label": "indexed" });
+        const reportSearch = getReportSearch(reportWithSearchData({
+            "lang": "en-us",
+            "index": JSON.parse(JSON.stringify(builder.build()))
+        }));
+        expect(reportSearch.search(testSearchSpec('indexed')).map(r => r.fact.vuid)).toEqual([ viewerUniqueId(0, 'f1') ]);
+    });
+
+    test("Documents are built in the browser without prebuilt data", () => {
+        const reportSearch = getReportSearch(reportWithSearchData(undefined));
+        expect(reportSearch.search(testSearchSpec('cash')).map(r => r.fact.vuid)).toEqual([ viewerUniqueId(0, 'f1') ]);
+    });
+});
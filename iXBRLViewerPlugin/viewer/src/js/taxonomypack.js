@@ -0,0 +1,126 @@
+// See COPYRIGHT.md for copyright information
+
+// Taxonomy packs hold the concept data for a base taxonomy, shared between
+// viewers.  Concepts taken from a pack are recorded in the viewer data with
+// the index of the pack ("p"), and any labels and references from outside
+// the pack.  Packs use their own prefix and role maps, so their concept data
+// is translated to those of the viewer data when it is merged in.
+
+function targetReportsData(data) {
+    return data.sourceReports?.flatMap(sr => sr.targetReports) ?? [ data ];
+}
+
+/*
+ * Returns a map of the keys used in a pack's prefix or role map to those
+ * used for the same URIs in the viewer data, adding any that are missing.
+ */
+function keyMap(packMap, dataMap) {
+    const keysByURI = new Map(Object.entries(dataMap).map(([k, uri]) => [uri, k]));
+    const keys = new Map();
+    for (const [packKey, uri] of Object.entries(packMap ?? {})) {
+        let key = keysByURI.get(uri);
+        if (key === undefined) {
+            const base = packKey.replace(/\d+$/, '');
+            key = packKey;
+            for (let n = 1; key in dataMap; n++) {
+                key = `${base}${n}`;
+            }
+            dataMap[key] = uri;
+            keysByURI.set(uri, key);
+        }
+        keys.set(packKey, key);
+    }
+    return keys;
+}
+
+function mapQName(prefixes, qname) {
+    const i = qname.indexOf(':');
+    return i < 0 ? qname : (prefixes.get(qname.substring(0, i)) ?? qname.substring(0, i)) + qname.substring(i);
+}
+
+class PackConcepts {
+    constructor(pack, data) {
+        this._pack = pack;
+        this.prefixes = keyMap(pack.prefixes, data.prefixes);
+        this.roles = keyMap(pack.roles, data.roles);
+    }
+
+    roleDefs() {
+        return Object.fromEntries(Object.entries(this._pack.roleDefs ?? {}).map(([role, labels]) => [this.roles.get(role) ?? role, labels]));
+    }
+
+    /*
+     * Returns a copy of the data for a concept, translated to the prefixes
+     * and roles of the viewer data.
+     */
+    conceptData(localName) {
+        const packData = this._pack.concepts[localName];
+        if (packData === undefined) {
+            return { labels: {} };
+        }
+        const c = { ...packData, labels: {} };
+        for (const [role, labels] of Object.entries(packData.labels ?? {})) {
+            c.labels[this.roles.get(role) ?? role] = { ...labels };
+        }
+        for (const k of [ "dt", "td" ]) {
+            if (c[k] !== undefined) {
+                c[k] = mapQName(this.prefixes, c[k]);
+            }
+        }
+        return c;
+    }
+}
+
+/*
+ * Merges the concept data from taxonomy packs into the viewer data.
+ * packs is a list of the pack data for each entry in data.taxonomyPacks,
+ * with null for any that could not be fetched, in which case the concepts
+ * from that pack have only the data included in the viewer data.
+ */
+export function mergeTaxonomyPacks(data, packs) {
+    const packConcepts = packs.map(pack => pack === null ? null : new PackConcepts(pack, data));
+    for (const reportData of targetReportsData(data)) {
+        const usedPacks = new Set();
+        for (const [name, c] of Object.entries(reportData.concepts ?? {})) {
+            if (c.p === undefined) {
+                continue;
+            }
+            const pc = packConcepts[c.p];
+            const { p, labels, r, ...other } = c;
+            const merged = pc?.conceptData(name.substring(name.indexOf(':') + 1)) ?? { labels: {} };
+            for (const [role, roleLabels] of Object.entries(labels ?? {})) {
+                merged.labels[role] = { ...merged.labels[role], ...roleLabels };
+            }
+            if (r !== undefined) {
+                merged.r = [ ...(merged.r ?? []), ...r ];
+            }
+            reportData.concepts[name] = { ...merged, ...other };
+            if (pc) {
+                usedPacks.add(pc);
+            }
+        }
+        for (const pc of usedPacks) {
+            reportData.roleDefs = { ...pc.roleDefs(), ...reportData.roleDefs };
+        }
+    }
+    return data;
+}
+
+/*
+ * Returns a Promise which resolves to the viewer data, with the concept data
+ * from any taxonomy packs that it uses merged in.  Pack URLs are relative to
+ * baseURL.
+ */
+export function loadTaxonomyPacks(data, baseURL) {
+    if (!data?.taxonomyPacks?.length) {
+        return Promise.resolve(data);
+    }
+    return Promise.all(data.taxonomyPacks.map(pack =>
+        fetch(new URL(pack.url, baseURL))
+            .then((resp) => resp.ok ? resp.json() : Promise.reject(`Fetch of ${pack.url} failed: ${resp.status}`))
+            .catch((err) => {
+                console.log(err);
+                return null;
+            })
+    )).then((packs) => mergeTaxonomyPacks(data, packs));
+}
@@ -0,0 +1,114 @@
+// See COPYRIGHT.md for copyright information
+
+import { mergeTaxonomyPacks } from "./taxonomypack.js";
+
+function testPack() {
+    return {
+        "format": 1,
+        "namespace": "http://www.example.com/base",
+        "prefixes": {
+            "base": "http://www.example.com/base",
+            "xbrli": "http://www.xbrl.org/2003/instance",
+            "types": "http://www.example.com/types",
+        },
+        "roles": {
+            "std": "http://www.xbrl.org/2003/role/label",
+            "role1": "http://www.xbrl.org/2003/role/terseLabel",
+        },
+        "roleDefs": {
+            "role1": { "en": "Terse label" },
+        },
+        "concepts": {
+            "Assets": {
+                "labels": {
+                    "std": { "en": "Assets", "fr": "Actifs" },
+                    "role1": { "en": "Assets (terse)" },
+                },
+                "r": [ [ [ "Name", "Standard" ] ] ],
+                "b": "debit",
+                "dt": "xbrli:monetaryItemType",
+            },
+            "Dim": {
+                "labels": { "std": { "en": "Dimension" } },
+                "dt": "types:domainItemType",
+            },
+        },
+    };
+}
+
+function testData() {
+    return {
+        "prefixes": {
+            "eg": "http://www.example.com/base",
+            "xbrli": "http://www.xbrl.org/2003/instance",
+            "types": "http://www.example.com/other",
+        },
+        "roles": {
+            "std": "http://www.xbrl.org/2003/role/label",
+            "role1": "http://www.example.com/role/elr",
+        },
+        "taxonomyPacks": [
+            { "namespace": "http://www.example.com/base", "url": "base.json" },
+        ],
+        "sourceReports": [
+            {
+                "targetReports": [
+                    {
+                        "concepts": {
+                            "eg:Assets": {
+                                "p": 0,
+                                "labels": { "std": { "en": "Total assets" } },
+                            },
+                            "eg:Dim": { "p": 0, "d": "e" },
+                            "ext:Other": { "labels": { "std": { "en": "Other" } } },
+                        },
+                        "roleDefs": {
+                            "role1": { "en": "ELR" },
+                        },
+                    },
+                ],
+            },
+        ],
+    };
+}
+
+describe("Merging taxonomy packs", () => {
+    test("Concept data is merged in", () => {
+        const data = mergeTaxonomyPacks(testData(), [ testPack() ]);
+        const concepts = data.sourceReports[0].targetReports[0].concepts;
+        expect(concepts["eg:Assets"]).toEqual({
+            "labels": {
+                // Labels from outside the pack take precedence
+                "std": { "en": "Total assets", "fr": "Actifs" },
+                "role2": { "en": "Assets (terse)" },
+            },
+            "r": [ [ [ "Name", "Standard" ] ] ],
+            "b": "debit",
+            "dt": "xbrli:monetaryItemType",
+        });
+        // Data added for the target report is kept
+        expect(concepts["eg:Dim"]).toEqual({
+            "labels": { "std": { "en": "Dimension" } },
+            "dt": "types1:domainItemType",
+            "d": "e",
+        });
+        expect(concepts["ext:Other"]).toEqual({ "labels": { "std": { "en": "Other" } } });
+    });
+
+    test("Prefixes and roles are added", () => {
+        const data = mergeTaxonomyPacks(testData(), [ testPack() ]);
+        expect(data.prefixes["types1"]).toBe("http://www.example.com/types");
+        expect(data.roles["role2"]).toBe("http://www.xbrl.org/2003/role/terseLabel");
+        expect(data.sourceReports[0].targetReports[0].roleDefs).toEqual({
+            "role1": { "en": "ELR" },
+            "role2": { "en": "Terse label" },
+        });
+    });
+
+    test("Missing pack", () => {
+        const data = mergeTaxonomyPacks(testData(), [ null ]);
+        const concepts = data.sourceReports[0].targetReports[0].concepts;
+        expect(concepts["eg:Assets"]).toEqual({ "labels": { "std": { "en": "Total assets" } } });
+        expect(concepts["eg:Dim"]).toEqual({ "labels": {}, "d": "e" });
+    });
+});
@@ -285,3 +285,15 @@ export function moveNonAppAttributes(fromElement, toElement) {
         }
     }
 }
+
+/*
+ * Returns the local part of a (possibly prefixed) element name.
+ */
+export function localName(e) {
+    if (e.indexOf(':') == -1) {
+        return e
+    }
+    else {
+        return e.substring(e.indexOf(':') + 1)
+    }
+}
@@ -4,22 +4,12 @@ import $ from 'jquery'
 import { numberMatchSearch } from './number-matcher.js'
 import { TableExport } from './tableExport.js'
 import { IXNode } from './ixnode.js';
-import { getIXHiddenLinkStyle, runGenerator, viewerUniqueId, HIGHLIGHT_COLORS } from './util.js';
+import { getIXHiddenLinkStyle, localName, runGenerator, viewerUniqueId, HIGHLIGHT_COLORS } from './util.js';
 import { DocOrderIndex } from './docOrderIndex.js';
 import { MessageBox } from './messagebox.js';
 
 export class DocumentTooLargeError extends Error {}
 
-function localName(e) {
-    if (e.indexOf(':') == -1) {
-        return e
-    }
-    else {
-        return e.substring(e.indexOf(':') + 1)
-    }
-}
-
-
 export class Viewer {
     constructor(iv, iframes, reportSet) {
         this._iv = iv;
@@ -56,7 +46,13 @@ export class Viewer {
     initialize() {
         return new Promise(async (resolve, reject) => {
             const viewer = this;
-            viewer._buildContinuationMaps();
+            const preprocessed = viewer._reportSet.preprocessedIXBRL();
+            if (preprocessed !== undefined) {
+                viewer._setPreprocessedContinuationMaps(preprocessed.continuations);
+            }
+            else {
+                viewer._buildContinuationMaps();
+            }
             viewer._checkContinuationCount()
                 .catch(err => { throw err })
                 .then(() => viewer._iv.setProgress("Pre-processing document"))
@@ -65,7 +61,13 @@ export class Viewer {
                     viewer._iframes.each(function (docIndex) { 
                         $(this).data("selected", docIndex == viewer._currentDocumentIndex);
                         const reportIndex = $(this).data("report-index");
-                        viewer._preProcessiXBRL($(this).contents().find("body").get(0), reportIndex, docIndex, false);
+                        const body = $(this).contents().find("body").get(0);
+                        if (preprocessed !== undefined) {
+                            viewer._preProcessIXItems(body, preprocessed.documents[docIndex], reportIndex, docIndex);
+                        }
+                        else {
+                            viewer._preProcessiXBRL(body, reportIndex, docIndex, false);
+                        }
                     });
 
                     viewer._setContinuationMaps();
@@ -366,6 +368,18 @@ export class Viewer {
         this.itemContinuationMap = itemContinuationMap;
     }
 
+    // Set continuation maps from the continuation chains found when the viewer
+    // was generated.
+    _setPreprocessedContinuationMaps(continuations) {
+        this.continuationOfMap = {};
+        for (const [itemId, itemContinuations] of Object.entries(continuations)) {
+            for (const id of itemContinuations) {
+                this.continuationOfMap[id] = itemId;
+            }
+        }
+        this.itemContinuationMap = continuations;
+    }
+
     _setContinuationMaps() {
         for (const [itemId, itemContinuations] of Object.entries(this.itemContinuationMap)) {
             this._ixNodeMap[itemId].continuations = itemContinuations.map(id => this._ixNodeMap[id]);
@@ -415,11 +429,6 @@ export class Viewer {
     //
     _preProcessiXBRL(n, reportIndex, docIndex, inHidden) {
         const name = localName(n.nodeName).toUpperCase();
-        const isFootnote = name === 'FOOTNOTE';
-        const isContinuation = name === 'CONTINUATION';
-        const isNonNumeric = name === 'NONNUMERIC';
-        const isNonFraction = name === 'NONFRACTION';
-        const isFact = isNonNumeric || isNonFraction;
 
         if (n.nodeType === Node.ELEMENT_NODE && name == 'HIDDEN') {
             inHidden = true;
@@ -428,71 +437,109 @@ export class Viewer {
         this._preProcessChildNodes(n, reportIndex, docIndex, inHidden);
 
         if (n.nodeType === Node.ELEMENT_NODE) {
-            const vuid = viewerUniqueId(reportIndex, n.getAttribute("id"));
-            if (isFact || isFootnote) {
-                // If @id is not present, it must be for a target document that wasn't processed.
-                if (n.hasAttribute("id")) {
-                    let nodes = this._findOrCreateWrapperNode(n, inHidden);
-
-                    this._addIdToNodes(nodes, vuid);
-                    let ixn = this._getOrCreateIXNode(vuid, nodes, docIndex, inHidden);
-                    this.docOrderItemIndex.addItem(vuid, docIndex);
-
-                    if (isNonFraction) {
-                        nodes.addClass("ixbrl-element-nonfraction");
-                        if (n.hasAttribute('scale')) {
-                            const scale = Number(n.getAttribute('scale'));
-                            // Set scale if the value is a valid number and is not a redundant 0/"ones" scale.
-                            if (!Number.isNaN(scale) && scale !== 0) {
-                                ixn.scale = scale;
-                            }
-                        }
-                    }
-                    if (isNonNumeric) {
-                        nodes.addClass("ixbrl-element-nonnumeric");
-                        if (n.hasAttribute('escape') && n.getAttribute('escape').match(/^(true|1)$/)) {
-                            ixn.escaped = true;
+            this._preProcessElement(n, reportIndex, docIndex, inHidden);
+            if (name == 'A') {
+                this._updateLink(n);
+            }
+        }
+    }
+
+    //
+    // Equivalent to _preProcessiXBRL, but using the IX elements found when the
+    // viewer was generated, rather than traversing every node of the document.
+    //
+    // items is a list of [ ref, inHidden ] in the order in which
+    // _preProcessiXBRL would visit the elements, where ref is the ID of an IX
+    // element, or for a link to a hidden fact, its index amongst elements with
+    // an -ix-hidden style.
+    //
+    _preProcessIXItems(body, items, reportIndex, docIndex) {
+        const doc = body.ownerDocument;
+        const hiddenLinks = body.querySelectorAll('[style*="-ix-hidden"]');
+        for (const [ref, inHidden] of items) {
+            const n = typeof ref === 'number' ? hiddenLinks[ref] : doc.getElementById(ref);
+            if (n !== undefined && n !== null) {
+                this._preProcessElement(n, reportIndex, docIndex, inHidden === 1);
+            }
+        }
+        for (const n of body.querySelectorAll('a')) {
+            this._updateLink(n);
+        }
+    }
+
+    // Add wrapper nodes, classes and IXNodes for an element, if it is an IX
+    // element or a link to a hidden fact.
+    _preProcessElement(n, reportIndex, docIndex, inHidden) {
+        const name = localName(n.nodeName).toUpperCase();
+        const isFootnote = name === 'FOOTNOTE';
+        const isContinuation = name === 'CONTINUATION';
+        const isNonNumeric = name === 'NONNUMERIC';
+        const isNonFraction = name === 'NONFRACTION';
+        const isFact = isNonNumeric || isNonFraction;
+
+        const vuid = viewerUniqueId(reportIndex, n.getAttribute("id"));
+        if (isFact || isFootnote) {
+            // If @id is not present, it must be for a target document that wasn't processed.
+            if (n.hasAttribute("id")) {
+                let nodes = this._findOrCreateWrapperNode(n, inHidden);
+
+                this._addIdToNodes(nodes, vuid);
+                let ixn = this._getOrCreateIXNode(vuid, nodes, docIndex, inHidden);
+                ixn.element = n;
+                this.docOrderItemIndex.addItem(vuid, docIndex);
+
+                if (isNonFraction) {
+                    nodes.addClass("ixbrl-element-nonfraction");
+                    if (n.hasAttribute('scale')) {
+                        const scale = Number(n.getAttribute('scale'));
+                        // Set scale if the value is a valid number and is not a redundant 0/"ones" scale.
+                        if (!Number.isNaN(scale) && scale !== 0) {
+                            ixn.scale = scale;
                         }
                     }
-                    if (isFootnote) {
-                        nodes.addClass("ixbrl-element-footnote");
-                        ixn.footnote = true;
+                }
+                if (isNonNumeric) {
+                    nodes.addClass("ixbrl-element-nonnumeric");
+                    if (n.hasAttribute('escape') && n.getAttribute('escape').match(/^(true|1)$/)) {
+                        ixn.escaped = true;
                     }
                 }
+                if (isFootnote) {
+                    nodes.addClass("ixbrl-element-footnote");
+                    ixn.footnote = true;
+                }
             }
-            else if (isContinuation) {
-                if (n.hasAttribute("id") && this.continuationOfMap[vuid] !== undefined) {
-                    let nodes = this._findOrCreateWrapperNode(n, inHidden);
+        }
+        else if (isContinuation) {
+            if (n.hasAttribute("id") && this.continuationOfMap[vuid] !== undefined) {
+                let nodes = this._findOrCreateWrapperNode(n, inHidden);
 
-                    // For a continuation, store the IX ID(s) of the item(s), not the continuation
-                    this._addIdToNodes(nodes, this.continuationOfMap[vuid]);
+                // For a continuation, store the IX ID(s) of the item(s), not the continuation
+                this._addIdToNodes(nodes, this.continuationOfMap[vuid]);
 
-                    this._getOrCreateIXNode(vuid, nodes, docIndex, inHidden);
+                const ixn = this._getOrCreateIXNode(vuid, nodes, docIndex, inHidden);
+                ixn.element = n;
 
-                    nodes.addClass("ixbrl-continuation");
-                }
+                nodes.addClass("ixbrl-continuation");
             }
-            else {
-                // Handle SEC/ESEF links-to-hidden
-                const vuid = viewerUniqueId(reportIndex, getIXHiddenLinkStyle(n));
-                if (vuid !== null) {
-                    let nodes = this._findOrCreateWrapperNode(n, inHidden);
-                    nodes.addClass("ixbrl-element").data('ivids', [vuid]);
-                    this.docOrderItemIndex.addItem(vuid, docIndex);
-                    /* We may have already seen the corresponding ix element in the hidden
-                     * section */
-                    const ixn = this._ixNodeMap[vuid];
-                    if (ixn) {
-                        /* ... if so, update the node and docIndex so we can navigate to it */
-                        ixn.wrapperNodes = nodes;
-                        ixn.docIndex = docIndex;
-                    }
-                    else {
-                        this._ixNodeMap[vuid] = new IXNode(vuid, nodes, docIndex);
-                    }
+        }
+        else {
+            // Handle SEC/ESEF links-to-hidden
+            const vuid = viewerUniqueId(reportIndex, getIXHiddenLinkStyle(n));
+            if (vuid !== null) {
+                let nodes = this._findOrCreateWrapperNode(n, inHidden);
+                nodes.addClass("ixbrl-element").data('ivids', [vuid]);
+                this.docOrderItemIndex.addItem(vuid, docIndex);
+                /* We may have already seen the corresponding ix element in the hidden
+                 * section */
+                const ixn = this._ixNodeMap[vuid];
+                if (ixn) {
+                    /* ... if so, update the node and docIndex so we can navigate to it */
+                    ixn.wrapperNodes = nodes;
+                    ixn.docIndex = docIndex;
                 }
-                if (name == 'A') {
-                    this._updateLink(n);
+                else {
+                    this._ixNodeMap[vuid] = new IXNode(vuid, nodes, docIndex);
                 }
             }
         }
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Callable, Iterable, Mapping
 from enum import Enum
-from typing import IO
+from typing import IO, NamedTuple, cast
 
 from lxml import etree
 
@@ -15,11 +16,41 @@ class EscapeMode(Enum):
     DEFAULT = 0
     STYLE = 1
 
+
+TextWriter = Callable[[], Iterable[str]]
+
+
+class TagInfo(NamedTuple):
+    selfclosable: bool
+    is_style: bool
+
+
+class NamespaceContext:
+    """
+    Serialization state for a distinct set of in-scope namespaces.
+
+    Elements that don't declare any namespaces of their own share the
+    context of their parent, so prefix resolution for element and attribute
+    names only needs to be done once per context rather than once per node.
+    """
+
+    __slots__ = ('nsmap', 'element_names', 'attr_names', 'children')
+
+    def __init__(self, nsmap: dict[str | None, str]) -> None:
+        self.nsmap = nsmap
+        # (prefix, tag) => serialized element name
+        self.element_names: dict[tuple[str | None, str], str] = {}
+        # attribute tag => serialized attribute name
+        self.attr_names: dict[str, str] = {}
+        # nsmap items => (child context, namespace declarations)
+        self.children: dict[frozenset[tuple[str | None, str]], tuple[NamespaceContext, str]] = {}
+
+
 class XHTMLSerializer:
 
     # From https://www.w3.org/TR/html401/index/elements.html
     SELF_CLOSABLE = (
-        'area', 'base', 'basefont', 'br', 'col', 'frame', 'hr', 'img', 
+        'area', 'base', 'basefont', 'br', 'col', 'frame', 'hr', 'img',
         'input', 'isindex', 'link', 'meta', 'param'
     )
 
@@ -38,14 +69,54 @@ class XHTMLSerializer:
     ATTR_ESCAPE_RE = re.compile('([' + MUST_ESCAPE_CHARS + '>"])')
     STYLE_ESCAPE_RE = re.compile('([' + MUST_ESCAPE_CHARS + ']|' + CDATA_END + ')')
 
-    def __init__(self, fout: IO[bytes], xml_declaration: bool = True, assume_xhtml: bool = True) -> None:
+    # Number of characters to accumulate before encoding and writing to the
+    # output stream.
+    BUFFER_SIZE = 256 * 1024
+
+    def __init__(
+        self,
+        fout: IO[bytes],
+        xml_declaration: bool = True,
+        assume_xhtml: bool = True,
+        text_writers: Mapping[etree._Element, TextWriter] | None = None,
+        element_extensions: Mapping[etree._Element, etree._Element] | None = None,
+    ) -> None:
+        """
+        :param text_writers: Optional map of elements to callables producing
+            the text content of that element.  The content is written in
+            place of the element's text as it is produced, without escaping,
+            so must already be valid XML character data.
+        :param element_extensions: Optional map of elements to detached
+            elements whose children are written after the element's own
+            children.  This allows content to be added to a document without
+            modifying it.
+        """
         self.fout = fout
         self.encoding = "utf-8"
         self.xml_declaration = xml_declaration
         self.assume_xhtml = assume_xhtml
+        self.text_writers = text_writers if text_writers is not None else {}
+        self.element_extensions = element_extensions if element_extensions is not None else {}
+        self._buffer: list[str] = []
+        self._buffer_size = 0
+        self._tag_info: dict[str, TagInfo] = {}
+        self._root_context = NamespaceContext({})
 
     def write(self, s: str) -> None:
-        self.fout.write(s.encode(self.encoding))
+        """
+        Buffer output.  flush() must be called to ensure that everything is
+        written to the output stream.  serialize() does this automatically.
+        """
+        self._buffer.append(s)
+        self._buffer_size += len(s)
+        if self._buffer_size >= self.BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.fout.write(''.join(self._buffer).encode(self.encoding))
+            self._buffer.clear()
+            self._buffer_size = 0
 
     def prefix_sort(self, p: str | None) -> str:
         return p if p is not None else '0'
@@ -80,8 +151,17 @@ class XHTMLSerializer:
                     qname.namespace == XHTML_NS
                     or (self.assume_xhtml and qname.namespace is None)))
 
+    def tag_info(self, tag: str) -> TagInfo:
+        if (info := self._tag_info.get(tag)) is None:
+            info = TagInfo(
+                selfclosable=self.is_selfclosable(tag),
+                is_style=etree.QName(tag).localname == 'style',
+            )
+            self._tag_info[tag] = info
+        return info
+
     def escape_attr(self, s: str) -> str:
-        return self.ATTR_ESCAPE_RE.sub(lambda m: self.escape_str(m[0]), s)
+        return self.ATTR_ESCAPE_RE.sub(self._escape_match, s)
 
     def xmlns_declaration(self, prefix: str | None, uri: str) -> str:
         if prefix is None:
@@ -92,9 +172,29 @@ class XHTMLSerializer:
         changed = set(p[0] for p in (set(new_nsmap.items()) ^ set(cur_nsmap.items())))
         return sorted(self.xmlns_declaration(p, new_nsmap[p]) for p in changed)
 
+    def child_context(self, nsmap: dict[str | None, str], parent: NamespaceContext) -> tuple[NamespaceContext, str]:
+        """
+        Get the context for an element with the given in-scope namespaces,
+        and the namespace declarations needed on that element.
+        """
+        if nsmap == parent.nsmap:
+            return parent, ''
+        key = frozenset(nsmap.items())
+        if (child := parent.children.get(key)) is None:
+            declarations = ''.join(' ' + d for d in self.namespace_declarations(nsmap, parent.nsmap))
+            child = (NamespaceContext(nsmap), declarations)
+            parent.children[key] = child
+        return child
+
+    def context_for_nsmap(self, nsmap: dict[str | None, str]) -> NamespaceContext:
+        return self.child_context(nsmap, self._root_context)[0]
+
     def escape_str(self, c: str) -> str:
         return self.ESCAPES.get(c, f'&#x{ord(c[0]):02X};')
 
+    def _escape_match(self, m: re.Match[str]) -> str:
+        return self.escape_str(m[0])
+
     def write_escape_text(self, s: str | None, escape_mode: EscapeMode) -> None:
         if s is None:
             return
@@ -105,15 +205,22 @@ class XHTMLSerializer:
             # "&" and "<" are escaped using XML escapes.  This will break
             # HTML/XHTML compatibility, but any source document using them
             # wouldn't have been HTML compatible anyway.
-            self.write(self.STYLE_ESCAPE_RE.sub(lambda m: self.escape_str(m[0]),s))
+            self.write(self.STYLE_ESCAPE_RE.sub(self._escape_match, s))
         else:
-            self.write(self.ESCAPE_RE.sub(lambda m: self.escape_str(m[0]),s))
-
-    def write_attributes(self, node: etree._Element) -> None:
-        for qname, value in sorted((self.qname_for_attr(k, node.nsmap), v) for k, v in node.items()):
-            self.write(f' {qname}="')
-            self.write(self.escape_attr(value))
-            self.write("\"")
+            self.write(self.ESCAPE_RE.sub(self._escape_match, s))
+
+    def write_attributes(self, node: etree._Element, context: NamespaceContext | None = None) -> None:
+        if context is None:
+            context = self.context_for_nsmap(node.nsmap)
+        attr_names = context.attr_names
+        attributes = []
+        for k, v in node.items():
+            if (name := attr_names.get(k)) is None:
+                name = self.qname_for_attr(k, context.nsmap)
+                attr_names[k] = name
+            attributes.append((name, v))
+        for qname, value in sorted(attributes):
+            self.write(f' {qname}="{self.escape_attr(value)}"')
 
     def write_comment(self, n: etree._Comment, escape_mode: EscapeMode) -> None:
         self.write('<!--' + n.text + '-->')
@@ -132,14 +239,15 @@ class XHTMLSerializer:
         nsmap: dict[str | None, str] | None = None,
         escape_mode: EscapeMode = EscapeMode.DEFAULT,
     ) -> None:
-        if nsmap is None:
-            nsmap = {}
+        self._write_node(n, self.context_for_nsmap(nsmap or {}), escape_mode)
+
+    def _write_node(self, n: etree._Element, context: NamespaceContext, escape_mode: EscapeMode) -> None:
         if isinstance(n, etree._Comment):
             self.write_comment(n, escape_mode)
         elif isinstance(n, etree._ProcessingInstruction):
             self.write_processing_instruction(n, escape_mode)
         else:
-            self.write_element(n, nsmap, escape_mode)
+            self._write_element(n, context, escape_mode)
 
     def write_element(
         self,
@@ -147,24 +255,39 @@ class XHTMLSerializer:
         parent_nsmap: dict[str | None, str] | None = None,
         escape_mode: EscapeMode = EscapeMode.DEFAULT,
     ) -> None:
-        if parent_nsmap is None:
-            parent_nsmap = {}
-        name = self.qname_for_node(n)
-        qname = etree.QName(n)
-        selfclose = len(n) == 0 and n.text is None and self.is_selfclosable(n)
-        parts = [ name ] + self.namespace_declarations(n.nsmap, parent_nsmap)
-        self.write('<' + ' '.join(parts))
-        self.write_attributes(n)
+        self._write_element(n, self.context_for_nsmap(parent_nsmap or {}), escape_mode)
+
+    def _write_element(self, n: etree._Element, parent_context: NamespaceContext, escape_mode: EscapeMode) -> None:
+        # Element tags are always strings once parsed
+        tag = cast(str, n.tag)
+        info = self.tag_info(tag)
+        context, declarations = self.child_context(n.nsmap, parent_context)
+        name_key = (n.prefix, tag)
+        if (name := context.element_names.get(name_key)) is None:
+            name = self.qname_for_node(n)
+            context.element_names[name_key] = name
+
+        self.write('<' + name + declarations)
+        self.write_attributes(n, context)
+
+        inner_escape_mode = EscapeMode.STYLE if info.is_style else escape_mode
 
-        inner_escape_mode = EscapeMode.STYLE if qname.localname == 'style' else escape_mode
+        extension = self.element_extensions.get(n) if self.element_extensions else None
 
-        if selfclose:
+        if len(n) == 0 and n.text is None and info.selfclosable and extension is None:
             self.write('/>')
         else:
             self.write('>')
-            self.write_escape_text(n.text, inner_escape_mode)
+            if self.text_writers and (text_writer := self.text_writers.get(n)) is not None:
+                for chunk in text_writer():
+                    self.write(chunk)
+            else:
+                self.write_escape_text(n.text, inner_escape_mode)
             for child in n.iterchildren():
-                self.write_node(child, n.nsmap, inner_escape_mode)
+                self._write_node(child, context, inner_escape_mode)
+            if extension is not None:
+                for child in extension.iterchildren():
+                    self._write_node(child, context, inner_escape_mode)
             self.write(f'</{name}>')
 
         self.write_escape_text(n.tail, escape_mode)
@@ -196,3 +319,4 @@ class XHTMLSerializer:
         else:
             self.write_xml_declaration()
             self.write_element(element)
+        self.flush()
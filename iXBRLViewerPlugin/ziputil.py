@@ -0,0 +1,205 @@
+# See COPYRIGHT.md for copyright information
+
+"""
+Helpers for writing viewer output to zip files.
+
+Report packages typically contain images and PDFs that are already compressed,
+and deflating them again when writing a zip costs CPU time for little or no
+reduction in size.  compressTypeForFilename chooses whether a file should be
+stored or deflated, and copyZipMember copies a member from one zip file to
+another without decompressing and recompressing it.
+
+compressMember compresses the data for a member, so that files can be
+compressed concurrently in worker threads (zlib releases the GIL), and
+writeCompressedMember then adds the result to a zip file.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import shutil
+import struct
+import time
+import zipfile
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+# Media types for formats that are already compressed
+COMPRESSED_MEDIA_TYPES = frozenset((
+    'application/gzip',
+    'application/pdf',
+    'application/x-7z-compressed',
+    'application/x-bzip2',
+    'application/x-xz',
+    'application/zip',
+    'font/woff',
+    'font/woff2',
+    'image/avif',
+    'image/gif',
+    'image/heic',
+    'image/jpeg',
+    'image/png',
+    'image/webp',
+))
+# Top-level media types that are, with the exception of XML-based formats,
+# already compressed
+COMPRESSED_TOP_LEVEL_MEDIA_TYPES = frozenset(('audio', 'video'))
+
+# Local file header fields, as defined by the zip file format specification
+LOCAL_FILE_HEADER_SIGNATURE = b'PK\x03\x04'
+LOCAL_FILE_HEADER_SIZE = 30
+LOCAL_FILE_HEADER_NAME_LENGTHS = struct.Struct('<HH')
+LOCAL_FILE_HEADER_NAME_LENGTHS_OFFSET = 26
+# General purpose flag bit for encrypted members
+ENCRYPTED_FLAG = 0x1
+
+COPY_CHUNK_SIZE = 1024 * 1024
+# Window size for raw deflate streams, without a zlib header, as used in zip files
+DEFLATE_WBITS = -15
+# Permissions for members written from data, as used by ZipFile.writestr
+DEFAULT_EXTERNAL_ATTR = 0o600 << 16
+
+
+class CompressedMember(NamedTuple):
+    """
+    The compressed data for a zip member, and the uncompressed size and CRC
+    needed to write its header.
+    """
+    data: bytes
+    compressType: int
+    CRC: int
+    fileSize: int
+
+
+def isCompressedMediaType(filename: str) -> bool:
+    mediaType, encoding = mimetypes.guess_type(filename, strict=False)
+    if encoding is not None:
+        # e.g. .gz, .bz2
+        return True
+    if mediaType is None:
+        return False
+    return mediaType in COMPRESSED_MEDIA_TYPES or (
+        mediaType.split('/')[0] in COMPRESSED_TOP_LEVEL_MEDIA_TYPES
+        and not mediaType.endswith('+xml')
+    )
+
+
+def compressTypeForFilename(filename: str) -> int:
+    """
+    Return the zip compression method to use for a file: stored for formats
+    that are already compressed, and deflated for everything else.
+    """
+    return zipfile.ZIP_STORED if isCompressedMediaType(filename) else zipfile.ZIP_DEFLATED
+
+
+def copyZipMember(source: zipfile.ZipFile, info: zipfile.ZipInfo, dest: zipfile.ZipFile, arcname: str) -> None:
+    """
+    Copy a member of one zip file to another, as arcname.
+
+    The compressed data is copied as is, unless the member is stored but
+    compressTypeForFilename would deflate it, or is encrypted, in which case
+    it is decompressed and written using compressTypeForFilename.  Neither
+    zip file may have other members open for reading or writing.
+    """
+    compressType = compressTypeForFilename(arcname)
+    if (
+        info.flag_bits & ENCRYPTED_FLAG
+        or (info.compress_type == zipfile.ZIP_STORED and compressType != zipfile.ZIP_STORED)
+        or source.fp is None
+        or dest.fp is None
+    ):
+        zinfo = zipfile.ZipInfo(arcname, info.date_time)
+        zinfo.compress_type = compressType
+        zinfo.external_attr = info.external_attr
+        # Allows zipfile to decide whether ZIP64 extensions are needed
+        zinfo.file_size = info.file_size
+        with source.open(info) as fin, dest.open(zinfo, 'w') as fout:
+            shutil.copyfileobj(fin, fout, COPY_CHUNK_SIZE)
+        return
+
+    fin = source.fp
+    fin.seek(info.header_offset)
+    header = fin.read(LOCAL_FILE_HEADER_SIZE)
+    if len(header) != LOCAL_FILE_HEADER_SIZE or not header.startswith(LOCAL_FILE_HEADER_SIGNATURE):
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+    nameLength, extraLength = LOCAL_FILE_HEADER_NAME_LENGTHS.unpack_from(header, LOCAL_FILE_HEADER_NAME_LENGTHS_OFFSET)
+    fin.seek(nameLength + extraLength, 1)
+
+    # Sizes and CRC are known, so the data descriptor flag is not needed.
+    zinfo = zipfile.ZipInfo(arcname, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.external_attr = info.external_attr
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+
+    def chunks() -> Iterator[bytes]:
+        remaining = info.compress_size
+        while remaining > 0:
+            chunk = fin.read(min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+            yield chunk
+            remaining -= len(chunk)
+
+    writeRawMember(dest, zinfo, chunks())
+
+
+def compressMember(data: bytes, compressType: int = zipfile.ZIP_DEFLATED) -> CompressedMember:
+    """
+    Compress the data for a zip member, for writing with writeCompressedMember.
+    """
+    if compressType == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, DEFLATE_WBITS)
+        compressed = compressor.compress(data) + compressor.flush()
+    elif compressType == zipfile.ZIP_STORED:
+        compressed = data
+    else:
+        raise ValueError(f"Unsupported compression method {compressType}")
+    return CompressedMember(compressed, compressType, zlib.crc32(data), len(data))
+
+
+def writeCompressedMember(dest: zipfile.ZipFile, arcname: str, member: CompressedMember) -> None:
+    """
+    Add a member compressed by compressMember to a zip file, as arcname.  The
+    zip file may not have other members open for writing.
+    """
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(time.time())[:6])
+    zinfo.compress_type = member.compressType
+    zinfo.external_attr = DEFAULT_EXTERNAL_ATTR
+    zinfo.CRC = member.CRC
+    zinfo.compress_size = len(member.data)
+    zinfo.file_size = member.fileSize
+    writeRawMember(dest, zinfo, (member.data,))
+
+
+def writeRawMember(dest: zipfile.ZipFile, zinfo: zipfile.ZipInfo, chunks: Iterable[bytes]) -> None:
+    """
+    Write a member, whose compressed data is given by chunks, and whose
+    sizes and CRC are set on zinfo, to the end of a zip file.
+
+    ZipFile has no public API for this, so it follows ZipFile.writestr,
+    which uses the same internals: it holds the zip file's lock, refuses to
+    write while another member is open for writing, and uses _writecheck
+    to warn of duplicate names and check the compression method and ZIP64
+    limits.
+    """
+    with dest._lock:  # type: ignore[attr-defined]
+        if dest._writing:  # type: ignore[attr-defined]
+            raise ValueError("Can't write to ZIP archive while an open writing handle exists")
+        fout = dest.fp
+        if fout is None:
+            raise ValueError("Attempt to write ZIP archive that was already closed")
+        zinfo.header_offset = dest.start_dir
+        dest._writecheck(zinfo)  # type: ignore[attr-defined]
+        if fout.tell() != dest.start_dir:
+            fout.seek(dest.start_dir)
+        fout.write(zinfo.FileHeader())
+        for chunk in chunks:
+            fout.write(chunk)
+        dest.start_dir = fout.tell()
+        dest.filelist.append(zinfo)
+        dest.NameToInfo[zinfo.filename] = zinfo
+        # Ensure that the central directory is written when the file is closed
+        dest._didModify = True  # type: ignore[attr-defined]
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for viewer generation against synthetic inline XBRL reports.
+
+Reports wall time, peak (Python) memory and throughput for each stage of
+generation, and writes the results as JSON so that runs can be compared
+between commits:
+
+    python -m tests.benchmarks.benchmark --facts 20000 --output before.json
+    python -m tests.benchmarks.benchmark --facts 20000 --compare before.json
+
+The saveZip stage saves the viewer as a zip archive, using --save-workers
+threads if the report has more than one document (see --documents).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+from unittest.mock import Mock, patch
+
+from .synthetic import CorpusParameters, SyntheticCorpus
+
+from tests.unit_tests.iXBRLViewerPlugin.mock_arelle import mock_arelle, mrs_effect
+
+mock_arelle()
+
+from iXBRLViewerPlugin.iXBRLViewer import IXBRLViewerBuilder  # noqa: E402
+from iXBRLViewerPlugin.xhtmlserialize import XHTMLSerializer  # noqa: E402
+
+STAGES = ('serialize', 'processModel', 'createViewer', 'save', 'saveZip')
+
+
+@dataclass
+class StageResult:
+    wallTime: float
+    peakMemory: int | None = None
+    items: int | None = None
+    bytes: int | None = None
+
+    @property
+    def bytesPerSecond(self) -> float | None:
+        if self.bytes is None or self.wallTime == 0:
+            return None
+        return self.bytes / self.wallTime
+
+    def asDict(self) -> dict[str, Any]:
+        result = asdict(self)
+        result['bytesPerSecond'] = self.bytesPerSecond
+        return result
+
+
+class StageTimer:
+
+    def __init__(self, traceMemory: bool) -> None:
+        self.traceMemory = traceMemory
+        self.results: dict[str, StageResult] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageResult]:
+        result = StageResult(wallTime=0)
+        if self.traceMemory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        yield result
+        result.wallTime = time.perf_counter() - start
+        if self.traceMemory:
+            result.peakMemory = tracemalloc.get_traced_memory()[1] - baseline
+        self.results[name] = result
+
+
+def directorySize(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(dirpath, f))
+        for dirpath, _, files in os.walk(path)
+        for f in files
+    )
+
+
+def runPipeline(corpus: SyntheticCorpus, traceMemory: bool, saveWorkers: int = 1) -> dict[str, StageResult]:
+    timer = StageTimer(traceMemory)
+    if traceMemory:
+        tracemalloc.start()
+    try:
+        with timer.stage('serialize') as result:
+            buf = io.BytesIO()
+            for document in corpus.documents:
+                XHTMLSerializer(buf).serialize(document)
+            result.bytes = buf.tell()
+            result.items = len(corpus.facts)
+        del buf
+
+        cntlr = Mock()
+        with patch('iXBRLViewerPlugin.iXBRLViewer.ModelRelationshipSet', mrs_effect):
+            builder = IXBRLViewerBuilder(cntlr)
+            with timer.stage('processModel') as result:
+                builder.processModel(corpus.modelXbrl)
+                result.items = len(corpus.facts)
+
+        with timer.stage('createViewer') as result:
+            viewer = builder.createViewer(showValidations=False)
+            assert viewer is not None
+            result.items = len(viewer.files)
+
+        with tempfile.TemporaryDirectory() as outDir:
+            with timer.stage('save') as result:
+                viewer.save(outDir)
+                result.items = len(viewer.files)
+            result.bytes = directorySize(outDir)
+
+        with tempfile.TemporaryDirectory() as outDir:
+            zipPath = os.path.join(outDir, 'viewer.zip')
+            with timer.stage('saveZip') as result:
+                viewer.save(zipPath, zipOutput=True, workers=saveWorkers)
+                result.items = len(viewer.files)
+            result.bytes = os.path.getsize(zipPath)
+    finally:
+        if traceMemory:
+            tracemalloc.stop()
+    return timer.results
+
+
+def runBenchmark(params: CorpusParameters, repeat: int = 3, traceMemory: bool = True, saveWorkers: int = 1) -> dict[str, Any]:
+    """
+    Run all stages `repeat` times, taking the fastest time for each stage.
+    Peak memory is measured in a separate run, as tracing allocations
+    distorts timings.
+    """
+    corpus = SyntheticCorpus(params)
+    best: dict[str, StageResult] = {}
+    for _ in range(max(1, repeat)):
+        for name, result in runPipeline(corpus, traceMemory=False, saveWorkers=saveWorkers).items():
+            if name not in best or result.wallTime < best[name].wallTime:
+                best[name] = result
+    if traceMemory:
+        for name, result in runPipeline(corpus, traceMemory=True, saveWorkers=saveWorkers).items():
+            best[name].peakMemory = result.peakMemory
+
+    return {
+        'environment': environment(),
+        'parameters': params.asDict(),
+        'repeat': repeat,
+        'saveWorkers': saveWorkers,
+        'stages': {name: best[name].asDict() for name in STAGES},
+    }
+
+
+def environment() -> dict[str, Any]:
+    env: dict[str, Any] = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    try:
+        env['commit'] = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        env['commit'] = None
+    return env
+
+
+def formatBytes(n: float | None) -> str:
+    if n is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024:
+            return f'{n:.1f}{unit}'
+        n /= 1024
+    return f'{n:.1f}TB'
+
+
+def printSummary(results: dict[str, Any], baseline: dict[str, Any] | None, out: Callable[[str], None]) -> None:
+    out(f"{'stage':<14}{'wall (s)':>12}{'peak mem':>12}{'bytes/s':>12}{'vs baseline':>14}")
+    for name, stage in results['stages'].items():
+        comparison = ''
+        if baseline is not None and (baseStage := baseline['stages'].get(name)) is not None and baseStage['wallTime']:
+            comparison = f"{stage['wallTime'] / baseStage['wallTime']:.2f}x"
+        out(
+            f"{name:<14}{stage['wallTime']:>12.4f}{formatBytes(stage['peakMemory']):>12}"
+            f"{formatBytes(stage['bytesPerSecond']):>12}{comparison:>14}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark iXBRL viewer generation using synthetic reports")
+    defaults = CorpusParameters()
+    parser.add_argument("--facts", type=int, default=defaults.facts, help="Number of visible facts")
+    parser.add_argument("--depth", type=int, default=defaults.depth, help="Nesting depth of sections containing facts")
+    parser.add_argument("--namespaces", type=int, default=defaults.namespaces, help="Number of taxonomy namespaces")
+    parser.add_argument("--continuations", type=int, default=defaults.continuations, help="Number of continuation chains")
+    parser.add_argument("--continuation-length", type=int, default=defaults.continuationLength, help="Number of continuations in each chain")
+    parser.add_argument("--hidden-facts", type=int, default=defaults.hiddenFacts, help="Number of facts in the hidden section")
+    parser.add_argument("--documents", type=int, default=defaults.documents, help="Number of documents in the report")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed for generated values")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs. The fastest is reported")
+    parser.add_argument("--save-workers", type=int, default=1, help="Number of threads used to save the viewer as a zip")
+    parser.add_argument("--no-memory", action="store_true", help="Skip peak memory measurement")
+    parser.add_argument("--output", "-o", help="File to write JSON results to")
+    parser.add_argument("--compare", help="JSON results from a previous run to compare against")
+    args = parser.parse_args(argv)
+
+    params = CorpusParameters(
+        facts=args.facts,
+        depth=args.depth,
+        namespaces=args.namespaces,
+        continuations=args.continuations,
+        continuationLength=args.continuation_length,
+        hiddenFacts=args.hidden_facts,
+        documents=args.documents,
+        seed=args.seed,
+    )
+    results = runBenchmark(params, repeat=args.repeat, traceMemory=not args.no_memory, saveWorkers=args.save_workers)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fin:
+            baseline = json.load(fin)
+        if baseline.get('parameters') != results['parameters']:
+            print("Warning: baseline was generated with different parameters", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as fout:
+            json.dump(results, fout, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    printSummary(results, baseline, lambda s: print(s, file=sys.stderr))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Generator for synthetic inline XBRL reports, for use in benchmarks.
+
+Produces both an XHTML document (an lxml tree) and a lightweight stand-in for
+the Arelle ModelXbrl that IXBRLViewerBuilder.processModel consumes, in the
+same style as the mocks used by the unit tests.  Output is deterministic for a
+given set of parameters.
+"""
+
+from __future__ import annotations
+
+import datetime
+import random
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import Mock
+
+from arelle import XbrlConst
+from arelle.ModelDocument import Type
+from arelle.ModelDtsObject import ModelConcept, ModelResource
+from arelle.ModelValue import QName
+from lxml import etree
+
+XHTML_NS = 'http://www.w3.org/1999/xhtml'
+IX_NS = 'http://www.xbrl.org/2013/inlineXBRL'
+IXT_NS = 'http://www.xbrl.org/inlineXBRL/transformation/2020-02-12'
+XBRLI_NS = 'http://www.xbrl.org/2003/instance'
+ISO4217_NS = 'http://www.xbrl.org/2003/iso4217'
+LINK_NS = 'http://www.xbrl.org/2003/linkbase'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+ENTITY_SCHEME = 'http://www.example.com/entity'
+
+FACTS_PER_SECTION = 50
+CONTEXT_COUNT = 20
+LANGUAGES = ('en', 'de', 'fr')
+
+
+@dataclass(frozen=True)
+class CorpusParameters:
+    facts: int = 1000
+    depth: int = 5
+    namespaces: int = 3
+    continuations: int = 0
+    continuationLength: int = 3
+    hiddenFacts: int = 0
+    # Number of documents in the report.  If more than one, the report is an
+    # inline XBRL document set, with the visible facts split between them.
+    documents: int = 1
+    seed: int = 0
+
+    def asDict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class SyntheticRelationshipSet:
+
+    def __init__(self, relationships: list[Any] | None = None, fromMap: dict[Any, list[Any]] | None = None) -> None:
+        self.modelRelationships = relationships or []
+        self._fromMap = fromMap or {}
+
+    def fromModelObject(self, modelObject: Any) -> list[Any]:
+        return self._fromMap.get(modelObject, [])
+
+
+class SyntheticCorpus:
+    """
+    A synthetic inline XBRL report.
+
+    :ivar document: the XHTML document tree of the first document
+    :ivar documents: the XHTML document trees of all documents
+    :ivar modelXbrl: a stand-in for Arelle's ModelXbrl for the document
+    """
+
+    def __init__(self, params: CorpusParameters) -> None:
+        self.params = params
+        self._random = random.Random(params.seed)
+        self.namespaces = [f'http://www.example.com/taxonomy/ns{i}' for i in range(max(1, params.namespaces))]
+        self.concepts: list[ModelConcept] = []
+        self.labels: dict[Any, list[Any]] = {}
+        self.relationshipSets: dict[tuple[str, str | None], SyntheticRelationshipSet] = {}
+        self.baseSets: dict[tuple[str, str, QName, QName], list[Any]] = {}
+        self.modelXbrl = self._buildModel()
+        self.documents = [self._buildDocument(i) for i in range(max(1, params.documents))]
+        self.document = self.documents[0]
+        self.modelXbrl.modelDocument.xmlDocument = self.document
+        if len(self.documents) > 1:
+            self.modelXbrl.modelDocument.type = Type.INLINEXBRLDOCUMENTSET
+            self.modelXbrl.modelDocument.referencesDocument = {
+                Mock(
+                    type=Type.INLINEXBRL,
+                    filepath=f'synthetic{i}.html',
+                    objectIndex=i,
+                    xmlDocument=doc,
+                ): None
+                for i, doc in enumerate(self.documents)
+            }
+
+    def _qname(self, nsIndex: int, localName: str) -> QName:
+        return QName(f'ns{nsIndex}', self.namespaces[nsIndex], localName)
+
+    def _buildConcepts(self, count: int) -> None:
+        monetaryType = SimpleNamespace(qname=QName('xbrli', XBRLI_NS, 'monetaryItemType'))
+        for i in range(count):
+            nsIndex = i % len(self.namespaces)
+            concept = Mock(
+                spec=ModelConcept,
+                qname=self._qname(nsIndex, f'Concept{i}'),
+                balance=self._random.choice(('debit', 'credit', None)),
+                isTypedDimension=False,
+                isEnumeration=False,
+                isTextBlock=False,
+                type=monetaryType,
+                modelXbrl=None,
+            )
+            self.concepts.append(concept)
+            self.labels[concept] = [
+                SimpleNamespace(toModelObject=Mock(
+                    spec=ModelResource,
+                    xmlLang=lang,
+                    role=XbrlConst.standardLabel,
+                    stringValue=f'Concept {i} label ({lang})',
+                ))
+                for lang in LANGUAGES
+            ]
+
+    def _buildRelationships(self) -> None:
+        linkQName = QName('link', LINK_NS, 'presentationLink')
+        arcQName = QName('link', LINK_NS, 'presentationArc')
+        elrCount = max(1, len(self.concepts) // 20)
+        for e in range(elrCount):
+            elr = f'http://www.example.com/role/ELR{e}'
+            members = self.concepts[e::elrCount]
+            rels = [
+                SimpleNamespace(fromModelObject=members[0], toModelObject=c, weight=None)
+                for c in members[1:]
+            ]
+            self.baseSets[(XbrlConst.parentChild, elr, linkQName, arcQName)] = rels
+            self.relationshipSets[(XbrlConst.parentChild, elr)] = SyntheticRelationshipSet(rels)
+        self.relationshipSets[(XbrlConst.conceptLabel, None)] = SyntheticRelationshipSet(fromMap=self.labels)
+
+    def relationshipSet(self, arcrole: str, linkrole: str | None = None, *args: Any, **kwargs: Any) -> SyntheticRelationshipSet:
+        return self.relationshipSets.get((arcrole, linkrole), SyntheticRelationshipSet())
+
+    def _buildContexts(self) -> list[Any]:
+        contexts = []
+        for i in range(CONTEXT_COUNT):
+            year = 2000 + i // 2
+            instant = i % 2 == 0
+            contexts.append(SimpleNamespace(
+                id=f'c{i}',
+                entityIdentifier=(ENTITY_SCHEME, '1234567890'),
+                qnameDims={},
+                isForeverPeriod=False,
+                isInstantPeriod=instant,
+                isStartEndPeriod=not instant,
+                instantDatetime=datetime.datetime(year + 1, 1, 1),
+                startDatetime=datetime.datetime(year, 1, 1),
+                endDatetime=datetime.datetime(year + 1, 1, 1),
+            ))
+        return contexts
+
+    def _buildModel(self) -> Any:
+        params = self.params
+        self._buildConcepts(max(1, (params.facts + params.hiddenFacts) // 10))
+        self._buildRelationships()
+        self.contexts = self._buildContexts()
+        self.unit = SimpleNamespace(id='u0', measures=([QName('iso4217', ISO4217_NS, 'USD')], []))
+
+        facts = []
+        for i in range(params.facts + params.hiddenFacts + params.continuations):
+            concept = self.concepts[i % len(self.concepts)]
+            isNumeric = i < params.facts + params.hiddenFacts
+            facts.append(SimpleNamespace(
+                id=f'f{i}',
+                qname=concept.qname,
+                concept=concept,
+                context=self.contexts[i % len(self.contexts)],
+                unit=self.unit if isNumeric else None,
+                isNumeric=isNumeric,
+                isNil=False,
+                isTuple=False,
+                value=str(self._random.randint(0, 10 ** 9)) if isNumeric else 'Text',
+                decimals='-3' if isNumeric else None,
+                precision=None,
+                format=None,
+                xValue=None,
+            ))
+        self.facts = facts
+
+        modelXbrl = SimpleNamespace(
+            facts=facts,
+            baseSets=self.baseSets,
+            relationshipSet=self.relationshipSet,
+            roleTypes={},
+            qnameConcepts={c.qname: c for c in self.concepts},
+            prefixedNamespaces={f'ns{i}': ns for i, ns in enumerate(self.namespaces)},
+            ixdsTarget=None,
+            urlDocs={
+                'synthetic.html': SimpleNamespace(
+                    type=Type.INLINEXBRL,
+                    basename='synthetic.html',
+                    creationSoftwareComment=None,
+                    creationSoftwareMatches=lambda comment: [],
+                ),
+            },
+            modelDocument=SimpleNamespace(
+                type=Type.INLINEXBRL,
+                filepath='synthetic.html',
+                xmlDocument=None,
+            ),
+            fileSource=SimpleNamespace(isArchive=False),
+            info=lambda *args, **kwargs: None,
+        )
+        for concept in self.concepts:
+            concept.modelXbrl = modelXbrl
+        return modelXbrl
+
+    def _factName(self, fact: Any) -> str:
+        return f'{fact.qname.prefix}:{fact.qname.localName}'
+
+    def _addResources(self, header: etree._Element) -> None:
+        resources = etree.SubElement(header, f'{{{IX_NS}}}resources')
+        for c in self.contexts:
+            context = etree.SubElement(resources, f'{{{XBRLI_NS}}}context', id=c.id)
+            entity = etree.SubElement(context, f'{{{XBRLI_NS}}}entity')
+            etree.SubElement(entity, f'{{{XBRLI_NS}}}identifier', scheme=ENTITY_SCHEME).text = c.entityIdentifier[1]
+            period = etree.SubElement(context, f'{{{XBRLI_NS}}}period')
+            if c.isInstantPeriod:
+                etree.SubElement(period, f'{{{XBRLI_NS}}}instant').text = c.instantDatetime.date().isoformat()
+            else:
+                etree.SubElement(period, f'{{{XBRLI_NS}}}startDate').text = c.startDatetime.date().isoformat()
+                etree.SubElement(period, f'{{{XBRLI_NS}}}endDate').text = c.endDatetime.date().isoformat()
+        unit = etree.SubElement(resources, f'{{{XBRLI_NS}}}unit', id=self.unit.id)
+        etree.SubElement(unit, f'{{{XBRLI_NS}}}measure').text = 'iso4217:USD'
+
+    def _addNumericFact(self, parent: etree._Element, fact: Any) -> etree._Element:
+        e = etree.SubElement(parent, f'{{{IX_NS}}}nonFraction', {
+            'name': self._factName(fact),
+            'contextRef': fact.context.id,
+            'unitRef': fact.unit.id,
+            'id': fact.id,
+            'decimals': fact.decimals,
+            'scale': '3',
+            'format': 'ixt:num-dot-decimal',
+        })
+        e.text = f'{int(fact.value):,}'
+        return e
+
+    def _buildDocument(self, index: int) -> etree._ElementTree[etree._Element]:
+        """
+        Build a document of the report.  The hidden section and notes are in
+        the first document only.
+        """
+        params = self.params
+        nsmap: dict[str | None, str] = {
+            None: XHTML_NS,
+            'ix': IX_NS,
+            'ixt': IXT_NS,
+            'xbrli': XBRLI_NS,
+            'iso4217': ISO4217_NS,
+            'link': LINK_NS,
+            'xlink': XLINK_NS,
+        }
+        nsmap.update({f'ns{i}': ns for i, ns in enumerate(self.namespaces)})
+        html = etree.Element(f'{{{XHTML_NS}}}html', nsmap=nsmap)
+        head = etree.SubElement(html, f'{{{XHTML_NS}}}head')
+        etree.SubElement(head, f'{{{XHTML_NS}}}title').text = 'Synthetic report'
+        etree.SubElement(head, f'{{{XHTML_NS}}}style').text = 'td > p { margin: 0 }'
+        body = etree.SubElement(html, f'{{{XHTML_NS}}}body')
+
+        if index == 0:
+            hiddenDiv = etree.SubElement(body, f'{{{XHTML_NS}}}div', style='display: none')
+            header = etree.SubElement(hiddenDiv, f'{{{IX_NS}}}header')
+            hidden = etree.SubElement(header, f'{{{IX_NS}}}hidden')
+            for fact in self.facts[params.facts:params.facts + params.hiddenFacts]:
+                self._addNumericFact(hidden, fact)
+            self._addResources(header)
+
+        documents = max(1, params.documents)
+        perDocument = -(-params.facts // documents)
+        container = body
+        for i, fact in enumerate(self.facts[:params.facts][index * perDocument:(index + 1) * perDocument], start=index * perDocument):
+            if i % FACTS_PER_SECTION == 0:
+                container = body
+                for d in range(max(1, params.depth)):
+                    container = etree.SubElement(container, f'{{{XHTML_NS}}}div', {'class': f'level{d}'})
+            p = etree.SubElement(container, f'{{{XHTML_NS}}}p')
+            p.text = f'Line item {i} '
+            self._addNumericFact(p, fact).tail = ' thousand'
+
+        if index > 0:
+            return etree.ElementTree(html)
+        section = etree.SubElement(body, f'{{{XHTML_NS}}}div', {'class': 'notes'})
+        for c, fact in enumerate(self.facts[params.facts + params.hiddenFacts:]):
+            e = etree.SubElement(section, f'{{{IX_NS}}}nonNumeric', {
+                'name': self._factName(fact),
+                'contextRef': fact.context.id,
+                'id': fact.id,
+            })
+            etree.SubElement(e, f'{{{XHTML_NS}}}p').text = f'Note {c} text & <details>'
+            if params.continuationLength > 0:
+                e.set('continuedAt', f'cont{c}_0')
+            for n in range(params.continuationLength):
+                etree.SubElement(section, f'{{{XHTML_NS}}}p').text = 'Intervening text'
+                cont = etree.SubElement(section, f'{{{IX_NS}}}continuation', id=f'cont{c}_{n}')
+                if n + 1 < params.continuationLength:
+                    cont.set('continuedAt', f'cont{c}_{n + 1}')
+                etree.SubElement(cont, f'{{{XHTML_NS}}}p').text = f'Continuation {n} of note {c}'
+
+        return etree.ElementTree(html)
@@ -11,7 +11,8 @@ def qname_effect(prefix, namespaceURI, localName):
 
 def mrs_effect(dts, reltype):
     return Mock(
-        fromModelObject = lambda source: []  
+        fromModelObject = lambda source: [],
+        modelRelationships = [],
     )
 
 def inferredDecimals_effect(fact):
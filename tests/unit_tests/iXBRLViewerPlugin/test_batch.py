@@ -0,0 +1,64 @@
+import json
+import os
+from unittest.mock import Mock
+
+import pytest
+from arelle.UrlUtil import IXDS_DOC_SEPARATOR
+
+from .mock_arelle import mock_arelle
+
+mock_arelle()
+
+from iXBRLViewerPlugin.batch import BatchFiling, BatchResult, BatchViewerGenerator, readManifest  # noqa: E402
+
+
+class TestReadManifest:
+
+    def test_relative_paths(self, tmp_path):
+        manifest = tmp_path / 'manifest.json'
+        manifest.write_text(json.dumps([
+            {"file": "a.html", "out": "out/a.html"},
+            {"file": ["b1.html", "b2.html"], "out": "out/b/", "zip": True, "packageDownloadURL": "b.zip"},
+        ]))
+        filings = readManifest(str(manifest))
+        assert filings == [
+            BatchFiling(files=[str(tmp_path / 'a.html')], destination=str(tmp_path / 'out/a.html')),
+            BatchFiling(
+                files=[str(tmp_path / 'b1.html'), str(tmp_path / 'b2.html')],
+                destination=os.path.join(str(tmp_path), 'out/b/'),
+                zipOutput=True,
+                packageDownloadURL='b.zip',
+            ),
+        ]
+        assert filings[0].entryPoint == str(tmp_path / 'a.html')
+        assert filings[1].entryPoint.endswith(IXDS_DOC_SEPARATOR.join([str(tmp_path / 'b1.html'), str(tmp_path / 'b2.html')]))
+
+    def test_invalid_entry(self, tmp_path):
+        manifest = tmp_path / 'manifest.json'
+        manifest.write_text(json.dumps([{"file": "a.html"}]))
+        with pytest.raises(ValueError):
+            readManifest(str(manifest))
+
+
+class TestBatchViewerGenerator:
+
+    def test_run(self):
+        filings = [BatchFiling(files=[f'{i}.html'], destination=f'out{i}.html') for i in range(5)]
+        generator = BatchViewerGenerator(Mock(), workers=2)
+        viewers = {}
+
+        def createViewer(filing, result):
+            if filing.destination == 'out2.html':
+                result.error = 'failed'
+                return None
+            viewers[filing.destination] = Mock()
+            return viewers[filing.destination]
+
+        generator.createViewer = createViewer
+        generator.saveViewer = Mock(side_effect=lambda viewer, filing, result: setattr(result, 'success', True))
+        results = generator.run(filings)
+
+        assert [r.destination for r in results] == [f.destination for f in filings]
+        assert [r.success for r in results] == [True, True, False, True, True]
+        assert results[2] == BatchResult(destination='out2.html', error='failed')
+        assert sorted(call.args[1].destination for call in generator.saveViewer.call_args_list) == sorted(viewers)
@@ -0,0 +1,124 @@
+import os
+from unittest.mock import Mock
+
+from iXBRLViewerPlugin.cache import ViewerCache, cacheKey, main, modelKey
+
+
+def writeOutput(directory, files):
+    paths = []
+    for name, content in files.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        paths.append(str(path))
+    return paths
+
+
+def mockModel(urlDocs, fileSource=None):
+    return Mock(urlDocs=dict.fromkeys(urlDocs), fileSource=fileSource)
+
+
+class TestViewerCache:
+
+    def test_modelKey(self, tmp_path):
+        doc = tmp_path / "doc.html"
+        doc.write_text("one")
+        remote = "https://example.com/taxonomy.xsd"
+        key = modelKey(mockModel([str(doc), remote]))
+        assert key == modelKey(mockModel([remote, str(doc)]))
+        doc.write_text("two")
+        assert modelKey(mockModel([str(doc), remote])) != key
+
+    def test_modelKey_archive(self, tmp_path):
+        archive = tmp_path / "report.zip"
+        archive.write_bytes(b"one")
+        fileSource = Mock(isArchive=True, basefile=str(archive))
+        key = modelKey(mockModel([f"{archive}/doc.html"], fileSource))
+        archive.write_bytes(b"two")
+        assert modelKey(mockModel([f"{archive}/doc.html"], fileSource)) != key
+
+    def test_cacheKey(self):
+        key = cacheKey({"features": {"review": True}}, ["a"])
+        assert key == cacheKey({"features": {"review": True}}, ["a"])
+        assert key != cacheKey({"features": {}}, ["a"])
+        assert key != cacheKey({"features": {"review": True}}, ["b"])
+
+    def test_store_and_restore_file(self, tmp_path):
+        out = tmp_path / "out"
+        saved = writeOutput(out, {"viewer.html": "<html/>", "data.json": "{}"})
+        cache = ViewerCache(str(tmp_path / "cache"))
+        assert cache.lookup("k1") is None
+        cache.store("k1", ["m1"], str(out / "viewer.html"), saved)
+
+        entry = cache.lookup("k1")
+        assert entry is not None
+        assert entry.modelKeys == ["m1"]
+        assert entry.mainFile == "viewer.html"
+        assert entry.files == ["viewer.html", "data.json"]
+        assert entry.size == len("<html/>") + len("{}")
+
+        # The main file is restored under the new destination name.
+        dest = tmp_path / "restored"
+        dest.mkdir()
+        written = cache.restore(entry, str(dest / "other.html"))
+        assert written == [str(dest / "other.html"), str(dest / "data.json")]
+        assert (dest / "other.html").read_text() == "<html/>"
+        assert (dest / "data.json").read_text() == "{}"
+
+    def test_store_and_restore_directory(self, tmp_path):
+        out = tmp_path / "out"
+        saved = writeOutput(out, {"a.html": "a", "b.html": "b"})
+        cache = ViewerCache(str(tmp_path / "cache"))
+        cache.store("k1", ["m1"], str(out), saved)
+        entry = cache.lookup("k1")
+        assert entry.mainFile is None
+
+        dest = tmp_path / "restored"
+        cache.restore(entry, str(dest), hardlink=True)
+        assert (dest / "a.html").read_text() == "a"
+        assert (dest / "b.html").read_text() == "b"
+        assert os.path.samefile(dest / "a.html", os.path.join(cache.entryDirectory("k1"), "files", "a.html"))
+
+    def test_evict_least_recently_used(self, tmp_path):
+        cache = ViewerCache(str(tmp_path / "cache"), maxSize=25)
+        for i, key in enumerate(("k1", "k2")):
+            out = tmp_path / key
+            cache.store(key, [], str(out / "v.html"), writeOutput(out, {"v.html": "x" * 10}))
+            entryFile = os.path.join(cache.entryDirectory(key), "entry.json")
+            os.utime(entryFile, (1000 + i, 1000 + i))
+        # Using k1 makes k2 the least recently used.
+        cache.lookup("k1")
+        out = tmp_path / "k3"
+        cache.store("k3", [], str(out / "v.html"), writeOutput(out, {"v.html": "x" * 10}))
+        assert [e.key for e in cache.entries()] == ["k1", "k3"]
+        assert cache.size() == 20
+
+    def test_store_larger_than_cache(self, tmp_path):
+        cache = ViewerCache(str(tmp_path / "cache"), maxSize=5)
+        out = tmp_path / "out"
+        cache.store("k1", [], str(out / "v.html"), writeOutput(out, {"v.html": "x" * 10}))
+        # The entry just stored is never evicted.
+        assert [e.key for e in cache.entries()] == ["k1"]
+
+    def test_purge(self, tmp_path, capsys):
+        cache = ViewerCache(str(tmp_path / "cache"))
+        out = tmp_path / "out"
+        cache.store("k1", [], str(out / "v.html"), writeOutput(out, {"v.html": "x"}))
+        assert main([cache.directory, "list"]) == 0
+        assert "1 entries, 1 bytes" in capsys.readouterr().out
+        assert main([cache.directory, "purge"]) == 0
+        assert cache.entries() == []
+        assert not os.path.exists(cache.entryDirectory("k1"))
+
+    def test_store_concurrently(self, tmp_path):
+        cache = ViewerCache(str(tmp_path / "cache"))
+        out = tmp_path / "out"
+        saved = writeOutput(out, {"v.html": "x"})
+        cache.store("k1", [], str(out / "v.html"), saved)
+        # Simulate another thread storing the same key between removing the
+        # old entry and moving the new one into place.
+        cache.remove = lambda key: None
+        entry = cache.store("k1", [], str(out / "v.html"), saved)
+        assert entry.key == "k1"
+        assert [e.key for e in cache.entries()] == ["k1"]
+        assert [p for p in os.listdir(cache.directory) if p.startswith(".tmp-")] == []
@@ -1,14 +1,18 @@
+import datetime
+import gzip
 import io
 import json
 import logging
 import os
+import threading
+import zipfile
 from collections import defaultdict
 from unittest.mock import Mock, patch
 
 import pytest
 from arelle import XbrlConst
 from arelle.ModelDocument import Type
-from arelle.ModelDtsObject import ModelConcept
+from arelle.ModelDtsObject import ModelConcept, ModelResource
 from arelle.ModelValue import qname
 from lxml import etree
 
@@ -17,7 +21,22 @@ from .mock_arelle import mock_arelle
 mock_arelle()
 
 from iXBRLViewerPlugin.constants import MANDATORY_FACTS
-from iXBRLViewerPlugin.iXBRLViewer import NamespaceMap, IXBRLViewerBuilder, iXBRLViewerFile
+from iXBRLViewerPlugin.iXBRLViewer import ConceptCache, ConceptCacheEntry, NamespaceMap, IXBRLViewerBuilder, iXBRLViewerFile, mapConcurrently, parseLabelLanguages
+from iXBRLViewerPlugin.profiling import StageProfiler
+from iXBRLViewerPlugin.progress import GenerationProgress, ProgressUpdate, ViewerGenerationCancelled
+
+def serializedViewerData(viewerFile):
+    """
+    Serialize the given viewer file and return the parsed viewer JSON.  The
+    JSON is only written at serialization time, so is not available from the
+    document tree.
+    """
+    buf = io.BytesIO()
+    viewerFile.serialize(buf)
+    doc = etree.fromstring(buf.getvalue())
+    script = doc.find('.//{http://www.w3.org/1999/xhtml}script[@type="application/x.ixbrl-viewer+json"]')
+    return json.loads(script.text)
+
 
 class TestNamespaceMap:
 
@@ -159,6 +178,81 @@ class TestNamespaceMap:
         assert ns_map.getPrefix("http://example.com") == "ns0"
 
 
+class TestConceptCache:
+
+    DTS = frozenset({"a.xsd"})
+
+    def _entry(self):
+        return ConceptCacheEntry({"labels": {}}, (), None)
+
+    def test_hits_and_misses(self):
+        cache = ConceptCache()
+        qn = Mock()
+        assert cache.get(self.DTS, qn) is None
+        entry = self._entry()
+        cache.put(self.DTS, qn, entry)
+        assert cache.get(self.DTS, qn) is entry
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_separate_dts(self):
+        cache = ConceptCache()
+        qn = Mock()
+        cache.put(self.DTS, qn, self._entry())
+        assert cache.get(frozenset({"a.xsd", "ext.xsd"}), qn) is None
+
+    def test_evicts_least_recently_used(self):
+        cache = ConceptCache(maxSize=2)
+        qn1, qn2, qn3 = Mock(), Mock(), Mock()
+        cache.put(self.DTS, qn1, self._entry())
+        cache.put(self.DTS, qn2, self._entry())
+        # Touch qn1 so that qn2 becomes the least recently used
+        cache.get(self.DTS, qn1)
+        cache.put(self.DTS, qn3, self._entry())
+        assert len(cache) == 2
+        assert cache.get(self.DTS, qn2) is None
+        assert cache.get(self.DTS, qn1) is not None
+        assert cache.get(self.DTS, qn3) is not None
+
+    def test_zero_size_disables_cache(self):
+        cache = ConceptCache(maxSize=0)
+        qn = Mock()
+        cache.put(self.DTS, qn, self._entry())
+        assert len(cache) == 0
+        assert cache.get(self.DTS, qn) is None
+
+
+class TestMapConcurrently:
+
+    def test_serial(self):
+        threads = set()
+
+        def fn(x):
+            threads.add(threading.get_ident())
+            return x * 2
+
+        assert list(mapConcurrently(fn, range(5), 1)) == [0, 2, 4, 6, 8]
+        assert threads == {threading.get_ident()}
+
+    def test_results_in_order(self):
+        threads = set()
+
+        def fn(x):
+            threads.add(threading.get_ident())
+            return x * 2
+
+        assert list(mapConcurrently(fn, range(20), 4)) == [x * 2 for x in range(20)]
+        assert threading.get_ident() not in threads
+
+    def test_exception_propagates(self):
+        def fn(x):
+            if x == 3:
+                raise ValueError(x)
+            return x
+
+        with pytest.raises(ValueError):
+            list(mapConcurrently(fn, range(5), 2))
+
+
 class TestIXBRLViewer:
 
     def setup_method(self, method):
@@ -574,6 +668,8 @@ class TestIXBRLViewer:
         typed_dimension_concept.modelXbrl = self.modelXbrl_1
         typed_dimension_domain_concept.modelXbrl = self.modelXbrl_1
         member_concept.modelXbrl = self.modelXbrl_1
+        for modelXbrl in (self.modelXbrl_1, self.modelXbrl_2, self.modelXbrlDocSet):
+            modelXbrl.qnameConcepts = {typed_dimension_domain_concept.qname: typed_dimension_domain_concept}
 
         self.logRecordBuffer = []
         self.cntlr_mock = Mock(
@@ -594,6 +690,82 @@ class TestIXBRLViewer:
         builder.addConcept(self.modelXbrl_1, self.cash_concept)
         assert builder.taxonomyData["sourceReports"][0]["targetReports"][0].get('concepts').get('us-gaap:Cash')
 
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    def test_addConcept_cache_per_dts(self):
+        """
+        Reports with different DTSes, such as filings with their own
+        extension labels for base taxonomy concepts, don't share concept data.
+        """
+        concept = Mock(
+            spec=ModelConcept,
+            qname=qname("http://example.com/base", "base:Assets"),
+            isTypedDimension=False,
+            isEnumeration=False,
+            isTextBlock=False,
+            balance=None,
+            type=None,
+            modelXbrl=Mock(relationshipSet=lambda *args: Mock(fromModelObject=lambda c: [])),
+        )
+
+        def report(docs, label):
+            labelRel = Mock(toModelObject=Mock(spec=ModelResource, xmlLang="en", role=XbrlConst.standardLabel, stringValue=label))
+            return Mock(
+                urlDocs={url: Mock(type=Type.SCHEMA) for url in docs},
+                roleTypes={},
+                relationshipSet=lambda arcrole, *args: Mock(fromModelObject=lambda c: [labelRel] if arcrole == XbrlConst.conceptLabel else []),
+            )
+
+        builder = IXBRLViewerBuilder(Mock())
+        conceptData = []
+        for r in (
+            report({"base.xsd", "ext1.xsd"}, "Assets"),
+            report({"base.xsd", "ext2.xsd"}, "Total assets"),
+            # A separate model of the same DTS, such as another target report
+            report({"base.xsd", "ext1.xsd"}, "Assets"),
+        ):
+            builder.currentTargetReport = builder.newTargetReport(None)
+            builder.addConcept(r, concept)
+            conceptData.append(builder.currentTargetReport["concepts"]["base:Assets"])
+        assert [c["labels"]["std"]["en"] for c in conceptData] == ["Assets", "Total assets", "Assets"]
+        assert (builder.conceptCache.hits, builder.conceptCache.misses) == (1, 2)
+        # Target reports don't share nested data
+        conceptData[0]["labels"]["std"]["en"] = "Changed"
+        assert conceptData[2]["labels"]["std"]["en"] == "Assets"
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    def test_addConcept_uses_cache_across_target_reports(self):
+        """
+        Concept data should be extracted once per builder, and reused for
+        subsequent target reports.
+        """
+        builder = IXBRLViewerBuilder(Mock())
+        with patch.object(builder, 'getConceptData', wraps=builder.getConceptData) as getConceptData:
+            for _ in range(2):
+                builder.currentTargetReport = builder.newTargetReport(None)
+                builder.addConcept(self.modelXbrl_1, self.cash_concept)
+                builder.addConcept(self.modelXbrl_1, self.cash_concept)
+                assert 'us-gaap:Cash' in builder.currentTargetReport['concepts']
+            assert getConceptData.call_count == 1
+        assert (builder.conceptCache.hits, builder.conceptCache.misses) == (1, 1)
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    def test_addConcept_cached_dimension_type_not_shared(self):
+        """
+        The dimension type is specific to the call, so must not leak into the
+        cached concept data.
+        """
+        builder = IXBRLViewerBuilder(Mock())
+        builder.currentTargetReport = builder.newTargetReport(None)
+        builder.addConcept(self.modelXbrl_1, self.cash_concept, dimensionType="e")
+        assert builder.currentTargetReport['concepts']['us-gaap:Cash']['d'] == "e"
+        builder.currentTargetReport = builder.newTargetReport(None)
+        builder.addConcept(self.modelXbrl_1, self.cash_concept)
+        assert 'd' not in builder.currentTargetReport['concepts']['us-gaap:Cash']
+
     @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
     @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
     def test_getRelationships_simple_case(self):
@@ -612,6 +784,40 @@ class TestIXBRLViewer:
         siPrefix = roleMap.getPrefix('http://www.xbrl.org/2003/arcrole/summation-item')
         assert result.get(siPrefix).get(roleMap.getPrefix('ELR')).get('us-gaap:from_concept')
 
+    def test_getRelationships_each_relationship_set_once(self):
+        summationItem = 'http://www.xbrl.org/2003/arcrole/summation-item'
+        baseSets = {
+            # Arelle records each base set with and without link and arc names
+            (summationItem, 'ELR', 'linkqname', 'arcqname'): [],
+            (summationItem, 'ELR', 'linkqname', None): [],
+            (summationItem, 'ELR', None, None): [],
+            (summationItem, None, None, None): [],
+            (summationItem, 'ELR2', None, None): [],
+        }
+        rels = self.modelXbrl_1.relationshipSet(summationItem, 'ELR').modelRelationships
+        report = Mock(
+            baseSets=baseSets,
+            roleTypes={},
+            relationshipSet=Mock(return_value=Mock(modelRelationships=rels + rels)),
+        )
+        builder = IXBRLViewerBuilder(Mock())
+        builder.currentTargetReport = builder.newTargetReport(None)
+        with patch.object(builder, 'addConcept') as addConcept:
+            result = builder.getRelationships(report)
+        assert [c.args for c in report.relationshipSet.call_args_list] == [
+            (summationItem, 'ELR'),
+            (summationItem, 'ELR2'),
+        ]
+        # Each concept is only added once, however many relationships it is in
+        assert addConcept.call_count == 2
+        roleMap = builder.roleMap
+        assert result == {
+            roleMap.getPrefix(summationItem): {
+                roleMap.getPrefix(ELR): {'us-gaap:from_concept': [{'t': 'us-gaap:to_concept', 'w': 1}] * 2}
+                for ELR in ('ELR', 'ELR2')
+            },
+        }
+
     def test_addRoleDefinition_no_definition(self):
         """
         Adding an ELR with no definition should result in no entry in the roleDefs map
@@ -659,7 +865,7 @@ class TestIXBRLViewer:
         assert body[2].attrib.get('type') == 'application/x.ixbrl-viewer+json'
         assert body[3].text == 'END IXBRL VIEWER EXTENSIONS'
 
-        jsdata = json.loads(body[2].text)
+        jsdata = serializedViewerData(result.files[0])
         errors = jsdata["validation"]
         assert errors == [{"sev": "ERROR", "msg": "Error message", "code": "code1" }]
         assert set(jsdata["sourceReports"][0]["targetReports"][0]["facts"]) == {"fact_id1", "fact_typed_dimension", "fact_dimension_missing_member"}
@@ -685,7 +891,7 @@ class TestIXBRLViewer:
         assert body[2].attrib.get('type') == 'application/x.ixbrl-viewer+json'
         assert body[3].text == 'END IXBRL VIEWER EXTENSIONS'
 
-        jsdata = json.loads(body[2].text)
+        jsdata = serializedViewerData(result.files[0])
         assert "validation" not in jsdata
         reportData = jsdata["sourceReports"][0]["targetReports"][0]
         assert set(reportData["facts"]) == {"fact_id1", "fact_typed_dimension", "fact_dimension_missing_member"}
@@ -731,7 +937,7 @@ class TestIXBRLViewer:
         assert body[2].attrib.get('type') == 'application/x.ixbrl-viewer+json'
         assert body[3].text == 'END IXBRL VIEWER EXTENSIONS'
 
-        jsdata = json.loads(body[2].text)
+        jsdata = serializedViewerData(result.files[0])
         assert "validation" not in jsdata
         reportData = jsdata["sourceReports"][0]["targetReports"][0]
         assert set(reportData["facts"]) == {"fact_id1", "fact_typed_dimension", "fact_dimension_missing_member"}
@@ -776,7 +982,7 @@ class TestIXBRLViewer:
         assert body[2].attrib.get('type') == 'application/x.ixbrl-viewer+json'
         assert body[3].text == 'END IXBRL VIEWER EXTENSIONS'
 
-        jsdata = json.loads(body[2].text)
+        jsdata = serializedViewerData(result.files[0])
         assert "validation" not in jsdata
         reportData = jsdata["sourceReports"][0]["targetReports"][0]
         assert set(reportData["facts"]) == {"fact_id1", "fact_typed_dimension", "fact_dimension_missing_member"}
@@ -785,6 +991,191 @@ class TestIXBRLViewer:
             'a.html',
             'b.html'
         ]
+        assert "ixItems" not in jsdata["sourceReports"][0]
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_createViewer_preprocessIXBRL(self):
+        self.builder_doc_set.processModel(self.modelXbrlDocSet)
+        result = self.builder_doc_set.createViewer('ixbrlviewer.js', showValidations=False, preprocessIXBRL=True)
+        sourceReport = serializedViewerData(result.files[0])["sourceReports"][0]
+        # One list of items for each document in the document set
+        assert len(sourceReport["ixItems"]) == len(sourceReport["docSetFiles"])
+        assert sourceReport["continuations"] == {}
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_createViewer_pruneRelationships(self):
+        self.builder_doc_set.processModel(self.modelXbrlDocSet)
+        result = self.builder_doc_set.createViewer('ixbrlviewer.js', showValidations=False, pruneRelationships=True, compactFacts=True)
+        reportData = serializedViewerData(result.files[0])["sourceReports"][0]["targetReports"][0]
+        # Concepts of reported facts are kept
+        assert reportData["concepts"]
+        assert "compactFacts" in reportData
+        assert any(
+            "Pruned relationships and concepts" in call.args[0]
+            for call in self.cntlr_mock.addToLog.call_args_list
+        )
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_progress(self, tmp_path):
+        updates = []
+        builder = IXBRLViewerBuilder(self.cntlr_mock, progress=GenerationProgress(updates.append, interval=0))
+        builder.processModel(self.modelXbrlDocSet)
+        result = builder.createViewer('ixbrlviewer.js', showValidations=False)
+        result.save(str(tmp_path))
+        factCount = len(self.modelXbrlDocSet.facts)
+        assert updates[0] == ProgressUpdate("Processing facts", 0, factCount, "facts")
+        assert ProgressUpdate("Processing facts", factCount, factCount, "facts") in updates
+        assert ProgressUpdate("Creating viewer", 0) in updates
+        assert updates[-1] == ProgressUpdate(
+            "Saving files", 2, 2, "files",
+            sum(os.path.getsize(tmp_path / f) for f in ('a.html', 'b.html')),
+        )
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_progress_cancelled(self):
+        progress = GenerationProgress()
+        builder = IXBRLViewerBuilder(self.cntlr_mock, progress=progress)
+        progress.cancel()
+        with pytest.raises(ViewerGenerationCancelled):
+            builder.processModel(self.modelXbrlDocSet)
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_save_docset_with_workers(self, tmp_path):
+        self.builder_doc_set.processModel(self.modelXbrlDocSet)
+        result = self.builder_doc_set.createViewer('ixbrlviewer.js', showValidations=False)
+        expected = {f.filename: f.serializeToBytes() for f in result.files}
+
+        outDir = tmp_path / 'out'
+        outDir.mkdir()
+        result.save(str(outDir), workers=4)
+        assert {p.name: p.read_bytes() for p in outDir.iterdir()} == expected
+
+        zipPath = tmp_path / 'out.zip'
+        result.save(str(zipPath), zipOutput=True, workers=4)
+        with zipfile.ZipFile(zipPath) as z:
+            assert z.testzip() is None
+            assert z.namelist() == ['a.html', 'b.html']
+            assert {name: z.read(name) for name in z.namelist()} == expected
+            assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in z.infolist())
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_save_zip_with_assets(self, tmp_path):
+        reportZip = tmp_path / 'report.zip'
+        with zipfile.ZipFile(reportZip, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr('report/reports/logo.png', b'png', compress_type=zipfile.ZIP_STORED)
+            z.writestr('report/reports/chart.svg', '<svg/>')
+        filingDocuments = tmp_path / 'filing.zip'
+        filingDocuments.write_bytes(reportZip.read_bytes())
+
+        self.builder_doc_set.processModel(self.modelXbrlDocSet)
+        result = self.builder_doc_set.createViewer('ixbrlviewer.js', showValidations=False)
+        result.reportZip = str(reportZip)
+        result.addReportAssets(['report/reports/logo.png', 'report/reports/chart.svg'])
+        result.addFilingDoc(str(filingDocuments))
+
+        zipPath = tmp_path / 'out.zip'
+        result.save(str(zipPath), zipOutput=True)
+        with zipfile.ZipFile(zipPath) as z:
+            assert z.namelist() == ['a.html', 'b.html', 'filing.zip', 'logo.png', 'chart.svg']
+            assert z.read('logo.png') == b'png'
+            assert z.read('chart.svg') == b'<svg/>'
+            assert z.getinfo('a.html').compress_type == zipfile.ZIP_DEFLATED
+            assert z.getinfo('filing.zip').compress_type == zipfile.ZIP_STORED
+            assert z.getinfo('logo.png').compress_type == zipfile.ZIP_STORED
+            assert z.getinfo('chart.svg').compress_type == zipfile.ZIP_DEFLATED
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_save_nonSeekable(self):
+        """
+        A non-seekable stream, such as a response stream passed to Filing.End,
+        is written as a new zip archive
+        """
+        class NonSeekableStream(io.BytesIO):
+            def seekable(self):
+                return False
+
+        self.builder_doc_set.processModel(self.modelXbrlDocSet)
+        result = self.builder_doc_set.createViewer('ixbrlviewer.js', showValidations=False)
+        expected = {f.filename: f.serializeToBytes() for f in result.files}
+        for workers in (1, 4):
+            stream = NonSeekableStream()
+            result.save(stream, zipOutput=True, workers=workers)
+            with zipfile.ZipFile(io.BytesIO(stream.getvalue())) as z:
+                assert z.testzip() is None
+                assert z.namelist() == ['a.html', 'b.html']
+                assert {name: z.read(name) for name in z.namelist()} == expected
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_save_with_data_file(self, tmp_path):
+        self.builder_doc_set.processModel(self.modelXbrlDocSet)
+        result = self.builder_doc_set.createViewer('ixbrlviewer.js', showValidations=False, dataFilename='data.json', compressData=True)
+        doc = etree.fromstring(result.files[0].serializeToBytes())
+        script = doc.find('.//{http://www.w3.org/1999/xhtml}script[@type="application/x.ixbrl-viewer+json"]')
+        assert script.get('src') == 'data.json'
+        assert not script.text
+
+        outDir = tmp_path / 'out'
+        outDir.mkdir()
+        result.save(str(outDir))
+        assert sorted(p.name for p in outDir.iterdir()) == ['a.html', 'b.html', 'data.json', 'data.json.gz']
+        data = (outDir / 'data.json').read_bytes()
+        assert json.loads(data) == self.builder_doc_set.taxonomyData
+        assert gzip.decompress((outDir / 'data.json.gz').read_bytes()) == data
+
+        zipPath = tmp_path / 'out.zip'
+        result.save(str(zipPath), zipOutput=True)
+        with zipfile.ZipFile(zipPath) as z:
+            assert z.namelist() == ['a.html', 'b.html', 'data.json', 'data.json.gz']
+            assert z.read('data.json') == data
+            assert gzip.decompress(z.read('data.json.gz')) == data
 
     @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
     @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
@@ -810,12 +1201,40 @@ class TestIXBRLViewer:
         assert body[2].attrib.get('type') == 'application/x.ixbrl-viewer+json'
         assert body[3].text == 'END IXBRL VIEWER EXTENSIONS'
 
-        jsdata = json.loads(body[2].text)
+        jsdata = serializedViewerData(result.files[0])
         facts = jsdata["sourceReports"][0]["targetReports"][0]["facts"]
         assert facts.keys() == {"fact_id2", "fact_id3"}
         assert facts["fact_id2"]["a"]["u"] == "iso4217:USD"
         assert facts["fact_id3"]["a"]["u"] is None
 
+    @patch('iXBRLViewerPlugin.iXBRLViewer.JSON_CHUNK_SIZE', 16)
+    def test_taxonomyDataJSON_streams_escaped_json(self):
+        """
+        Streamed JSON should be identical to a single json.dumps call, with XML
+        special characters escaped, regardless of chunking.
+        """
+        builder = IXBRLViewerBuilder(Mock())
+        builder.taxonomyData["sourceReports"] = [{"v": "<b>A & B</b>", "n": list(range(20))}]
+        chunks = list(builder.taxonomyDataJSON())
+        assert len(chunks) > 1
+        expected = json.dumps(builder.taxonomyData, indent=1).replace("<", "\\u003C").replace(">", "\\u003E").replace("&", "\\u0026")
+        assert "".join(chunks) == expected
+        assert json.loads("".join(chunks)) == builder.taxonomyData
+
+    def test_taxonomyDataJSON_unescaped(self):
+        builder = IXBRLViewerBuilder(Mock())
+        builder.taxonomyData["meta"] = "<&>"
+        result = "".join(builder.taxonomyDataJSON(escape=False))
+        assert '"<&>"' in result
+        assert json.loads(result) == builder.taxonomyData
+
+    def test_taxonomyDataJSON_compact(self):
+        builder = IXBRLViewerBuilder(Mock())
+        result = "".join(builder.taxonomyDataJSON(compact=True))
+        assert "\n" not in result
+        assert " " not in result
+        assert json.loads(result) == builder.taxonomyData
+
     def test_MANDATORY_FACTS_companies_house_contains_expected_facts(self):
         """
         MANDATORY_FACTS['companies-house'] should list the FRC-mandated
@@ -847,7 +1266,6 @@ class TestIXBRLViewer:
         in that profile's mandatory facts list.
         """
         builder = IXBRLViewerBuilder(self.cntlr_mock, features={'mandatory_facts': 'companies-house'})
-        builder.footnoteRelationshipSet = Mock(fromModelObject=Mock(return_value=[]))
         builder.currentTargetReport = builder.newTargetReport(None)
 
         mandatory_qname = Mock(
@@ -894,7 +1312,6 @@ class TestIXBRLViewer:
         that profile's mandatory facts list.
         """
         builder = IXBRLViewerBuilder(self.cntlr_mock, features={'mandatory_facts': 'companies-house'})
-        builder.footnoteRelationshipSet = Mock(fromModelObject=Mock(return_value=[]))
         builder.currentTargetReport = builder.newTargetReport(None)
 
         non_mandatory_qname = Mock(
@@ -934,6 +1351,72 @@ class TestIXBRLViewer:
 
         assert builder.currentTargetReport["facts"]["fact_non_mandatory"]["a"]["m"] is False
 
+    def test_addFact_reuses_context_and_unit_aspects(self):
+        """
+        Aspects derived from a context or unit are computed once per target
+        report, however many facts use it.
+        """
+        builder = IXBRLViewerBuilder(self.cntlr_mock)
+        builder.currentTargetReport = builder.newTargetReport(None)
+        builder.addConcept = Mock()
+        builder.dateFormat = Mock(wraps=builder.dateFormat)
+        builder.oimUnitString = Mock(wraps=builder.oimUnitString)
+
+        context = Mock(
+            id='c1',
+            entityIdentifier=('scheme', 'ident'),
+            qnameDims={},
+            isForeverPeriod=False,
+            isInstantPeriod=True,
+            instantDatetime=datetime.datetime(2021, 1, 1),
+        )
+        unit = Mock(id='u1', measures=([self.usd_qname], []))
+
+        def fact(factId):
+            return Mock(
+                id=factId,
+                qname=self.cash_concept.qname,
+                concept=Mock(spec=ModelConcept, qname=self.cash_concept.qname, isEnumeration=False),
+                context=context,
+                unit=unit,
+                isNumeric=True,
+                isNil=False,
+                isTuple=False,
+                value='1000',
+                format=None,
+                decimals='INF',
+                precision=None,
+            )
+
+        builder.addFact(self.modelXbrl_1, fact('f1'))
+        builder.addFact(self.modelXbrl_1, fact('f2'))
+
+        facts = builder.currentTargetReport["facts"]
+        assert facts['f1']['a'] == facts['f2']['a'] == {
+            'c': 'us-gaap:Cash',
+            'e': 'e:ident',
+            'm': False,
+            'u': 'iso4217:USD',
+            'p': '2021-01-01',
+        }
+        assert builder.dateFormat.call_count == 1
+        assert builder.oimUnitString.call_count == 1
+
+    def test_getFootnoteMap(self):
+        f1, f2, fn1, fn2 = (Mock(id=i) for i in ('f1', 'f2', 'fn1', 'fn2'))
+        rels = [
+            Mock(fromModelObject=f1, toModelObject=fn1),
+            Mock(fromModelObject=f2, toModelObject=fn1),
+            Mock(fromModelObject=f1, toModelObject=fn2),
+            Mock(fromModelObject=f1, toModelObject=None),
+        ]
+        builder = IXBRLViewerBuilder(self.cntlr_mock)
+        with patch('iXBRLViewerPlugin.iXBRLViewer.ModelRelationshipSet', return_value=Mock(modelRelationships=rels)):
+            assert builder.getFootnoteMap(self.modelXbrl_1) == {
+                'f1': ['fn1', 'fn2'],
+                'f2': ['fn1'],
+            }
+
     def test_enableFeature_valid(self):
         """
         Enable a defined feature
@@ -994,3 +1477,233 @@ class TestIXBRLViewer:
             assert body[2].prefix is None
             assert body[2].attrib.get('type') == 'application/x.ixbrl-viewer+json'
             assert body[3].text == 'END IXBRL VIEWER EXTENSIONS'
+
+    @patch('arelle.XbrlConst.conceptLabel', 'http://www.xbrl.org/2003/arcrole/concept-label')
+    @patch('arelle.XbrlConst.conceptReference', 'http://www.xbrl.org/2003/arcrole/concept-reference')
+    @patch('arelle.XbrlConst.parentChild', 'http://www.xbrl.org/2003/arcrole/parent-child')
+    @patch('arelle.XbrlConst.summationItem', 'http://www.xbrl.org/2003/arcrole/summation-item')
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    @patch('arelle.XbrlConst.dimensionDefault', 'http://xbrl.org/int/dim/arcrole/dimension-default')
+    def test_addViewerData_without_copy(self):
+        xmls = rb'''<html xmlns="http://www.w3.org/1999/xhtml"><body><p>Text</p><br/></body></html>'''
+        js_uri = 'https://example.com/script-url'
+
+        copied_file = iXBRLViewerFile("test.xhtml", etree.parse(io.BytesIO(xmls)))
+        assert self.builder_1.addViewerData(copied_file, js_uri)
+        expected = io.BytesIO()
+        copied_file.serialize(expected)
+
+        xml = etree.parse(io.BytesIO(xmls))
+        viewer_file = iXBRLViewerFile("test.xhtml", xml, copy=False)
+        assert viewer_file.xmlDocument is xml
+        assert self.builder_1.addViewerData(viewer_file, js_uri)
+
+        # Viewer data is recorded separately, leaving the document untouched
+        assert len(xml.getroot()[0]) == 2
+        assert etree.tostring(xml) == etree.tostring(etree.parse(io.BytesIO(xmls)))
+
+        result = io.BytesIO()
+        viewer_file.serialize(result)
+        assert result.getvalue() == expected.getvalue()
+
+        # Source document doesn't contain the viewer, so it can be added again
+        assert self.builder_1.addViewerData(iXBRLViewerFile("test.xhtml", xml, copy=False), js_uri)
+
+    def test_profiler_records_stages(self, tmp_path):
+        profiler = StageProfiler()
+        builder = IXBRLViewerBuilder(self.cntlr_mock, profiler=profiler)
+        builder.processModel(self.modelXbrl_1)
+        viewer = builder.createViewer('ixbrlviewer.js', showValidations=False)
+        viewer.save(str(tmp_path))
+        assert {
+            'processModel',
+            'processModel.facts',
+            'processModel.relationships',
+            'processModel.documents',
+            'processModel.localDocs',
+            'createViewer',
+            'save',
+            'save.files',
+        } <= profiler.stages.keys()
+        assert profiler.stages['processModel.facts'].items == 3
+        assert profiler.stages['save.files'].items == 1
+
+    def test_processModel_without_copy(self):
+        builder = IXBRLViewerBuilder(self.cntlr_mock, copyDocuments=False)
+        builder.processModel(self.modelXbrl_1)
+        assert builder.iv.files[0].xmlDocument is self.modelXbrl_1.modelDocument.xmlDocument
+
+        builder = IXBRLViewerBuilder(self.cntlr_mock)
+        builder.processModel(self.modelXbrl_1)
+        assert builder.iv.files[0].xmlDocument is not self.modelXbrl_1.modelDocument.xmlDocument
+
+    def test_generateViewerInBackground_model_closed(self, tmp_path):
+        import iXBRLViewerPlugin
+        import queue
+
+        pluginDataStore = {}
+        self.cntlr_mock.getPluginData = pluginDataStore.get
+        self.cntlr_mock.setPluginData = lambda pd: pluginDataStore.__setitem__(pd.name, pd)
+        self.cntlr_mock.uiThreadQueue = queue.Queue()
+        self.modelDocument.type = Type.INLINEXBRL
+        root = self.modelDocument.xmlDocument.getroot()
+        etree.SubElement(root[0], '{http://www.w3.org/1999/xhtml}p').text = "Report text"
+        closeRequested = threading.Event()
+        processed = threading.Event()
+        processModel = iXBRLViewerPlugin.processModel
+
+        def processAfterClose(cntlr, modelXbrl, builder):
+            # The GUI closes the model while it is being processed, and
+            # clears the plugin data as no models remain open
+            assert closeRequested.wait(5)
+            pluginDataStore.clear()
+            processModel(cntlr, modelXbrl, builder)
+            processed.set()
+
+        def close():
+            # Closing the model clears its documents
+            assert processed.is_set()
+            root.clear()
+
+        self.modelXbrl_1.close.side_effect = close
+        with patch('iXBRLViewerPlugin.ui.ProgressDialog') as progressDialog, \
+                patch('iXBRLViewerPlugin.processModel', side_effect=processAfterClose):
+            dialog = progressDialog.return_value
+            iXBRLViewerPlugin.generateViewerInBackground(
+                self.cntlr_mock,
+                self.modelXbrl_1,
+                builderArgs={},
+                generateArgs=dict(saveViewerDest=str(tmp_path), viewerURL='ixbrlviewer.js', copyScript=False),
+            )
+            # Closing is deferred until the model has been processed
+            self.modelXbrl_1.close()
+            assert len(root)
+            closeRequested.set()
+            # Run the GUI thread until generation has finished
+            while not dialog.close.called:
+                func, args = self.cntlr_mock.uiThreadQueue.get(timeout=5)
+                func(*args)
+        assert len(root) == 0
+        output = (tmp_path / 'xbrlviewer.html').read_text()
+        assert 'Report text' in output
+        assert 'ixbrlviewer.js' in output
+        # The model's own close method is restored
+        self.modelXbrl_1.close()
+        assert self.modelXbrl_1.close.call_count == 2
+
+    def test_compactFactData(self):
+        builder = IXBRLViewerBuilder(Mock())
+        facts = {
+            "f1": {"v": "1000", "d": -3, "a": {"c": "eg:Concept1", "u": "iso4217:USD", "p": "2018-01-01"}},
+            "f2": {"v": "text", "a": {"c": "eg:Concept2", "u": None, "p": "2018-01-01", "m": True}},
+        }
+        assert builder.compactFactData(facts) == {
+            "strings": ["c", "eg:Concept1", "u", "iso4217:USD", "p", "2018-01-01", "eg:Concept2", "m"],
+            "facts": [
+                ["f1", [0, 1, 2, 3, 4, 5], {"v": "1000", "d": -3}],
+                ["f2", [0, 6, 2, None, 4, 5, 7, True], {"v": "text"}],
+            ],
+        }
+
+    def test_omitTextValues(self):
+        builder = IXBRLViewerBuilder(Mock())
+        longText = "x" * 100
+        targetReport = {
+            "concepts": {"eg:Enum": {"e": True}},
+            "facts": {
+                "f1": {"v": longText, "a": {"c": "eg:Text"}},
+                "f2": {"v": "short", "a": {"c": "eg:Text"}},
+                "f3": {"v": longText, "a": {"c": "eg:Number", "u": "iso4217:USD"}},
+                "f4": {"v": longText, "f": "ixt:date-monthname-day-year-en", "a": {"c": "eg:Date"}},
+                "f5": {"v": longText, "a": {"c": "eg:Enum"}},
+                "f6": {"v": None, "a": {"c": "eg:Text"}},
+            },
+        }
+        assert builder.omitTextValues(targetReport, 100) == 100
+        facts = targetReport["facts"]
+        assert facts["f1"] == {"ov": True, "a": {"c": "eg:Text"}}
+        assert all(facts[f]["v"] is not None for f in ("f2", "f3", "f4", "f5"))
+        assert facts["f6"]["v"] is None
+
+    def test_createViewer_compactFacts(self):
+        builder = IXBRLViewerBuilder(self.cntlr_mock)
+        builder.processModel(self.modelXbrl_1)
+        facts = builder.taxonomyData["sourceReports"][0]["targetReports"][0]["facts"].copy()
+        result = builder.createViewer('ixbrlviewer.js', showValidations=False, compactFacts=True)
+        reportData = serializedViewerData(result.files[0])["sourceReports"][0]["targetReports"][0]
+        assert "facts" not in reportData
+        strings = reportData["compactFacts"]["strings"]
+        decoded = {
+            factId: {
+                **data,
+                "a": {strings[aspects[i]]: strings[v] if isinstance(v, int) and not isinstance(v, bool) else v for i, v in zip(range(0, len(aspects), 2), aspects[1::2])},
+            }
+            for factId, aspects, data in reportData["compactFacts"]["facts"]
+        }
+        assert decoded == json.loads(json.dumps(facts))
+
+    def test_hiddenFactIds(self):
+        root = etree.fromstring(
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"><body>'
+            '<ix:header><ix:hidden><ix:nonNumeric id="hidden1"/><ix:nonNumeric id="other"/></ix:hidden></ix:header>'
+            '<ix:nonNumeric id="visible1"/>'
+            '</body></html>'
+        )
+        report = Mock(urlDocs={'a.html': Mock(type=Type.INLINEXBRL, xmlRootElement=root)})
+        builder = IXBRLViewerBuilder(Mock())
+        builder.currentTargetReport = builder.newTargetReport(None)
+        builder.currentTargetReport["facts"] = {"hidden1": {}, "visible1": {}}
+        assert builder.hiddenFactIds(report) == {"hidden1"}
+
+    def test_createViewer_searchIndex(self):
+        builder = IXBRLViewerBuilder(self.cntlr_mock, searchIndex=True)
+        builder.processModel(self.modelXbrl_2)
+        result = builder.createViewer('ixbrlviewer.js', showValidations=False)
+        search = serializedViewerData(result.files[0])["search"]
+        factIds = list(builder.taxonomyData["sourceReports"][0]["targetReports"][0]["facts"])
+        if "index" in search:
+            assert {fieldRef.split('/', 1)[1] for fieldRef, _ in search["index"]["fieldVectors"]} == {f"0-{f}" for f in factIds}
+        else:
+            assert [doc["id"] for doc in search["docs"]] == [f"0-{f}" for f in factIds]
+
+        builder = IXBRLViewerBuilder(self.cntlr_mock)
+        builder.processModel(self.modelXbrl_2)
+        result = builder.createViewer('ixbrlviewer.js', showValidations=False)
+        assert "search" not in serializedViewerData(result.files[0])
+
+    def test_parseLabelLanguages(self):
+        assert parseLabelLanguages("en,fr") == ["en", "fr"]
+        assert parseLabelLanguages(" en-GB, de ") == ["en-gb", "de"]
+        assert parseLabelLanguages("") is None
+        assert parseLabelLanguages(None) is None
+
+    def test_selectLabelLanguages(self):
+        labels = {"en-gb": "Assets", "fr": "Actifs", "de": "Vermögenswerte"}
+        assert IXBRLViewerBuilder(Mock()).selectLabelLanguages(labels) == labels
+        builder = IXBRLViewerBuilder(Mock(), labelLanguages=["EN", "fr"])
+        assert builder.selectLabelLanguages(labels) == {"en-gb": "Assets", "fr": "Actifs"}
+        # Without a label in a selected language, the viewer's fallback label is kept
+        assert builder.selectLabelLanguages({"de": "Vermögenswerte", "da": "Aktiver"}) == {"da": "Aktiver"}
+        assert builder.selectLabelLanguages({"de": "Vermögenswerte", "en-us": "Assets"}) == {"en-us": "Assets"}
+        assert builder.selectLabelLanguages({}) == {}
+
+    @patch('arelle.XbrlConst.standardLabel', 'http://www.xbrl.org/2003/role/label')
+    @patch('arelle.XbrlConst.documentationLabel', 'http://www.xbrl.org/2003/role/documentation')
+    def test_conceptData_labelLanguages(self):
+        def labelRel(role, lang, text):
+            return Mock(toModelObject=Mock(spec=ModelResource, xmlLang=lang, role=role, stringValue=text))
+
+        concept = Mock(spec=ModelConcept, isTypedDimension=False, isEnumeration=False, isTextBlock=False, balance=None, type=None)
+        labelRels = [
+            labelRel(XbrlConst.standardLabel, "en", "Assets"),
+            labelRel(XbrlConst.standardLabel, "de", "Vermögenswerte"),
+            labelRel(XbrlConst.documentationLabel, "de", "Summe der Vermögenswerte"),
+        ]
+        builder = IXBRLViewerBuilder(Mock(), labelLanguages=["en"])
+        entry = builder.conceptDataFromRelationships(concept, labelRels, [])
+        assert entry.data["labels"] == {
+            "std": {"en": "Assets"},
+            "doc": {"de": "Summe der Vermögenswerte"},
+        }
+        assert entry.labelRoles == (XbrlConst.standardLabel, XbrlConst.documentationLabel)
@@ -1,6 +1,23 @@
 import subprocess
 import sys
 import textwrap
+import threading
+from unittest.mock import Mock, patch
+
+
+class MockCntlr:
+    def __init__(self):
+        self.pluginData = {}
+        self.logMessages = []
+
+    def getPluginData(self, name):
+        return self.pluginData.get(name)
+
+    def setPluginData(self, pd):
+        self.pluginData[pd.name] = pd
+
+    def addToLog(self, message, **kwargs):
+        self.logMessages.append(message)
 
 
 def test_import_without_tkinter() -> None:
@@ -17,3 +34,82 @@ def test_import_without_tkinter() -> None:
         assert 'name' in iXBRLViewerPlugin.__pluginInfo__
     """)
     subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_pluginData_per_thread() -> None:
+    """Verify that concurrent filings on one controller have separate state."""
+    from iXBRLViewerPlugin import pluginData, resetPluginData
+
+    cntlr = MockCntlr()
+    pluginData(cntlr).cacheKey = "main"
+    barrier = threading.Barrier(4)
+    results = {}
+
+    def run(key):
+        barrier.wait()
+        pluginData(cntlr).cacheKey = key
+        barrier.wait()
+        results[key] = pluginData(cntlr).cacheKey
+        resetPluginData(cntlr)
+        assert pluginData(cntlr).cacheKey is None
+
+    threads = [threading.Thread(target=run, args=(f"t{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {f"t{i}": f"t{i}" for i in range(4)}
+    assert pluginData(cntlr).cacheKey == "main"
+    assert len(cntlr.pluginData) == 1
+
+
+@patch('iXBRLViewerPlugin.viewerCacheOptions', Mock(return_value={}))
+@patch('iXBRLViewerPlugin.loadTaxonomyPacks', Mock(return_value=[]))
+@patch('iXBRLViewerPlugin.IXBRLViewerBuilder', Mock())
+def test_cache_multiple_models(tmp_path) -> None:
+    """
+    Verify that a filing that loads more than one model is only served from
+    the cache if all of its models match.
+    """
+    from iXBRLViewerPlugin import (
+        iXBRLViewerCommandLineFilingEnd,
+        iXBRLViewerCommandLineFilingStart,
+        iXBRLViewerCommandLineXbrlRun,
+    )
+
+    dest = tmp_path / "out.html"
+    options = Mock(
+        saveViewerDest=str(dest),
+        viewerCacheDir=str(tmp_path / "cache"),
+        viewerCacheSize=1,
+        viewerCacheHardlink=False,
+        viewerProfile=False,
+        viewerProfileMemory=False,
+        viewerLabelLanguages=None,
+        keepOpen=False,
+    )
+    models = {name: Mock(urlDocs={f"{name}.html": None}, fileSource=None) for name in ("a", "b")}
+
+    def generateViewer(cntlr, saveViewerDest, **kwargs):
+        dest.write_text("viewer")
+        return Mock(savedFiles=[saveViewerDest])
+
+    def runFiling(names):
+        cntlr = MockCntlr()
+        dest.unlink(missing_ok=True)
+        with patch('iXBRLViewerPlugin.processModel') as processModel, \
+                patch('iXBRLViewerPlugin.generateViewer', side_effect=generateViewer) as generate:
+            iXBRLViewerCommandLineFilingStart(cntlr, options, None, [f"{name}.html" for name in names])
+            for name in names:
+                iXBRLViewerCommandLineXbrlRun(cntlr, options, models[name])
+            iXBRLViewerCommandLineFilingEnd(cntlr, options)
+        assert dest.read_text() == "viewer"
+        return processModel.call_count, generate.called
+
+    # A single model is not processed if its viewer is cached
+    assert runFiling(["a"]) == (1, True)
+    assert runFiling(["a"]) == (0, False)
+    # Models are processed, and the viewer generated, if only the first matches
+    assert runFiling(["a", "b"]) == (2, True)
+    # Models are processed, but the viewer is not generated, if all match
+    assert runFiling(["a", "b"]) == (2, False)
@@ -0,0 +1,59 @@
+from lxml import etree
+
+from iXBRLViewerPlugin.preprocess import continuationChains, documentItems
+
+
+def parseDocument(body):
+    return etree.ElementTree(etree.fromstring(
+        '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">'
+        f'<head><title>t</title></head><body>{body}</body></html>'
+    ))
+
+
+class TestPreprocess:
+
+    def test_continuationChains(self):
+        doc1 = parseDocument(
+            '<ix:nonNumeric id="f1" continuedAt="c1">a</ix:nonNumeric>'
+            '<ix:nonNumeric id="f2">b</ix:nonNumeric>'
+            '<ix:continuation id="c2" continuedAt="c1">c</ix:continuation>'
+        )
+        doc2 = parseDocument(
+            '<ix:continuation id="c1" continuedAt="c2">d</ix:continuation>'
+            '<ix:footnote id="fn1" continuedAt="c3">e</ix:footnote>'
+            '<ix:continuation id="c3">f</ix:continuation>'
+        )
+        # Chains may span documents, and cycles are not followed.
+        assert continuationChains([doc1, doc2]) == {
+            "f1": ["c1", "c2"],
+            "fn1": ["c3"],
+        }
+
+    def test_documentItems(self):
+        doc = parseDocument(
+            '<div id="d1">'
+            '<ix:nonNumeric id="f1" continuedAt="c1"><ix:nonFraction id="f2">1</ix:nonFraction></ix:nonNumeric>'
+            '<ix:continuation id="c1">a</ix:continuation>'
+            '<ix:continuation id="c2">b</ix:continuation>'
+            '<span style="color: red">x</span>'
+            '<span style="-ix-hidden: f3">3</span>'
+            '<span style="-sec-ix-hidden:f4; color: red">4</span>'
+            '<span style="x-ix-hidden: f5">5</span>'
+            '</div>'
+            '<ix:header><ix:hidden><ix:nonNumeric id="f3">3</ix:nonNumeric></ix:hidden></ix:header>'
+        )
+        # Children come before their parents, and continuations that aren't
+        # part of a chain are ignored.  Links to hidden facts are identified by
+        # their index amongst elements with an -ix-hidden style.
+        assert documentItems(doc, {"c1"}) == [
+            ["f2", 0],
+            ["f1", 0],
+            ["c1", 0],
+            [0, 0],
+            [1, 0],
+            ["f3", 1],
+        ]
+
+    def test_documentItems_no_body(self):
+        doc = etree.ElementTree(etree.fromstring('<html xmlns="http://www.w3.org/1999/xhtml"/>'))
+        assert documentItems(doc, set()) == []
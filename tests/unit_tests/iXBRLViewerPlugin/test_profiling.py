@@ -0,0 +1,55 @@
+import json
+import tracemalloc
+
+from iXBRLViewerPlugin.profiling import StageProfiler
+
+
+class TestStageProfiler:
+
+    def test_nested_stages(self):
+        profiler = StageProfiler()
+        for _ in range(2):
+            with profiler.stage('outer') as outer:
+                with profiler.stage('outer.inner') as inner:
+                    inner.addItems(3)
+        assert profiler.stages['outer'] is outer
+        assert outer.calls == 2
+        assert outer.items is None
+        assert inner.calls == 2
+        assert inner.items == 6
+        assert outer.wallTime >= inner.wallTime
+        assert outer.peakMemory is None
+
+    def test_disabled(self):
+        profiler = StageProfiler(enabled=False)
+        with profiler.stage('stage') as stats:
+            stats.addItems(1)
+        assert profiler.stages == {}
+
+    def test_trace_memory(self):
+        assert not tracemalloc.is_tracing()
+        profiler = StageProfiler(traceMemory=True)
+        with profiler.stage('outer'):
+            with profiler.stage('outer.inner'):
+                data = bytearray(1024 * 1024)
+            del data
+            with profiler.stage('outer.other'):
+                pass
+        profiler.close()
+        assert not tracemalloc.is_tracing()
+        # Peak from a nested stage is retained by the enclosing stage
+        assert profiler.stages['outer'].peakMemory >= 1024 * 1024
+        assert profiler.stages['outer.inner'].peakMemory >= 1024 * 1024
+        assert profiler.stages['outer.other'].peakMemory < 1024 * 1024
+
+    def test_write_report(self, tmp_path):
+        profiler = StageProfiler()
+        with profiler.stage('stage') as stats:
+            stats.addItems(2)
+        path = tmp_path / 'profile.json'
+        profiler.writeReport(str(path))
+        report = json.loads(path.read_text())
+        assert report['traceMemory'] is False
+        assert report['stages']['stage']['calls'] == 1
+        assert report['stages']['stage']['items'] == 2
+        assert set(report['stages']['stage']) == {'calls', 'wallTime', 'cpuTime', 'peakMemory', 'items'}
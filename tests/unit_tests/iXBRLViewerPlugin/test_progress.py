@@ -0,0 +1,32 @@
+import pytest
+
+from iXBRLViewerPlugin.progress import GenerationProgress, ProgressUpdate, ViewerGenerationCancelled
+
+
+class TestGenerationProgress:
+
+    def test_update_throttled(self):
+        updates = []
+        progress = GenerationProgress(updates.append, interval=3600)
+        for n in range(10):
+            progress.update("Processing facts", n, 10, "facts")
+        progress.update("Processing facts", 10, 10, "facts")
+        progress.update("Saving files", 0, 2, "files")
+        # The first and last updates of each stage are always passed on.
+        assert updates == [
+            ProgressUpdate("Processing facts", 0, 10, "facts"),
+            ProgressUpdate("Processing facts", 10, 10, "facts"),
+            ProgressUpdate("Saving files", 0, 2, "files"),
+        ]
+
+    def test_cancel(self):
+        progress = GenerationProgress()
+        progress.update("Processing facts", 0)
+        progress.cancel()
+        assert progress.cancelled
+        with pytest.raises(ViewerGenerationCancelled):
+            progress.update("Processing facts", 1)
+
+    def test_describe(self):
+        assert ProgressUpdate("Creating viewer", 0).describe() == "Creating viewer: 0"
+        assert ProgressUpdate("Saving files", 2, 3, "files", 3 * 1024 * 1024).describe() == "Saving files: 2 of 3 files (3.0 MB written)"
@@ -0,0 +1,128 @@
+import json
+
+from iXBRLViewerPlugin.prune import pruneTargetReport, reportedConcepts
+
+
+def concept(**data):
+    return {"labels": {"std": {"en": "Label"}}, **data}
+
+
+def targetReport():
+    return {
+        "concepts": {
+            "eg:Root": concept(),
+            "eg:Assets": concept(),
+            "eg:Cash": concept(),
+            "eg:Unreported": concept(),
+            "eg:OtherRoot": concept(),
+            "eg:OtherChild": concept(),
+            "eg:Total": concept(),
+            "eg:Dim": concept(d="e"),
+            "eg:Member": concept(),
+            "eg:DefaultMember": concept(),
+            "eg:UnusedDim": concept(),
+            "eg:UnusedDefault": concept(),
+            "eg:TypedDim": concept(d="t", td="eg:TypedDomain"),
+            "eg:TypedDomain": concept(),
+            "eg:Enum": concept(e=True),
+            "eg:EnumValue": concept(),
+            "eg:Wider": concept(),
+        },
+        "facts": {
+            "f1": {"a": {"c": "eg:Cash", "e": "e:1", "p": "2020-01-01", "eg:Dim": "eg:Member"}, "v": "1"},
+            "f2": {"a": {"c": "eg:Assets", "e": "e:1", "p": "2020-01-01", "eg:TypedDim": "abc"}, "v": "2"},
+            "f3": {"a": {"c": "eg:Enum", "e": "e:1", "p": "2020-01-01"}, "v": "eg:EnumValue"},
+        },
+        "rels": {
+            "pres": {
+                "role1": {
+                    "eg:Root": [{"t": "eg:Assets"}, {"t": "eg:Dim"}],
+                    "eg:Assets": [{"t": "eg:Cash"}, {"t": "eg:Unreported"}],
+                    "eg:Dim": [{"t": "eg:Member"}, {"t": "eg:DefaultMember"}],
+                },
+                "role2": {
+                    "eg:OtherRoot": [{"t": "eg:OtherChild"}],
+                },
+            },
+            "calc": {
+                "role1": {
+                    "eg:Assets": [{"t": "eg:Cash", "w": 1}, {"t": "eg:Unreported", "w": 1}],
+                },
+                "role3": {
+                    "eg:Total": [{"t": "eg:Cash", "w": 1}, {"t": "eg:OtherChild", "w": 1}],
+                    "eg:OtherRoot": [{"t": "eg:OtherChild", "w": 1}],
+                },
+            },
+            "w-n": {
+                "role4": {
+                    "eg:Wider": [{"t": "eg:Assets"}],
+                },
+            },
+            "d-d": {
+                "role5": {
+                    "eg:Dim": [{"t": "eg:DefaultMember"}],
+                    "eg:UnusedDim": [{"t": "eg:UnusedDefault"}],
+                },
+            },
+        },
+        "roleDefs": {
+            "role1": {"en": "Role 1"},
+            "role2": {"en": "Role 2"},
+            "role6": {"en": "Label role"},
+        },
+    }
+
+
+class TestPrune:
+
+    def test_reportedConcepts(self):
+        assert reportedConcepts(targetReport()) == {
+            "eg:Cash", "eg:Dim", "eg:Member", "eg:Assets", "eg:TypedDim", "eg:Enum", "eg:EnumValue",
+        }
+
+    def test_pruneTargetReport(self):
+        report = targetReport()
+        size = len(json.dumps(report, separators=(',', ':')))
+        removed = pruneTargetReport(report)
+        assert removed == size - len(json.dumps(report, separators=(',', ':')))
+        assert report["rels"] == {
+            # Trees containing a reported concept are kept whole
+            "pres": {
+                "role1": targetReport()["rels"]["pres"]["role1"],
+            },
+            # Relationships to or from a reported concept
+            "calc": {
+                "role1": targetReport()["rels"]["calc"]["role1"],
+                "role3": {
+                    "eg:Total": [{"t": "eg:Cash", "w": 1}],
+                },
+            },
+            "w-n": targetReport()["rels"]["w-n"],
+            # Defaults for reported dimensions
+            "d-d": {
+                "role5": {
+                    "eg:Dim": [{"t": "eg:DefaultMember"}],
+                },
+            },
+        }
+        assert set(report["concepts"]) == {
+            "eg:Root", "eg:Assets", "eg:Cash", "eg:Unreported", "eg:Total", "eg:Dim", "eg:Member",
+            "eg:DefaultMember", "eg:TypedDim", "eg:TypedDomain", "eg:Enum", "eg:EnumValue", "eg:Wider",
+        }
+        # Only role definitions of removed ELRs are removed
+        assert report["roleDefs"] == {
+            "role1": {"en": "Role 1"},
+            "role6": {"en": "Label role"},
+        }
+        assert report["facts"] == targetReport()["facts"]
+
+    def test_pruneTargetReport_nothingUnreachable(self):
+        report = targetReport()
+        del report["rels"]["pres"]["role2"]
+        del report["rels"]["calc"]["role3"]
+        del report["rels"]["d-d"]["role5"]["eg:UnusedDim"]
+        for name in ("eg:OtherRoot", "eg:OtherChild", "eg:Total", "eg:UnusedDim", "eg:UnusedDefault"):
+            del report["concepts"][name]
+        expected = json.loads(json.dumps(report))
+        assert pruneTargetReport(report) == 0
+        assert report == expected
@@ -0,0 +1,98 @@
+import pytest
+
+from iXBRLViewerPlugin.searchindex import SearchIndexBuilder, momentString
+
+
+def reportData():
+    return {
+        "concepts": {
+            "eg:Cash": {
+                "labels": {
+                    "std": {"en": "Cash", "fr": "Trésorerie"},
+                    "doc": {"en": "Cash documentation"},
+                },
+                "r": [[["Name", "IAS"], ["Number", "7"]], [["Name", "IFRS"]]],
+            },
+            "eg:CashAndEquivalents": {
+                "labels": {"std": {"en": "Cash and equivalents"}},
+            },
+            "eg:Segment": {"d": "e", "labels": {}},
+            "eg:Europe": {"labels": {"std": {"en": "Europe"}}},
+            "eg:Unlabelled": {"labels": {}},
+            "eg:Typed": {"d": "t", "labels": {}},
+        },
+        "facts": {
+            "f1": {"a": {"c": "eg:Cash", "p": "2018-01-01/2019-01-01"}, "v": "1"},
+            "f2": {"a": {"c": "eg:Cash", "p": "2019-01-01", "eg:Segment": "eg:Europe", "eg:Typed": "42"}, "v": "2"},
+            "f3": {"a": {"c": "eg:CashAndEquivalents", "p": "f", "eg:Segment": "eg:Unlabelled", "eg:Typed": None}, "v": "3"},
+        },
+        "rels": {
+            "w-n": {
+                "ns0": {"eg:CashAndEquivalents": [{"t": "eg:Cash"}]},
+            },
+        },
+    }
+
+
+class TestSearchIndexBuilder:
+
+    def test_momentString(self):
+        assert momentString("2019-01-01") == "Tue Jan 01 2019 00:00:00 GMT+0000"
+        assert momentString("2019-01-01T12:30:00") == "Tue Jan 01 2019 12:30:00 GMT+0000"
+        assert momentString("2019-01-01Z") == "Tue Jan 01 2019 00:00:00 GMT+0000"
+        assert momentString("2019-01-01T01:00:00+02:00") == "Mon Dec 31 2018 23:00:00 GMT+0000"
+        assert momentString("not a date") == "Invalid date"
+
+    def test_searchDocument(self):
+        builder = SearchIndexBuilder()
+        data = reportData()
+        assert builder.searchDocument("0-f1", data["facts"]["f1"], data, "en") == {
+            "id": "0-f1",
+            "concept": "Cash",
+            "doc": "Cash documentation",
+            "date": "Tue Jan 01 2019 00:00:00 GMT+0000",
+            "startDate": "Mon Jan 01 2018 00:00:00 GMT+0000",
+            "label": "Cash",
+            "ref": "IAS 7 IFRS",
+            "widerConcept": "CashAndEquivalents",
+            "widerLabel": "Cash and equivalents",
+        }
+
+    def test_searchDocument_dimensions(self):
+        builder = SearchIndexBuilder()
+        data = reportData()
+        doc = builder.searchDocument("0-f2", data["facts"]["f2"], data, "fr")
+        assert doc["label"] == "Trésorerie Europe 42"
+        assert doc["date"] == "Tue Jan 01 2019 00:00:00 GMT+0000"
+        assert "startDate" not in doc
+        doc = builder.searchDocument("0-f3", data["facts"]["f3"], data, "en")
+        # Missing labels are rendered as they are by the viewer
+        assert doc["label"] == "Cash and equivalents undefined"
+        assert "date" not in doc
+        assert doc["ref"] == ""
+
+    def test_searchData_orders_hidden_facts_last(self):
+        builder = SearchIndexBuilder()
+        builder.addTargetReport(0, reportData(), {"f1"})
+        builder.addTargetReport(1, reportData(), set())
+        search = builder.searchData()
+        assert search["lang"] == "en"
+        assert [doc["id"] for doc in search["docs"]] == ["0-f2", "0-f3", "1-f1", "1-f2", "1-f3", "0-f1"]
+
+    def test_defaultLanguage(self):
+        builder = SearchIndexBuilder()
+        assert builder.defaultLanguage() is None
+        data = reportData()
+        data["concepts"] = {"eg:Cash": {"labels": {"std": {"fr": "Trésorerie", "de": "Kasse"}}}}
+        builder.addTargetReport(0, data, set())
+        assert builder.availableLanguages() == ["fr", "de"]
+        assert builder.defaultLanguage() == "de"
+
+    def test_searchData_index(self):
+        lunr = pytest.importorskip("lunr")
+        builder = SearchIndexBuilder()
+        builder.addTargetReport(0, reportData(), set())
+        search = builder.searchData(buildIndex=True)
+        assert "docs" not in search
+        index = lunr.index.Index.load(search["index"])
+        assert [r["ref"] for r in index.search("europe")] == ["0-f2"]
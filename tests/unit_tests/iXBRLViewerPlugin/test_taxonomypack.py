@@ -0,0 +1,141 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+from arelle import XbrlConst
+from arelle.ModelDtsObject import ModelConcept, ModelResource
+from arelle.ModelValue import qname
+
+from .mock_arelle import mock_arelle
+
+mock_arelle()
+
+from iXBRLViewerPlugin.iXBRLViewer import IXBRLViewerBuilder
+from iXBRLViewerPlugin.taxonomypack import TaxonomyPack, loadTaxonomyPacks, taxonomyPackFilename
+
+BASE_NS = "http://www.example.com/base/2024"
+BASE_LAB = "http://www.example.com/base/2024/base-lab.xml"
+BASE_REF = "http://www.example.com/base/2024/base-ref.xml"
+EXT_LAB = "http://www.example.com/ext/ext-lab.xml"
+
+
+def labelRel(linkbase, text, role=XbrlConst.standardLabel, lang="en"):
+    return Mock(
+        modelDocument=Mock(uri=linkbase),
+        toModelObject=Mock(spec=ModelResource, xmlLang=lang, role=role, stringValue=text),
+    )
+
+
+def refRel(linkbase, name):
+    return Mock(
+        modelDocument=Mock(uri=linkbase),
+        toModelObject=Mock(spec=ModelResource, iterchildren=lambda: [Mock(localName="Name", stringValue=name)]),
+    )
+
+
+def makeConcept(ns, localName, prefix):
+    return Mock(
+        spec=ModelConcept,
+        qname=qname(ns, f"{prefix}:{localName}"),
+        balance="debit",
+        isTypedDimension=False,
+        isEnumeration=False,
+        isTextBlock=False,
+        type=Mock(qname=qname(XbrlConst.xbrli, "xbrli:monetaryItemType")),
+    )
+
+
+def makeReport(relationships):
+    """
+    Return a mock report with the given label and reference relationships for
+    each concept.
+    """
+    concepts = list(relationships)
+
+    def relationshipSet(arcrole, *args):
+        index = 0 if arcrole == XbrlConst.conceptLabel else 1
+        return Mock(fromModelObject=lambda c: relationships[c][index])
+
+    report = Mock(
+        relationshipSet=relationshipSet,
+        roleTypes={},
+        prefixedNamespaces={},
+        qnameConcepts={c.qname: c for c in concepts},
+        urlDocs={},
+    )
+    for c in concepts:
+        c.modelXbrl = report
+    return report
+
+
+class TestTaxonomyPack:
+
+    def setup_method(self):
+        self.assets = makeConcept(BASE_NS, "Assets", "base")
+        self.cash = makeConcept(BASE_NS, "Cash", "base")
+        self.other = makeConcept("http://www.example.com/ext", "Other", "ext")
+        self.baseRels = {
+            self.assets: ([labelRel(BASE_LAB, "Assets")], [refRel(BASE_REF, "Standard")]),
+            self.cash: ([labelRel(BASE_LAB, "Cash"), labelRel(BASE_LAB, "Espèces", lang="fr")], []),
+        }
+
+    def createPack(self, tmp_path):
+        pack = IXBRLViewerBuilder(Mock()).createTaxonomyPack(makeReport(self.baseRels), BASE_NS)
+        path = tmp_path / taxonomyPackFilename(BASE_NS)
+        path.write_text(json.dumps(pack))
+        return pack, str(path)
+
+    def test_taxonomyPackFilename(self):
+        assert taxonomyPackFilename("http://fasb.org/us-gaap/2024") == "fasb.org-us-gaap-2024.json"
+        assert taxonomyPackFilename("https://xbrl.ifrs.org/taxonomy/2024-03-27/ifrs-full") == "xbrl.ifrs.org-taxonomy-2024-03-27-ifrs-full.json"
+
+    def test_createTaxonomyPack(self, tmp_path):
+        pack, _ = self.createPack(tmp_path)
+        assert pack["namespace"] == BASE_NS
+        assert pack["concepts"]["Assets"]["labels"] == {"std": {"en": "Assets"}}
+        assert pack["concepts"]["Assets"]["r"] == [[["Name", "Standard"]]]
+        assert pack["concepts"]["Assets"]["b"] == "debit"
+        assert pack["prefixes"][pack["concepts"]["Assets"]["dt"].split(":")[0]] == XbrlConst.xbrli
+        assert pack["concepts"]["Cash"]["labels"] == {"std": {"en": "Cash", "fr": "Espèces"}}
+        assert pack["linkbases"] == [BASE_LAB, BASE_REF]
+        assert pack["relationshipCounts"] == {"Assets": 2, "Cash": 2}
+
+    def test_loadTaxonomyPacks(self, tmp_path):
+        _, path = self.createPack(tmp_path)
+        pack, = loadTaxonomyPacks([path])
+        assert pack.namespace == BASE_NS
+        assert pack.url == "www.example.com-base-2024.json"
+        assert pack.linkbases == {BASE_LAB, BASE_REF}
+        pack, = loadTaxonomyPacks([path], "https://cdn.example.com/packs/")
+        assert pack.url == "https://cdn.example.com/packs/www.example.com-base-2024.json"
+
+    def test_load_unsupported_format(self, tmp_path):
+        path = tmp_path / "pack.json"
+        path.write_text(json.dumps({"format": 99}))
+        with pytest.raises(ValueError):
+            TaxonomyPack.load(str(path))
+
+    def test_getConceptData_from_pack(self, tmp_path):
+        _, path = self.createPack(tmp_path)
+        filingRels = {
+            # Extension label for a base concept
+            self.assets: (self.baseRels[self.assets][0] + [labelRel(EXT_LAB, "Total assets")], self.baseRels[self.assets][1]),
+            # Base label prohibited
+            self.cash: (self.baseRels[self.cash][0][:1], []),
+            self.other: ([labelRel(EXT_LAB, "Other")], []),
+        }
+        report = makeReport(filingRels)
+        builder = IXBRLViewerBuilder(Mock(), taxonomyPacks=[TaxonomyPack.load(path)])
+        builder.currentTargetReport = builder.newTargetReport(None)
+        for concept in filingRels:
+            builder.addConcept(report, concept)
+        concepts = builder.currentTargetReport["concepts"]
+        assert concepts["base:Assets"] == {"p": 0, "labels": {"std": {"en": "Total assets"}}}
+        # Data can't be taken from the pack
+        assert concepts["base:Cash"]["labels"] == {"std": {"en": "Cash"}}
+        assert "p" not in concepts["base:Cash"]
+        assert concepts["ext:Other"]["labels"] == {"std": {"en": "Other"}}
+        assert "p" not in concepts["ext:Other"]
+        assert builder.taxonomyData["taxonomyPacks"] == [
+            {"namespace": BASE_NS, "url": "www.example.com-base-2024.json"},
+        ]
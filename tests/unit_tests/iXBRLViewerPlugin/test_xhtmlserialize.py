@@ -308,3 +308,39 @@ class TestXHTMLSerializer:
             e.set("{http://www.example.com}attr", "def")
             s = self._serialiseToString(x)
             assert s == test_out
+
+    def test_text_writers(self):
+        doc = lxml.etree.fromstring(self._html('<script>original</script><p>text</p>'))
+        script = doc.find('.//{http://www.w3.org/1999/xhtml}script')
+        buf = io.BytesIO()
+        serializer = XHTMLSerializer(buf, xml_declaration=False, text_writers={script: lambda: iter(['{"a":', ' "\\u003C"}'])})
+        serializer.serialize(doc)
+        assert buf.getvalue().decode('utf-8') == self._html('<script>{"a": "\\u003C"}</script><p>text</p>')
+
+    def test_small_buffer(self):
+        # Output should be unaffected by how often the buffer is flushed
+        doc = lxml.etree.fromstring(self._html('<p class="a">foo &amp; bar<br/></p><p>baz</p>'))
+        expected = self._serialiseToString(doc)
+        buf = io.BytesIO()
+        serializer = XHTMLSerializer(buf, xml_declaration=False)
+        serializer.BUFFER_SIZE = 1
+        serializer.serialize(doc)
+        assert buf.getvalue().decode('utf-8') == expected
+
+    def test_repeated_namespace_contexts(self):
+        # Namespace declarations should be repeated on each element that
+        # introduces them, even when the namespace context has been seen
+        # before.
+        tests = (
+            (
+                r'''<div xmlns="http://www.w3.org/1999/xhtml"><svg xmlns="http://www.w3.org/2000/svg"><g/></svg><svg xmlns="http://www.w3.org/2000/svg"><g/></svg><p/></div>''',
+                r'''<div xmlns="http://www.w3.org/1999/xhtml"><svg xmlns="http://www.w3.org/2000/svg"><g></g></svg><svg xmlns="http://www.w3.org/2000/svg"><g></g></svg><p></p></div>''',
+            ),
+            (
+                r'''<div xmlns:a="http://example.com/a"><a:x a:attr="1"/><span xmlns:a="http://example.com/b"><a:x a:attr="2"/></span><a:x a:attr="3"/></div>''',
+                r'''<div xmlns:a="http://example.com/a"><a:x a:attr="1"></a:x><span xmlns:a="http://example.com/b"><a:x a:attr="2"></a:x></span><a:x a:attr="3"></a:x></div>''',
+            ),
+        )
+        for (test_in, test_out) in tests:
+            x = lxml.etree.fromstring(test_in)
+            assert self._serialiseToString(x) == test_out
@@ -0,0 +1,113 @@
+import io
+import zipfile
+
+import pytest
+
+from iXBRLViewerPlugin.ziputil import compressMember, compressTypeForFilename, copyZipMember, writeCompressedMember
+
+
+def sourceZip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as z:
+        for name, (data, compressType) in members.items():
+            z.writestr(name, data, compress_type=compressType)
+    buf.seek(0)
+    return buf
+
+
+class TestZipUtil:
+
+    @pytest.mark.parametrize("filename, expected", [
+        ("logo.png", zipfile.ZIP_STORED),
+        ("photo.JPG", zipfile.ZIP_STORED),
+        ("report.pdf", zipfile.ZIP_STORED),
+        ("filing.zip", zipfile.ZIP_STORED),
+        ("data.json.gz", zipfile.ZIP_STORED),
+        ("chart.svg", zipfile.ZIP_DEFLATED),
+        ("report.html", zipfile.ZIP_DEFLATED),
+        ("ixbrlviewer.js", zipfile.ZIP_DEFLATED),
+        ("data.json", zipfile.ZIP_DEFLATED),
+        ("unknown", zipfile.ZIP_DEFLATED),
+    ])
+    def test_compressTypeForFilename(self, filename, expected):
+        assert compressTypeForFilename(filename) == expected
+
+    def test_copyZipMember(self):
+        text = b"<svg>" + b"x" * 1000 + b"</svg>"
+        png = bytes(range(256)) * 4
+        src = sourceZip({
+            "reports/deflated.svg": (text, zipfile.ZIP_DEFLATED),
+            "reports/stored.svg": (text, zipfile.ZIP_STORED),
+            "reports/image.png": (png, zipfile.ZIP_STORED),
+        })
+        out = io.BytesIO()
+        with zipfile.ZipFile(src) as zin, zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zout:
+            zout.writestr("first.html", "<html/>")
+            for info in zin.infolist():
+                copyZipMember(zin, info, zout, info.filename.split("/")[-1])
+            zout.writestr("last.html", "<html/>")
+            deflatedSize = zin.getinfo("reports/deflated.svg").compress_size
+
+        with zipfile.ZipFile(out) as z:
+            assert z.testzip() is None
+            assert z.namelist() == ["first.html", "deflated.svg", "stored.svg", "image.png", "last.html"]
+            assert z.read("deflated.svg") == text
+            assert z.read("stored.svg") == text
+            assert z.read("image.png") == png
+            # Compressed data is copied as is
+            assert z.getinfo("deflated.svg").compress_type == zipfile.ZIP_DEFLATED
+            assert z.getinfo("deflated.svg").compress_size == deflatedSize
+            # Stored text is deflated, and stored images are left stored
+            assert z.getinfo("stored.svg").compress_type == zipfile.ZIP_DEFLATED
+            assert z.getinfo("image.png").compress_type == zipfile.ZIP_STORED
+
+    def test_copyZipMember_append(self):
+        src = sourceZip({"a.png": (b"png", zipfile.ZIP_STORED)})
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, 'w') as zout:
+            zout.writestr("existing.html", "<html/>")
+        with zipfile.ZipFile(src) as zin, zipfile.ZipFile(out, 'a') as zout:
+            copyZipMember(zin, zin.getinfo("a.png"), zout, "a.png")
+        with zipfile.ZipFile(out) as z:
+            assert z.testzip() is None
+            assert z.namelist() == ["existing.html", "a.png"]
+
+    @pytest.mark.parametrize("compressType", [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED])
+    def test_writeCompressedMember(self, compressType):
+        text = "<html>" + "Ünïcödé " * 1000 + "</html>"
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, 'w') as zout:
+            zout.writestr("existing.html", "<html/>")
+            writeCompressedMember(zout, "a.html", compressMember(text.encode('utf-8'), compressType))
+            writeCompressedMember(zout, "b.html", compressMember(b"", compressType))
+        with zipfile.ZipFile(out) as z:
+            assert z.testzip() is None
+            assert z.namelist() == ["existing.html", "a.html", "b.html"]
+            assert z.read("a.html").decode('utf-8') == text
+            assert z.read("b.html") == b""
+            info = z.getinfo("a.html")
+            assert info.compress_type == compressType
+            assert (info.compress_size < info.file_size) == (compressType == zipfile.ZIP_DEFLATED)
+
+    def test_writeCompressedMember_checks(self):
+        """
+        writeRawMember relies on ZipFile internals, so check that it keeps
+        the behaviour of ZipFile.writestr.
+        """
+        member = compressMember(b"<html/>")
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, 'w') as zout:
+            writeCompressedMember(zout, "a.html", member)
+            with pytest.warns(UserWarning, match="Duplicate name"):
+                writeCompressedMember(zout, "a.html", member)
+            with zout.open("b.html", "w") as fout:
+                with pytest.raises(ValueError):
+                    writeCompressedMember(zout, "c.html", member)
+                fout.write(b"<html/>")
+        with pytest.raises(ValueError):
+            writeCompressedMember(zout, "d.html", member)
+        with zipfile.ZipFile(out) as z:
+            assert z.testzip() is None
+            assert [i.filename for i in z.infolist()] == ["a.html", "a.html", "b.html"]
+            assert all(z.read(i) == b"<html/>" for i in z.infolist())
+
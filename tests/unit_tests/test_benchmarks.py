@@ -0,0 +1,28 @@
+import io
+
+from lxml import etree
+
+from tests.benchmarks.benchmark import STAGES, runBenchmark
+from tests.benchmarks.synthetic import CorpusParameters, IX_NS, SyntheticCorpus
+from iXBRLViewerPlugin.xhtmlserialize import XHTMLSerializer
+
+
+def test_synthetic_corpus():
+    params = CorpusParameters(facts=120, depth=3, namespaces=2, continuations=2, continuationLength=2, hiddenFacts=5)
+    corpus = SyntheticCorpus(params)
+    buf = io.BytesIO()
+    XHTMLSerializer(buf).serialize(corpus.document)
+    doc = etree.fromstring(buf.getvalue())
+    factIds = {e.get('id') for e in doc.iter(f'{{{IX_NS}}}nonFraction', f'{{{IX_NS}}}nonNumeric')}
+    assert factIds == {f.id for f in corpus.modelXbrl.facts}
+    assert len(list(doc.iter(f'{{{IX_NS}}}continuation'))) == 4
+    assert len(corpus.modelXbrl.facts) == 127
+
+
+def test_runBenchmark():
+    results = runBenchmark(CorpusParameters(facts=50), repeat=1)
+    assert tuple(results['stages']) == STAGES
+    for stage in results['stages'].values():
+        assert stage['wallTime'] > 0
+        assert stage['peakMemory'] is not None
+    assert results['stages']['save']['bytes'] > results['stages']['serialize']['bytes']